@@ -0,0 +1,165 @@
+"""
+Admission control for model-backed endpoints
+
+Two independent limits keep one noisy client from draining the Gemini quota
+or tying up every worker with slow model calls:
+- TokenBucketLimiter: per-client buckets (`rate` tokens/second, up to
+  `burst`). Each model-backed request costs one token. An empty bucket means
+  the request is refused along with the wait until the next token.
+- ConcurrencyLimiter: a global cap on in-flight model calls with a short,
+  bounded FIFO queue. Callers beyond the queue, or ones that wait longer
+  than `queue_timeout`, are refused right away instead of piling up.
+
+Both raise/return AdmissionRejected with a retry-after hint; the caller
+decides whether that becomes a 429 or a local answer. A slot can be taken
+from threads (acquire/slot) and coroutines (acquire_async/slot_async) alike.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+
+
+class AdmissionRejected(RuntimeError):
+    """The request was not admitted; retry_after is a hint in seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"{reason} (retry after {retry_after:.1f}s)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets; the least recently seen keys are forgotten past max_keys."""
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate  # tokens per second; <= 0 disables the limit
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """Spend one token for key; returns 0 when allowed, else seconds until a token is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)  # a forgotten key starts again with a full bucket
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class _Waiter:
+    __slots__ = ('granted', 'notify')
+
+    def __init__(self, notify):
+        self.granted = False
+        self.notify = notify
+
+
+class ConcurrencyLimiter:
+    """At most `limit` holders; up to `queue_size` callers wait (FIFO) for `queue_timeout` seconds."""
+
+    def __init__(self, limit, queue_size, queue_timeout, retry_after=1.0):
+        self.limit = limit  # <= 0 disables the cap
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, make_waiter):
+        """Take a free slot (returns None) or enqueue a waiter (returned); raises when the queue is full."""
+        with self._lock:
+            if self.limit <= 0 or self._in_flight < self.limit:
+                self._in_flight += 1
+                return None
+            if len(self._waiters) >= self.queue_size:
+                raise AdmissionRejected('queue_full', self.retry_after)
+            waiter = make_waiter()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _withdraw(self, waiter):
+        """Leave the queue; returns False if the slot was handed over meanwhile (caller now holds it)."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            return True
+
+    def acquire(self):
+        event = threading.Event()
+        waiter = self._try_acquire(lambda: _Waiter(event.set))
+        if waiter is None:
+            return
+        event.wait(self.queue_timeout)
+        if self._withdraw(waiter):
+            raise AdmissionRejected('queue_timeout', self.retry_after)
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._try_acquire(lambda: _Waiter(wake))
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if not self._withdraw(waiter):
+                self.release()
+            raise
+        if self._withdraw(waiter):
+            raise AdmissionRejected('queue_timeout', self.retry_after)
+
+    def release(self):
+        """Give the slot to the oldest waiter, or free it."""
+        with self._lock:
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self):
+        with self._lock:
+            return {'limit': self.limit, 'inFlight': self._in_flight, 'queued': len(self._waiters),
+                    'queueSize': self.queue_size}
@@ -1,80 +1,371 @@
 import os
+import sys
+import csv
+import bisect
+import gzip
+import atexit
+import shutil
+import asyncio
 import json
+import math
+import random
+import re
+import time
+import hashlib
+import heapq
+import hmac
 import uuid
+import weakref
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
-import google.generativeai as genai
-from flask import Flask, request, jsonify, render_template
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, NamedTuple, Optional, Tuple
+import click
+from flask import Flask, Response, g, has_request_context, request, jsonify, render_template, stream_with_context
+from flask.cli import AppGroup
+from werkzeug.routing import BaseConverter
 from dotenv import load_dotenv
 
+import metrics
+from admission import AdmissionRejected, ConcurrencyLimiter, TokenBucketLimiter
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from classifier import CategoryClassifier
+from profiling import ProfileStore, RequestProfiler, pstats_dump, pstats_report
+from taxonomy import Taxonomy, TaxonomyLoader
+from scheduler import Scheduler
+
+try:
+    import brotli  # optional: enables Content-Encoding: br
+except ImportError:
+    brotli = None
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json.compact = True  # no pretty-printing even in debug; history payloads are large
 GROCERY_FILE = 'grocery_list.txt'  # v1 file (for migration)
-GROCERY_DATA_FILE = 'grocery_data.json'  # v2 file
-
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-# Use Gemini 2.5 Flash model
-model = genai.GenerativeModel('gemini-2.5-flash')
+GROCERY_DATA_FILE = os.getenv('GROCERY_DATA_FILE', 'grocery_data.json')  # v2 file (default household)
+GROCERY_DATA_DIR = os.getenv('GROCERY_DATA_DIR', 'households')  # one shard per household
+
+# Category taxonomy (name/emoji/order/keywords), reloaded when the file changes
+CATEGORY_CONFIG_FILE = os.getenv(
+    'CATEGORY_CONFIG_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'categories.json'))
+CATEGORY_RELOAD_SECONDS = float(os.getenv('CATEGORY_RELOAD_SECONDS', '2'))  # how often to stat the file
+
+# Multi-household configuration
+DEFAULT_HOUSEHOLD = 'default'
+TENANT_CACHE_SIZE = int(os.getenv('TENANT_CACHE_SIZE', '256'))
+
+# /batch limits
+BATCH_MAX_OPS = int(os.getenv('BATCH_MAX_OPS', '500'))
+APPLIED_OPS_LIMIT = int(os.getenv('APPLIED_OPS_LIMIT', '1000'))  # op ids remembered per household
+
+# Model backend: 'gemini' (real API), 'stub' (in-process fake) or 'http' (local fake server)
+GEMINI_BACKEND = os.getenv('GEMINI_BACKEND', 'gemini').lower()
+# Model warm-up: 'background' (build the client in a thread at startup) or 'lazy' (on first /add-item)
+GEMINI_WARMUP = os.getenv('GEMINI_WARMUP', 'background').lower()
+# Ask the model for schema-constrained JSON instead of free-form text
+GEMINI_STRUCTURED_OUTPUT = os.getenv('GEMINI_STRUCTURED_OUTPUT', '1') == '1'
+
+# Circuit breaker around the model call (see circuit_breaker.py)
+GEMINI_BREAKER_FAILURE_RATE = float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', '0.5'))
+GEMINI_BREAKER_WINDOW = int(os.getenv('GEMINI_BREAKER_WINDOW', '20'))
+GEMINI_BREAKER_MIN_CALLS = int(os.getenv('GEMINI_BREAKER_MIN_CALLS', '5'))
+GEMINI_BREAKER_OPEN_SECONDS = float(os.getenv('GEMINI_BREAKER_OPEN_SECONDS', '30'))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '8'))  # until latencies are known
+GEMINI_MIN_TIMEOUT_SECONDS = float(os.getenv('GEMINI_MIN_TIMEOUT_SECONDS', '1.5'))
+GEMINI_MAX_TIMEOUT_SECONDS = float(os.getenv('GEMINI_MAX_TIMEOUT_SECONDS', '10'))
+
+# Admission control on model-backed routes (see admission.py)
+RATE_LIMIT_PER_MINUTE = float(os.getenv('RATE_LIMIT_PER_MINUTE', '20'))  # per client; 0 = unlimited
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '10'))
+RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', '0') == '1'  # key clients by X-Forwarded-For
+MODEL_MAX_CONCURRENCY = int(os.getenv('MODEL_MAX_CONCURRENCY', '8'))  # in-flight model calls; 0 = unlimited
+MODEL_QUEUE_SIZE = int(os.getenv('MODEL_QUEUE_SIZE', '16'))
+MODEL_QUEUE_TIMEOUT_MS = int(os.getenv('MODEL_QUEUE_TIMEOUT_MS', '250'))
+# What a refused request gets: 'reject' (429 + Retry-After) or 'fallback' (local parser)
+RATE_LIMIT_OVERFLOW = os.getenv('RATE_LIMIT_OVERFLOW', 'reject').lower()
+MODEL_OVERFLOW = os.getenv('MODEL_OVERFLOW', 'fallback').lower()
+
+# Write-behind: coalesce mutations into one write per window (0 = write through on every mutation)
+WRITE_COALESCE_MS = int(os.getenv('WRITE_COALESCE_MS', '0'))
+# 'commit' (fsync, caller waits for its flush), 'window' (fsync per flush) or 'os' (no fsync)
+WRITE_DURABILITY = os.getenv('WRITE_DURABILITY', 'os').lower()
+
+# Rotating snapshots of committed shards (hard links, no data copy)
+GROCERY_SNAPSHOT_DIR = os.getenv('GROCERY_SNAPSHOT_DIR', 'snapshots')  # one subdirectory per household
+SNAPSHOT_KEEP_RECENT = int(os.getenv('SNAPSHOT_KEEP_RECENT', '10'))  # newest N, whatever their age
+SNAPSHOT_HOURLY_HOURS = int(os.getenv('SNAPSHOT_HOURLY_HOURS', '24'))  # then one per hour for a day
+SNAPSHOT_DAILY_DAYS = int(os.getenv('SNAPSHOT_DAILY_DAYS', '30'))  # then one per day for a month
+
+# Strict validation: deep-check every household at startup and refuse to persist invalid data
+STRICT_VALIDATION = os.getenv('STRICT_VALIDATION', '0') == '1'
+
+# Background maintenance (see scheduler.py); intervals in seconds
+MAINTENANCE_ENABLED = os.getenv('MAINTENANCE_ENABLED', '1') == '1'
+MAINTENANCE_LOCK_DIR = os.getenv('MAINTENANCE_LOCK_DIR', os.path.join(GROCERY_DATA_DIR, '.locks'))
+MAINTENANCE_JITTER = float(os.getenv('MAINTENANCE_JITTER', '0.1'))  # +/- fraction of each interval
+HISTORY_RETENTION_DAYS = int(os.getenv('HISTORY_RETENTION_DAYS', '28'))
+JOB_HISTORY_RETENTION_SECONDS = float(os.getenv('JOB_HISTORY_RETENTION_SECONDS', '3600'))
+JOB_STATS_REBUILD_SECONDS = float(os.getenv('JOB_STATS_REBUILD_SECONDS', '3600'))
+JOB_COMPACTION_SECONDS = float(os.getenv('JOB_COMPACTION_SECONDS', '21600'))
+JOB_SNAPSHOT_ROTATION_SECONDS = float(os.getenv('JOB_SNAPSHOT_ROTATION_SECONDS', '600'))
+
+# Local category classifier (classifier.py): answers confident items without the model
+CLASSIFIER_ENABLED = os.getenv('CLASSIFIER_ENABLED', '1') == '1'
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv('CLASSIFIER_MIN_CONFIDENCE', '0.9'))
+CLASSIFIER_LABELS_FILE = os.getenv('CLASSIFIER_LABELS_FILE', os.path.join(GROCERY_DATA_DIR, 'classifier-labels.ndjson'))
+CLASSIFIER_SAMPLE_HOUSEHOLDS = int(os.getenv('CLASSIFIER_SAMPLE_HOUSEHOLDS', '1000'))  # shards read per collection
+CLASSIFIER_MAX_LABELS = int(os.getenv('CLASSIFIER_MAX_LABELS', '20000'))  # distinct item names kept
+JOB_CLASSIFIER_LABELS_SECONDS = float(os.getenv('JOB_CLASSIFIER_LABELS_SECONDS', '1800'))
+JOB_CLASSIFIER_RELOAD_SECONDS = float(os.getenv('JOB_CLASSIFIER_RELOAD_SECONDS', '60'))
+
+# Typeahead (/autocomplete)
+AUTOCOMPLETE_LIMIT = int(os.getenv('AUTOCOMPLETE_LIMIT', '8'))  # default suggestions per query (max 20)
+AUTOCOMPLETE_HALF_LIFE_DAYS = float(os.getenv('AUTOCOMPLETE_HALF_LIFE_DAYS', '30'))  # recency decay of purchase counts
+
+# Bulk import (flask import-items)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '40'))  # names per model call
+IMPORT_MODEL_WORKERS = int(os.getenv('IMPORT_MODEL_WORKERS', '4'))  # concurrent model calls
+
+# On-demand request profiling: only with PROFILING_ENABLED=1 and a request carrying PROFILING_TOKEN
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', '20'))  # captures kept in memory
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+
+# Response compression / static asset caching
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))  # smaller bodies aren't worth it
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzip 1-9 (brotli quality is mapped to 0-11)
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript'}
+STATIC_MAX_AGE = 365 * 24 * 3600  # fingerprinted URLs never change content
+
+
+# ==================== METRICS ====================
+
+metrics_registry = metrics.Registry()
+
+http_requests_total = metrics_registry.counter(
+    'grocery_http_requests_total', 'HTTP requests by route, method and status.', ('route', 'method', 'status'))
+http_request_duration = metrics_registry.histogram(
+    'grocery_http_request_duration_seconds', 'HTTP request latency by route.', ('route', 'method'))
+stage_duration = metrics_registry.histogram(
+    'grocery_stage_duration_seconds', 'Time spent in internal stages (Gemini, parsing, storage, encoding).', ('stage',))
+write_bytes = metrics_registry.histogram(
+    'grocery_write_bytes', 'Bytes written per write_grocery_data call.', buckets=metrics.SIZE_BUCKETS)
+gemini_errors_total = metrics_registry.counter(
+    'grocery_gemini_errors_total', 'Failed Gemini calls by exception type.', ('error',))
+gemini_fallbacks_total = metrics_registry.counter(
+    'grocery_gemini_fallbacks_total', 'Requests parsed by the local fallback parser instead of Gemini.')
+
+
+def timed_stage(stage: str):
+    """Context manager observing a stage's duration."""
+    return stage_duration.time(stage=stage)
+
+
+def instrumented_stage(stage: str):
+    """Decorator observing a function's duration as a stage."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_duration.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.endpoint or 'unmatched'
+        http_request_duration.observe(time.perf_counter() - started, route=route, method=request.method)
+        http_requests_total.inc(route=route, method=request.method, status=str(response.status_code))
+    return response
+
+
+@metrics_registry.register_collector
+def _collect_household_sizes():
+    """List/history sizes over the households currently held in memory."""
+    hot = tenant_cache.snapshot()
+    current = [len(data.current.items) for _, data in hot]
+    history = [len(data.history) for _, data in hot]
+    yield ('grocery_cached_households', 'gauge', 'Households decoded in the tenant cache.', [({}, len(hot))])
+    yield ('grocery_current_items', 'gauge', 'Current list sizes across cached households.',
+           [({'stat': 'sum'}, sum(current)), ({'stat': 'max'}, max(current, default=0))])
+    yield ('grocery_history_trips', 'gauge', 'History lengths across cached households.',
+           [({'stat': 'sum'}, sum(history)), ({'stat': 'max'}, max(history, default=0))])
+
+
+# ==================== REQUEST PROFILING ====================
+
+profiles_captured_total = metrics_registry.counter(
+    'grocery_profiles_captured_total', 'Requests profiled on demand, by route.', ('route',))
+
+profile_store = ProfileStore(PROFILE_BUFFER_SIZE)
+
+
+def profiling_authorized() -> bool:
+    """Profiling is on and the request carries the admin token (X-Profile-Token header or ?profile_token=)."""
+    if not (PROFILING_ENABLED and PROFILING_TOKEN):
+        return False
+    token = request.headers.get('X-Profile-Token') or request.args.get('profile_token') or ''
+    return hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+@app.before_request
+def _start_request_profile():
+    if request.endpoint in ('profiles_index', 'profile_detail') or not profiling_authorized():
+        return
+    profiler = RequestProfiler(sample_interval=PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    if profiler.start():  # False while another request is being profiled
+        g.profiler = profiler
+        g.profile_started_at = datetime.now().isoformat()
+
+
+@app.after_request
+def _finish_request_profile(response):
+    """Store the capture and point the caller at it (X-Profile-Id). Streamed bodies are not covered."""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    duration, stats, collapsed, allocations = profiler.stop()
+    route = request.endpoint or 'unmatched'
+    profile_id = profile_store.add({
+        'route': route,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'startedAt': g.pop('profile_started_at'),
+        'durationMs': round(duration * 1000, 3),
+        'stats': stats,
+        'collapsed': collapsed,
+        'allocations': allocations,
+    })
+    profiles_captured_total.inc(route=route)
+    response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+# ==================== RESPONSE COMPRESSION ====================
+
+response_bytes = metrics_registry.histogram(
+    'grocery_response_bytes', 'Response body bytes on the wire by route and encoding.', ('route', 'encoding'),
+    buckets=(256,) + metrics.SIZE_BUCKETS)
+
+
+def _negotiate_encoding() -> Optional[str]:
+    """Best Content-Encoding the client accepts ('br', 'gzip' or None)."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br'] > 0:
+        return 'br'
+    if accepted['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with the given Content-Encoding."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(11, COMPRESS_LEVEL + 2))
+    return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+@app.after_request
+def _compress_response(response):
+    """Compress JSON/HTML/static text responses above COMPRESS_MIN_BYTES when the client allows it."""
+    route = request.endpoint or 'unmatched'
+    # send_file responses count as streamed but are a plain file (direct_passthrough); real streams are skipped
+    if ((response.is_streamed and not response.direct_passthrough)
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        if response.content_length is not None:
+            response_bytes.observe(response.content_length, route=route, encoding='identity')
+        return response
+
+    response.vary.add('Accept-Encoding')
+    response.direct_passthrough = False  # static files: read the file so it can be compressed
+    body = response.get_data()
+    encoding = _negotiate_encoding() if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        with timed_stage('compress'):
+            body = compress_body(body, encoding)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)  # same content, different bytes
+    response_bytes.observe(len(body), route=route, encoding=encoding or 'identity')
+    return response
+
+
+# ==================== STATIC ASSET FINGERPRINTS ====================
+
+@lru_cache(maxsize=64)
+def _hash_static_file(path: str, signature) -> str:
+    """Content hash of a static file (cached per file signature)."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def static_fingerprint(filename: str) -> Optional[str]:
+    """Short content hash used as the ?v= cache-buster for a static file."""
+    path = os.path.join(app.static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _hash_static_file(path, (stat.st_mtime_ns, stat.st_size))
+
+
+@app.url_defaults
+def _fingerprint_static_urls(endpoint, values):
+    """url_for('static', ...) -> /static/<file>?v=<hash>."""
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        fingerprint = static_fingerprint(values['filename'])
+        if fingerprint:
+            values['v'] = fingerprint
+
+
+@app.after_request
+def _cache_static_assets(response):
+    """Far-future caching for fingerprinted static URLs, revalidation for everything else."""
+    if request.endpoint == 'static' and response.status_code == 200:
+        filename = (request.view_args or {}).get('filename', '')
+        if request.args.get('v') and request.args.get('v') == static_fingerprint(filename):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+    return response
 
 
 # ==================== CATEGORY CONFIGURATION ====================
 
-CATEGORIES = {
-    "Produce": {
-        "emoji": "🍎",
-        "keywords": ["fruit", "vegetable", "apple", "banana", "lettuce", "tomato", "carrot", "onion", "potato", "orange", "grape", "berry", "melon", "pepper", "cucumber", "spinach", "broccoli", "celery"],
-        "order": 1
-    },
-    "Dairy": {
-        "emoji": "🥛",
-        "keywords": ["milk", "cheese", "yogurt", "butter", "cream", "sour cream", "cottage cheese", "cheddar", "mozzarella", "parmesan"],
-        "order": 2
-    },
-    "Meat & Seafood": {
-        "emoji": "🥩",
-        "keywords": ["beef", "chicken", "pork", "fish", "salmon", "shrimp", "turkey", "bacon", "sausage", "ham", "steak", "ground beef", "tuna", "cod"],
-        "order": 3
-    },
-    "Bakery": {
-        "emoji": "🍞",
-        "keywords": ["bread", "bagel", "croissant", "muffin", "pastry", "bun", "roll", "tortilla", "pita", "baguette"],
-        "order": 4
-    },
-    "Pantry": {
-        "emoji": "🥫",
-        "keywords": ["pasta", "rice", "beans", "sauce", "oil", "flour", "sugar", "salt", "pepper", "spice", "cereal", "oatmeal", "can", "jar"],
-        "order": 5
-    },
-    "Frozen": {
-        "emoji": "🧊",
-        "keywords": ["frozen", "ice cream", "pizza", "frozen vegetables", "frozen fruit", "popsicle", "ice"],
-        "order": 6
-    },
-    "Household": {
-        "emoji": "🧴",
-        "keywords": ["soap", "detergent", "paper towels", "cleaner", "shampoo", "toothpaste", "toilet paper", "tissue", "dish soap", "laundry"],
-        "order": 7
-    },
-    "Snacks": {
-        "emoji": "🍫",
-        "keywords": ["chips", "cookies", "candy", "popcorn", "crackers", "nuts", "chocolate", "pretzels", "granola"],
-        "order": 8
-    },
-    "Beverages": {
-        "emoji": "🥤",
-        "keywords": ["juice", "soda", "coffee", "tea", "water", "beer", "wine", "drink", "beverage"],
-        "order": 9
-    },
-    "Other": {
-        "emoji": "📦",
-        "keywords": [],
-        "order": 10
-    }
-}
+category_reloads_total = metrics_registry.counter(
+    'grocery_category_reloads_total', 'Category config reloads (file mtime changed).')
+
+taxonomy_loader = TaxonomyLoader(CATEGORY_CONFIG_FILE, check_interval=CATEGORY_RELOAD_SECONDS,
+                                 on_reload=lambda old, new: category_reloads_total.inc())
+
+
+def get_taxonomy() -> Taxonomy:
+    """The current compiled category taxonomy (hot-reloaded from CATEGORY_CONFIG_FILE)."""
+    return taxonomy_loader.get()
 
 
 # ==================== DATA MODELS ====================
@@ -92,6 +383,8 @@ class GroceryItem:
     def __post_init__(self):
         if self.addedAt is None:
             self.addedAt = datetime.now().isoformat()
+        if isinstance(self.category, str):
+            self.category = sys.intern(self.category)  # a dozen distinct values across every list
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
@@ -118,29 +411,164 @@ class CurrentList:
         }
 
 
+DATA_VERSION = "2.1"
+LEGACY_DATA_VERSION = "2.0"  # trips held full item copies, itemStats keyed by display name
+
+
+def catalog_key(name: str) -> str:
+    """Case/whitespace-insensitive identity of an item name ("Milk", " milk" -> "milk")."""
+    return ' '.join(name.split()).casefold()
+
+
+@dataclass(eq=False)
+class CatalogEntry:
+    """One distinct item: compact id, display name and category (both interned)."""
+    id: int
+    name: str
+    category: str = "Other"
+    key: str = field(init=False, repr=False)  # catalog_key(name)
+
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.category = sys.intern(self.category)
+        self.key = catalog_key(self.name)
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'category': self.category}
+
+
+class ItemCatalog:
+    """Canonical items of a household by integer id; case variants of a name share one entry."""
+
+    def __init__(self, entries=()):
+        self._by_id: Dict[int, CatalogEntry] = {}
+        self._by_key: Dict[str, CatalogEntry] = {}
+        self._words: Optional[List] = None  # sorted (word-start suffix of a key, id); built on first search
+        for entry in entries:
+            self._add(CatalogEntry(**entry) if isinstance(entry, dict) else entry)
+        self._next_id = max(self._by_id, default=0) + 1
+
+    def _add(self, entry: CatalogEntry) -> None:
+        self._by_id[entry.id] = entry
+        self._by_key[entry.key] = entry
+        if self._words is not None:
+            for word in self._word_keys(entry):
+                bisect.insort(self._words, word)
+
+    @staticmethod
+    def _word_keys(entry: CatalogEntry):
+        """("almond milk", id), ("milk", id): a query matches the start of any word."""
+        key = entry.key
+        starts = [0] + [index + 1 for index, char in enumerate(key) if char == ' ']
+        return [(key[start:], entry.id) for start in starts]
+
+    def search(self, prefix: str) -> List[CatalogEntry]:
+        """Entries with a word starting with `prefix` (case-insensitive), via bisect on the word index."""
+        prefix = catalog_key(prefix)
+        if not prefix:
+            return []
+        if self._words is None:
+            self._words = sorted(word for entry in self._by_id.values() for word in self._word_keys(entry))
+        found = {}
+        for index in range(bisect.bisect_left(self._words, (prefix,)), len(self._words)):
+            word, item_id = self._words[index]
+            if not word.startswith(prefix):
+                break
+            found.setdefault(item_id, self._by_id[item_id])
+        return list(found.values())
+
+    def intern(self, name: str, category: Optional[str] = None) -> CatalogEntry:
+        """Entry for `name`, created if new; a given category replaces the stored one."""
+        entry = self._by_key.get(catalog_key(name))
+        if entry is None:
+            entry = CatalogEntry(self._next_id, name.strip(), category or "Other")
+            self._next_id += 1
+            self._add(entry)
+        elif category and category != entry.category:
+            entry.category = sys.intern(category)
+        return entry
+
+    def get(self, item_id: int) -> Optional[CatalogEntry]:
+        return self._by_id.get(item_id)
+
+    def find(self, name: str) -> Optional[CatalogEntry]:
+        return self._by_key.get(catalog_key(name))
+
+    def adopt(self, entry: CatalogEntry) -> CatalogEntry:
+        """This catalog's entry for another catalog's item (an existing category is kept)."""
+        return self.find(entry.name) or self.intern(entry.name, entry.category)
+
+    def retain(self, item_ids) -> int:
+        """Drop entries whose id is not in item_ids; returns how many were removed."""
+        keep = set(item_ids)
+        dropped = [entry for item_id, entry in self._by_id.items() if item_id not in keep]
+        for entry in dropped:
+            del self._by_id[entry.id]
+            del self._by_key[entry.key]
+        if dropped:
+            self._words = None
+        return len(dropped)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def to_list(self):
+        return [entry.to_dict() for entry in self._by_id.values()]
+
+
+class TripItem(NamedTuple):
+    """One line of a completed trip: a catalog entry and whether it was bought.
+
+    Stored as [catalog id, checked]; the per-list uuid and timestamps of the
+    original GroceryItem are not kept in history.
+    """
+    entry: CatalogEntry
+    checked: bool
+
+    @property
+    def name(self) -> str:
+        return self.entry.name
+
+    @property
+    def category(self) -> str:
+        return self.entry.category
+
+    def to_dict(self):
+        """Self-contained form (API responses, exports)."""
+        return {'name': self.entry.name, 'category': self.entry.category, 'checked': self.checked}
+
+
 @dataclass
 class ShoppingTrip:
     """Represents a completed shopping trip."""
     id: str
     date: str
     completedAt: str
-    items: List[GroceryItem]
+    items: List[TripItem]
     totalItems: int
     checkedItems: int
-    
-    def __post_init__(self):
-        if isinstance(self.items, list) and len(self.items) > 0:
-            if isinstance(self.items[0], dict):
-                # Convert dicts to GroceryItem objects
-                self.items = [GroceryItem(**item) for item in self.items]
-    
+
+    @classmethod
+    def from_dict(cls, trip: Dict, catalog: ItemCatalog) -> 'ShoppingTrip':
+        """Decode a stored trip whose items are [catalog id, checked] pairs."""
+        items = []
+        for item_id, checked in trip['items']:
+            entry = catalog.get(item_id)
+            if entry is None:
+                raise ValueError(f"trip {trip.get('id')}: unknown catalog id {item_id}")
+            items.append(TripItem(entry, checked))
+        return cls(**{**trip, 'items': items})
+
     def to_dict(self):
-        """Convert to dictionary for JSON serialization."""
+        """Convert to dictionary for JSON serialization (items as catalog references)."""
         return {
             'id': self.id,
             'date': self.date,
             'completedAt': self.completedAt,
-            'items': [item.to_dict() for item in self.items],
+            'items': [[item.entry.id, item.checked] for item in self.items],
             'totalItems': self.totalItems,
             'checkedItems': self.checkedItems
         }
@@ -148,12 +576,18 @@ class ShoppingTrip:
 
 @dataclass
 class ItemStats:
-    """Statistics for a specific item."""
+    """Statistics for a specific item (keyed by catalog id; the category lives in the catalog)."""
     lastBought: Optional[str] = None
     totalPurchases: int = 0
     averageFrequency: Optional[int] = None  # days
-    category: str = "Other"
     
+    def merge(self, other: 'ItemStats') -> None:
+        """Fold in stats recorded under another spelling of the same item."""
+        if other.totalPurchases > self.totalPurchases:
+            self.averageFrequency = other.averageFrequency or self.averageFrequency
+        self.totalPurchases += other.totalPurchases
+        self.lastBought = max(filter(None, (self.lastBought, other.lastBought)), default=None)
+
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
         return asdict(self)
@@ -165,31 +599,73 @@ class GroceryData:
     version: str
     current: CurrentList
     history: List[ShoppingTrip]
-    itemStats: Dict[str, ItemStats]
+    itemStats: Dict[int, ItemStats]  # catalog id -> stats
+    appliedOps: Dict[str, Dict] = field(default_factory=dict)  # /batch op id -> result (replay dedupe)
+    catalog: ItemCatalog = field(default_factory=ItemCatalog)
     
     def __post_init__(self):
         # Convert current to CurrentList if it's a dict
         if isinstance(self.current, dict):
             self.current = CurrentList(**self.current)
-        
-        # Convert history items to ShoppingTrip if they're dicts
+
+        if isinstance(self.catalog, list):
+            self.catalog = ItemCatalog(self.catalog)
+
+        if self.version == LEGACY_DATA_VERSION:
+            self._upgrade_from_legacy()
+            return
+
+        # Convert stored trips ([catalog id, checked] items) to ShoppingTrip
         if isinstance(self.history, list) and len(self.history) > 0:
             if isinstance(self.history[0], dict):
-                self.history = [ShoppingTrip(**trip) for trip in self.history]
+                self.history = [ShoppingTrip.from_dict(trip, self.catalog) for trip in self.history]
         
-        # Convert itemStats values to ItemStats if they're dicts
+        # JSON object keys are strings: convert back to catalog ids and ItemStats
         if isinstance(self.itemStats, dict):
-            for key, value in self.itemStats.items():
-                if isinstance(value, dict):
-                    self.itemStats[key] = ItemStats(**value)
-    
+            self.itemStats = {
+                int(key): ItemStats(**value) if isinstance(value, dict) else value
+                for key, value in self.itemStats.items()
+            }
+
+    def _upgrade_from_legacy(self):
+        """Migrate a 2.0 document: intern trip items and name-keyed stats into the catalog.
+
+        The latest category seen for a name wins, and stats of case variants
+        ("milk", "Milk") are merged into one entry.
+        """
+        history = []
+        for trip in self.history:
+            items = [TripItem(self.catalog.intern(item['name'], item.get('category')), bool(item.get('checked')))
+                     for item in trip['items']]
+            history.append(ShoppingTrip(**{**trip, 'items': items}))
+        self.history = history
+
+        item_stats = {}
+        for name, value in self.itemStats.items():
+            value = dict(value)
+            entry = self.catalog.intern(name, value.pop('category', None))
+            stats = ItemStats(**value)
+            if entry.id in item_stats:
+                item_stats[entry.id].merge(stats)
+            else:
+                item_stats[entry.id] = stats
+        self.itemStats = item_stats
+        self.version = DATA_VERSION
+
+    def stats_for(self, name: str) -> Optional[ItemStats]:
+        """Purchase stats for an item name (any capitalization)."""
+        entry = self.catalog.find(name)
+        return self.itemStats.get(entry.id) if entry else None
+
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
         return {
             'version': self.version,
             'current': self.current.to_dict(),
+            'catalog': self.catalog.to_list(),
             'history': [trip.to_dict() for trip in self.history],
-            'itemStats': {key: stats.to_dict() for key, stats in self.itemStats.items()}
+            'itemStats': {str(key): stats.to_dict() for key, stats in self.itemStats.items()},
+            'appliedOps': self.appliedOps
         }
 
 
@@ -211,59 +687,481 @@ def write_grocery_list(items):
             f.write(f"{item}\n")
 
 
+# ==================== HOUSEHOLD STORAGE ====================
+
+class HouseholdIdConverter(BaseConverter):
+    """URL converter that only accepts safe household ids (used as shard file names)."""
+    regex = r'[A-Za-z0-9_-]{1,64}'
+
+
+app.url_map.converters['household'] = HouseholdIdConverter
+
+
+def household_route(rule, **options):
+    """Register a view for the default household and under /h/<household_id>."""
+    def decorator(view):
+        app.route(rule, defaults={'household_id': DEFAULT_HOUSEHOLD}, **options)(view)
+        app.route(f'/h/<household:household_id>{rule}', **options)(view)
+        return view
+    return decorator
+
+
+def household_data_file(household_id: str) -> str:
+    """Return the storage shard path for a household."""
+    if household_id == DEFAULT_HOUSEHOLD:
+        return GROCERY_DATA_FILE
+    return os.path.join(GROCERY_DATA_DIR, f"{household_id}.json")
+
+
+def _file_signature(path: str):
+    """Cheap change detector for a shard (lets other workers' writes invalidate our cache)."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class TenantCache:
+    """LRU of decoded GroceryData for hot households."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # household_id -> (signature, GroceryData)
+        self._lock = threading.Lock()
+
+    def get(self, household_id: str, signature):
+        """Return cached data if it still matches the shard's signature."""
+        with self._lock:
+            entry = self._entries.get(household_id)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(household_id)
+            return entry[1]
+
+    def put(self, household_id: str, signature, data) -> None:
+        """Cache decoded data, evicting the least recently used households."""
+        with self._lock:
+            self._entries[household_id] = (signature, data)
+            self._entries.move_to_end(household_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, household_id: str) -> None:
+        """Drop a household from the cache."""
+        with self._lock:
+            self._entries.pop(household_id, None)
+
+    def snapshot(self):
+        """Return (household_id, data) pairs currently cached."""
+        with self._lock:
+            return [(household_id, entry[1]) for household_id, entry in self._entries.items()]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+tenant_cache = TenantCache(TENANT_CACHE_SIZE)
+_household_locks = {}  # household_id -> RLock
+_household_locks_guard = threading.Lock()
+
+
+@contextmanager
+def household_lock(household_id: str):
+    """Serialize load-modify-persist cycles for one household only.
+
+    If the block raises, the cached copy is dropped so a half-applied
+    in-memory mutation is never served.
+    """
+    with _household_locks_guard:
+        lock = _household_locks.get(household_id)
+        if lock is None:
+            lock = _household_locks[household_id] = threading.RLock()
+    with lock:
+        try:
+            yield
+        except Exception:
+            tenant_cache.evict(household_id)
+            if write_behind is not None:
+                write_behind.rollback(household_id)
+            raise
+
+
 # ==================== FILE OPERATIONS (V2 - JSON) ====================
 
-def read_grocery_data() -> GroceryData:
-    """Read grocery data from JSON file."""
+@instrumented_stage('read_grocery_data')
+def read_grocery_data(household_id: str = DEFAULT_HOUSEHOLD) -> GroceryData:
+    """Read grocery data for a household (served from the tenant cache when fresh)."""
+    if write_behind is not None:
+        pending = write_behind.pending(household_id)
+        if pending is not None:
+            return pending
+
+    data_file = household_data_file(household_id)
     try:
-        with open(GROCERY_DATA_FILE, 'r') as f:
-            data = json.load(f)
-            return GroceryData(**data)
+        signature = _file_signature(data_file)
     except FileNotFoundError:
         # Initialize with empty data structure
         return _create_empty_grocery_data()
+
+    cached = tenant_cache.get(household_id, signature)
+    if cached is not None:
+        return cached
+
+    try:
+        with open(data_file, 'r') as f:
+            data = GroceryData(**json.load(f))
+    except FileNotFoundError:
+        return _create_empty_grocery_data()
     except json.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
         # Backup corrupted file and create new one
-        if os.path.exists(GROCERY_DATA_FILE):
-            backup_file = f"{GROCERY_DATA_FILE}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            os.rename(GROCERY_DATA_FILE, backup_file)
+        tenant_cache.evict(household_id)
+        if os.path.exists(data_file):
+            backup_file = f"{data_file}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            os.rename(data_file, backup_file)
             print(f"Corrupted file backed up to: {backup_file}")
         return _create_empty_grocery_data()
 
+    errors = validate_household_data(data, household_id, revision=signature)
+    if errors:
+        print(f"Validation: {len(errors)} problem(s) in household '{household_id}': {errors[:3]}")
+
+    tenant_cache.put(household_id, signature, data)
+    return data
+
+
+@instrumented_stage('write_grocery_data')
+def write_grocery_data(data: GroceryData, household_id: str = DEFAULT_HOUSEHOLD,
+                       changes: Optional['Changes'] = None) -> None:
+    """Persist grocery data for a household.
+
+    `changes` lists the records the caller added or modified; when given,
+    only those are validated (see ValidationCache), otherwise the whole
+    document is.
+
+    Writes through immediately, or with WRITE_COALESCE_MS > 0 hands the
+    snapshot to the write-behind flusher (in 'commit' durability mode the
+    response still waits for that flush).
+    """
+    errors = validate_household_data(data, household_id, changes=changes)
+    if errors:
+        if STRICT_VALIDATION:
+            raise ValueError(f"Refusing to save invalid data for '{household_id}': {errors[:3]}")
+        print(f"Validation: saving household '{household_id}' with {len(errors)} problem(s): {errors[:3]}")
+
+    with timed_stage('json_encode'):
+        payload = json.dumps(data.to_dict(), indent=2).encode('utf-8')
+
+    if write_behind is None:
+        _persist_grocery_data(household_id, payload, data, fsync=WRITE_DURABILITY != 'os')
+        return
+
+    ticket = write_behind.submit(household_id, payload, data)
+    if WRITE_DURABILITY == 'commit':
+        if has_request_context():
+            # Wait in after_request, once the household lock is released, so
+            # concurrent requests for the same household share one flush
+            g.flush_ticket = ticket
+        else:
+            ticket.wait()
+
+
+def _fsync_directory(path: str) -> None:
+    """Make a rename in `path` durable."""
+    fd = os.open(path or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
-def write_grocery_data(data: GroceryData) -> None:
-    """Write grocery data to JSON file with atomic write."""
-    # Create backup before writing
-    if os.path.exists(GROCERY_DATA_FILE):
-        backup_file = f"{GROCERY_DATA_FILE}.backup"
+def _persist_grocery_data(household_id: str, payload: bytes, data: GroceryData, fsync: bool = False) -> None:
+    """Write an encoded snapshot to the household's JSON shard with atomic write."""
+    data_file = household_data_file(household_id)
+    data_dir = os.path.dirname(data_file)
+    if data_dir:
+        os.makedirs(data_dir, exist_ok=True)
+
+    # Keep the previous committed version as a snapshot (a hard link: no data copy)
+    if os.path.exists(data_file):
         try:
-            with open(GROCERY_DATA_FILE, 'r') as f:
-                with open(backup_file, 'w') as bf:
-                    bf.write(f.read())
+            take_snapshot(household_id)
         except Exception as e:
-            print(f"Backup creation failed: {e}")
+            print(f"Snapshot creation failed: {e}")
     
     # Write to temporary file first (atomic write)
-    temp_file = f"{GROCERY_DATA_FILE}.tmp"
+    temp_file = f"{data_file}.tmp"
     try:
-        with open(temp_file, 'w') as f:
-            json.dump(data.to_dict(), f, indent=2)
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        write_bytes.observe(len(payload))
         
         # Rename temp file to actual file (atomic operation)
-        os.replace(temp_file, GROCERY_DATA_FILE)
+        os.replace(temp_file, data_file)
+        if fsync:
+            _fsync_directory(data_dir)
     except Exception as e:
         print(f"Write failed: {e}")
+        tenant_cache.evict(household_id)
         # Clean up temp file if it exists
         if os.path.exists(temp_file):
             os.remove(temp_file)
         raise
 
+    tenant_cache.put(household_id, _file_signature(data_file), data)
+
+
+# ==================== SNAPSHOTS ====================
+
+SNAPSHOT_TIME_FORMAT = '%Y%m%dT%H%M%S%f'
+
+
+def household_snapshot_dir(household_id: str) -> str:
+    """Directory holding a household's snapshots."""
+    return os.path.join(GROCERY_SNAPSHOT_DIR, household_id)
+
+
+def take_snapshot(household_id: str, now: Optional[datetime] = None) -> Optional[str]:
+    """Hard-link the household's committed shard into its snapshot directory.
+
+    Shards are only ever replaced (tmp file + os.replace), never modified in
+    place, so the link keeps the old version intact at no I/O cost. Falls back
+    to a copy on filesystems without hard links. Returns the snapshot path.
+    Retention is applied by the snapshot_rotation maintenance job.
+    """
+    data_file = household_data_file(household_id)
+    snapshot_dir = household_snapshot_dir(household_id)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    snapshot_path = os.path.join(snapshot_dir, f"{(now or datetime.now()).strftime(SNAPSHOT_TIME_FORMAT)}.json")
+    try:
+        os.link(data_file, snapshot_path)
+    except FileNotFoundError:
+        return None
+    except FileExistsError:
+        return snapshot_path
+    except OSError:
+        shutil.copy2(data_file, snapshot_path)
+    return snapshot_path
+
+
+def list_snapshots(household_id: str):
+    """Return [(taken_at, path)] for a household, newest first."""
+    snapshot_dir = household_snapshot_dir(household_id)
+    try:
+        names = os.listdir(snapshot_dir)
+    except FileNotFoundError:
+        return []
+    snapshots = []
+    for name in names:
+        try:
+            taken_at = datetime.strptime(name[:-len('.json')], SNAPSHOT_TIME_FORMAT)
+        except ValueError:
+            continue
+        snapshots.append((taken_at, os.path.join(snapshot_dir, name)))
+    snapshots.sort(reverse=True)
+    return snapshots
+
+
+def snapshots_to_keep(snapshots, now: datetime):
+    """Retention policy: the newest SNAPSHOT_KEEP_RECENT, then the newest per hour / per day.
+
+    `snapshots` is newest-first [(taken_at, path)]; returns the set of paths to keep.
+    """
+    keep = {path for _, path in snapshots[:SNAPSHOT_KEEP_RECENT]}
+    hourly_cutoff = now - timedelta(hours=SNAPSHOT_HOURLY_HOURS)
+    daily_cutoff = now - timedelta(days=SNAPSHOT_DAILY_DAYS)
+    seen_buckets = set()
+    for taken_at, path in snapshots:
+        if taken_at >= hourly_cutoff:
+            bucket = ('hour', taken_at.strftime('%Y%m%d%H'))
+        elif taken_at >= daily_cutoff:
+            bucket = ('day', taken_at.strftime('%Y%m%d'))
+        else:
+            continue
+        if bucket not in seen_buckets:
+            seen_buckets.add(bucket)
+            keep.add(path)
+    return keep
+
+
+def rotate_snapshots(household_id: str, now: Optional[datetime] = None) -> int:
+    """Delete snapshots outside the retention policy; returns how many were removed."""
+    snapshots = list_snapshots(household_id)
+    keep = snapshots_to_keep(snapshots, now or datetime.now())
+    removed = 0
+    for _, path in snapshots:
+        if path not in keep:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def restore_snapshot(household_id: str, snapshot_path: str) -> None:
+    """Roll a household back to a snapshot (the current version is snapshotted first)."""
+    with open(snapshot_path, 'r') as f:
+        GroceryData(**json.load(f))  # refuse to restore something unreadable
+
+    with household_lock(household_id):
+        flush_pending_writes()
+        data_file = household_data_file(household_id)
+        temp_file = f"{data_file}.tmp"
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        # Stage the snapshot first: snapshotting the current version may rotate it away
+        try:
+            os.link(snapshot_path, temp_file)
+        except OSError:
+            shutil.copy2(snapshot_path, temp_file)
+        if os.path.exists(data_file):
+            take_snapshot(household_id)
+        os.replace(temp_file, data_file)
+        tenant_cache.evict(household_id)
+
+
+# ==================== WRITE-BEHIND ====================
+
+storage_flushes_total = metrics_registry.counter(
+    'grocery_storage_flushes_total', 'Write-behind flushes by outcome.', ('outcome',))
+storage_coalesced_writes = metrics_registry.histogram(
+    'grocery_storage_coalesced_writes', 'Mutations persisted per shard write by the write-behind flusher.',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250))
+
+
+class FlushTicket:
+    """Completion handle for one flush window (used by 'commit' durability)."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.error = None
+
+    def resolve(self, error=None):
+        self.error = error
+        self._done.set()
+
+    def wait(self):
+        """Block until the window holding this mutation is on disk; re-raise its write error."""
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class WriteBehindBuffer:
+    """Latest unflushed snapshot per household, persisted by one background thread.
+
+    Mutations land in memory immediately (read_grocery_data consults pending()
+    first); the flusher wakes `window` seconds after the first dirty mark and
+    writes each dirty household once, however many mutations it absorbed. A
+    household stays visible through pending() until its shard is replaced,
+    so a reader never falls back to the older file mid-flush.
+    Snapshots are encoded by the caller under its household lock, so the
+    flusher never needs that lock (a 'commit' waiter still holds it).
+    """
+
+    def __init__(self, window: float, fsync: bool):
+        self.window = window
+        self.fsync = fsync
+        self._pending = {}  # household_id -> (payload, data, mutation count)
+        self._inflight = {}  # same, for the batch being written right now
+        self._ticket = FlushTicket()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one flush at a time (flusher thread or shutdown)
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def submit(self, household_id: str, payload: bytes, data: GroceryData) -> FlushTicket:
+        """Stage a household snapshot for the next flush; returns that flush's ticket."""
+        with self._cond:
+            previous = self._pending.get(household_id)
+            self._pending[household_id] = (payload, data, (previous[2] if previous else 0) + 1)
+            self._cond.notify()
+            return self._ticket
+
+    def pending(self, household_id: str) -> Optional[GroceryData]:
+        """Unflushed data for a household, if any."""
+        with self._cond:
+            entry = self._pending.get(household_id) or self._inflight.get(household_id)
+            return entry[1] if entry else None
+
+    def rollback(self, household_id: str) -> None:
+        """Rebuild pending data from its encoded snapshot (drops a half-applied in-memory mutation)."""
+        with self._cond:
+            for staged in (self._pending, self._inflight):
+                entry = staged.get(household_id)
+                if entry:
+                    payload, _, mutations = entry
+                    staged[household_id] = (payload, GroceryData(**json.loads(payload)), mutations)
+                    return
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.window)  # let the burst accumulate
+            self.flush()
+
+    def flush(self) -> None:
+        """Persist everything pending now (also called at shutdown)."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                self._inflight = dict(batch)
+                ticket, self._ticket = self._ticket, FlushTicket()
+            if not batch:
+                ticket.resolve()
+                return
+
+            error = None
+            for household_id, (payload, data, mutations) in batch.items():
+                try:
+                    with timed_stage('write_behind_flush'):
+                        _persist_grocery_data(household_id, payload, data, fsync=self.fsync)
+                    storage_coalesced_writes.observe(mutations)
+                    storage_flushes_total.inc(outcome='ok')
+                    with self._cond:
+                        if self._inflight.pop(household_id)[1] is not data:
+                            tenant_cache.evict(household_id)  # rolled back mid-flush: re-read the shard
+                except Exception as e:
+                    error = e
+                    storage_flushes_total.inc(outcome='error')
+                    with self._cond:
+                        # Keep it for the next window unless a newer snapshot arrived meanwhile
+                        self._pending.setdefault(household_id, self._inflight.pop(household_id))
+            ticket.resolve(error)
+
+
+@app.after_request
+def _await_durable_commit(response):
+    """'commit' durability: answer only once this request's mutations are on disk."""
+    ticket = g.pop('flush_ticket', None)
+    if ticket is not None:
+        try:
+            ticket.wait()
+        except Exception as e:
+            print(f"Write-behind flush failed: {e}")
+            response = jsonify({'error': 'Failed to persist changes'})
+            response.status_code = 500
+    return response
+
+
+write_behind = WriteBehindBuffer(WRITE_COALESCE_MS / 1000, fsync=WRITE_DURABILITY != 'os') if WRITE_COALESCE_MS > 0 else None
+
+
+@atexit.register
+def flush_pending_writes():
+    """Guaranteed flush on interpreter shutdown (also call it from server shutdown hooks)."""
+    if write_behind is not None:
+        write_behind.flush()
+
 
 def _create_empty_grocery_data() -> GroceryData:
     """Create an empty grocery data structure."""
     return GroceryData(
-        version="2.0",
+        version=DATA_VERSION,
         current=CurrentList(
             date=datetime.now().strftime('%Y-%m-%d'),
             items=[]
@@ -289,12 +1187,12 @@ def migrate_v1_to_v2() -> GroceryData:
     # Create new structure
     new_data = _create_empty_grocery_data()
     
-    # Convert items (we'll add category detection in next task)
+    # Convert items (keyword categories only: no model calls at startup)
     for item_name in old_items:
         new_item = GroceryItem(
             id=str(uuid.uuid4()),
             name=item_name,
-            category="Other",  # Will be updated with category detection
+            category=detect_category_fallback(item_name),
             checked=False,
             addedAt=datetime.now().isoformat(),
             checkedAt=None
@@ -315,7 +1213,11 @@ def migrate_v1_to_v2() -> GroceryData:
 
 
 def ensure_data_initialized():
-    """Ensure grocery data is initialized, migrate if needed."""
+    """Ensure grocery data is initialized, migrate if needed.
+
+    Only the default household has a v1 file to migrate; other households'
+    shards are created on their first write (a missing shard reads as empty).
+    """
     if not os.path.exists(GROCERY_DATA_FILE):
         # Check if v1 file exists
         if os.path.exists(GROCERY_FILE):
@@ -326,164 +1228,760 @@ def ensure_data_initialized():
             write_grocery_data(_create_empty_grocery_data())
 
 
+def migrate_legacy_households() -> List[str]:
+    """Rewrite 2.0 shards (full item copies in history) in the 2.1 catalog format; returns migrated ids.
+
+    Reads upgrade 2.0 documents in memory anyway; this makes the smaller
+    format stick without waiting for each household's next write.
+    """
+    migrated = []
+    for household_id in known_households():
+        try:
+            with open(household_data_file(household_id), 'r') as f:
+                version = json.load(f).get('version')
+        except (OSError, ValueError):
+            continue  # unreadable shards are handled (and backed up) by read_grocery_data
+        if version != LEGACY_DATA_VERSION:
+            continue
+        with household_lock(household_id):
+            write_grocery_data(read_grocery_data(household_id), household_id)
+        migrated.append(household_id)
+    if migrated:
+        print(f"Migrated {len(migrated)} household(s) to data format {DATA_VERSION}: {', '.join(migrated)}")
+    return migrated
+
+
+# ==================== VALIDATION ====================
+
+validation_errors_total = metrics_registry.counter(
+    'grocery_validation_errors_total', 'Validation problems found, by section.', ('section',))
+
+
+def _validate_item(item, where: str) -> List[str]:
+    """Problems with one GroceryItem."""
+    if not isinstance(item, GroceryItem):
+        return [f"{where}: not an item ({type(item).__name__})"]
+    errors = []
+    if not item.id or not item.name or not item.category:
+        errors.append(f"{where}: missing id/name/category")
+    if not isinstance(item.checked, bool):
+        errors.append(f"{where}: checked is not a boolean")
+    return errors
+
+
+def _validate_trip(trip, strict: bool = False) -> List[str]:
+    """Problems with one ShoppingTrip (strict also cross-checks its counters)."""
+    if not isinstance(trip, ShoppingTrip):
+        return [f"history: not a trip ({type(trip).__name__})"]
+    where = f"trip {trip.id}"
+    if not trip.id or not trip.completedAt or not isinstance(trip.items, list):
+        return [f"{where}: missing id/completedAt/items"]
+    errors = []
+    for item in trip.items:
+        if not isinstance(item, TripItem) or not item.entry.name or not isinstance(item.checked, bool):
+            errors.append(f"{where}: bad item {item!r}")
+    if strict and trip.totalItems != len(trip.items):
+        errors.append(f"{where}: totalItems {trip.totalItems} != {len(trip.items)} items")
+    return errors
+
+
+def _validate_stats(item_id: int, stats, catalog: ItemCatalog) -> List[str]:
+    """Problems with one itemStats entry."""
+    if not isinstance(stats, ItemStats):
+        return [f"itemStats {item_id!r}: not stats ({type(stats).__name__})"]
+    if catalog.get(item_id) is None:
+        return [f"itemStats {item_id!r}: not in the item catalog"]
+    if not isinstance(stats.totalPurchases, int) or stats.totalPurchases < 0:
+        return [f"itemStats {item_id!r}: bad totalPurchases"]
+    return []
+
+
+class Changes(NamedTuple):
+    """Records a mutation added or modified, so a write validates only those (removals need no check)."""
+    items: tuple = ()
+    trips: tuple = ()
+    stats: tuple = ()  # catalog ids whose itemStats changed
+
+
+class ValidationCache:
+    """Per household: the shard revision and the in-memory document that last validated clean.
+
+    A read of a revision that validated clean is skipped outright. A write
+    of that same document that passes its Changes checks only the changed
+    records. Anything else (another object, no Changes) is a full pass.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # household_id -> {'revision', 'document' (weakref)}
+        self._lock = threading.Lock()
+
+    def entry(self, household_id: str) -> Dict:
+        with self._lock:
+            entry = self._entries.get(household_id)
+            if entry is None:
+                entry = self._entries[household_id] = {'revision': None, 'document': None}
+            self._entries.move_to_end(household_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return entry
+
+
+validation_cache = ValidationCache(TENANT_CACHE_SIZE)
+
+
+def _validate_records(data: GroceryData, items, trips, stats, strict: bool = False) -> List[str]:
+    """Per-record checks for the given items, trips and (item id, stats) pairs."""
+    errors = []
+    sections = (
+        ('items', items, lambda item: _validate_item(item, 'current')),
+        ('trips', trips, lambda trip: _validate_trip(trip, strict)),
+        ('stats', stats, lambda entry: _validate_stats(*entry, data.catalog)),
+    )
+    for section, records, validate in sections:
+        for record in records:
+            problems = validate(record)
+            if problems:
+                validation_errors_total.inc(len(problems), section=section)
+                errors.extend(problems)
+    return errors
+
+
+@instrumented_stage('validate')
+def validate_household_data(data: GroceryData, household_id: Optional[str] = None, revision=None,
+                            changes: Optional[Changes] = None, strict: bool = False) -> List[str]:
+    """Validate grocery data; returns a list of problems (empty if valid).
+
+    Incremental with a household id: a revision that already validated clean
+    is skipped, and `changes` to the document that last validated clean are
+    the only records checked. strict=True walks everything and adds
+    cross-record checks (unique ids, trip counters, history order, known
+    categories).
+    """
+    if not data.version or data.version != DATA_VERSION:
+        return [f"invalid version: {data.version}"]
+    if not isinstance(data.current, CurrentList) or not isinstance(data.current.items, list):
+        return ["invalid current list structure"]
+    if not isinstance(data.history, list) or not isinstance(data.itemStats, dict):
+        return ["invalid history/itemStats structure"]
+
+    cache = validation_cache.entry(household_id) if household_id and not strict else None
+    if cache is not None and revision is not None and cache['revision'] == revision:
+        cache['document'] = weakref.ref(data)
+        return []
+
+    clean_before = cache is not None and cache['document'] is not None and cache['document']() is data
+    if changes is not None and clean_before:
+        stats = [(item_id, data.itemStats[item_id]) for item_id in changes.stats if item_id in data.itemStats]
+        errors = _validate_records(data, changes.items, changes.trips, stats)
+    else:
+        errors = _validate_records(data, data.current.items, data.history, data.itemStats.items(), strict)
+        if strict:
+            errors.extend(_cross_check(data))
+
+    if cache is not None:
+        cache['revision'] = revision if not errors else None
+        cache['document'] = weakref.ref(data) if not errors else None
+    return errors
+
+
+def _cross_check(data: GroceryData) -> List[str]:
+    """Whole-document invariants only a full pass can see (strict mode)."""
+    errors = []
+    item_ids = [item.id for item in data.current.items]
+    if len(item_ids) != len(set(item_ids)):
+        errors.append("current: duplicate item ids")
+    trip_ids = [trip.id for trip in data.history]
+    if len(trip_ids) != len(set(trip_ids)):
+        errors.append("history: duplicate trip ids")
+    completed = [trip.completedAt for trip in data.history]
+    if completed != sorted(completed):
+        errors.append("history: trips out of completedAt order")
+    names = [catalog_key(entry.name) for entry in data.catalog]
+    if len(names) != len(set(names)):
+        errors.append("catalog: duplicate item names")
+    unknown = {item.category for item in data.current.items} - set(get_taxonomy().names)
+    if unknown:
+        errors.append(f"current: unknown categories {sorted(unknown)}")
+    if errors:
+        validation_errors_total.inc(len(errors), section='cross_check')
+    return errors
+
+
 def validate_grocery_data(data: GroceryData) -> bool:
-    """Validate grocery data structure."""
-    try:
-        # Check version
-        if not data.version or data.version != "2.0":
-            print(f"Invalid version: {data.version}")
-            return False
-        
-        # Check current list
-        if not isinstance(data.current, CurrentList):
-            print("Invalid current list structure")
-            return False
-        
-        # Check current list items
-        if not isinstance(data.current.items, list):
-            print("Invalid current items structure")
-            return False
-        
-        for item in data.current.items:
-            if not isinstance(item, GroceryItem):
-                print(f"Invalid item structure: {item}")
-                return False
-            if not item.id or not item.name or not item.category:
-                print(f"Missing required fields in item: {item}")
-                return False
-        
-        # Check history
-        if not isinstance(data.history, list):
-            print("Invalid history structure")
-            return False
-        
-        for trip in data.history:
-            if not isinstance(trip, ShoppingTrip):
-                print(f"Invalid trip structure: {trip}")
-                return False
-        
-        # Check itemStats
-        if not isinstance(data.itemStats, dict):
-            print("Invalid itemStats structure")
-            return False
-        
-        return True
-    
-    except Exception as e:
-        print(f"Validation error: {e}")
-        return False
+    """Full deep check of a grocery data structure (prints problems)."""
+    errors = validate_household_data(data, strict=True)
+    for error in errors:
+        print(f"Validation error: {error}")
+    return not errors
 
 
 # ==================== CATEGORY DETECTION ====================
 
 def detect_category_fallback(item_name: str) -> str:
-    """Detect category using keyword matching (fallback when AI fails)."""
-    item_lower = item_name.lower()
-    
-    # Check each category's keywords
-    for category, config in CATEGORIES.items():
-        if category == "Other":
-            continue  # Skip "Other" for now
-        
-        for keyword in config["keywords"]:
-            if keyword in item_lower:
-                return category
-    
-    # Default to "Other" if no match found
-    return "Other"
+    """Detect category using keyword matching, then the local classifier (fallback when AI fails)."""
+    category = get_taxonomy().match_keyword(item_name)
+    if category == "Other":
+        category = classify_items([item_name])[0] or category
+    return category
 
 
 def validate_category(category: str) -> str:
     """Validate category and return valid category or fallback to 'Other'."""
-    if category in CATEGORIES:
-        return category
-    
-    # Try case-insensitive match
-    for valid_category in CATEGORIES.keys():
-        if valid_category.lower() == category.lower():
-            return valid_category
+    canonical = get_taxonomy().canonical(category)
+    if canonical:
+        return canonical
     
     # Invalid category, return "Other"
     print(f"Invalid category '{category}', defaulting to 'Other'")
     return "Other"
 
 
+# ==================== CATEGORY CLASSIFIER ====================
+
+category_classifier: Optional[CategoryClassifier] = None  # replaced whole on each training run
+_classifier_labels_mtime: Optional[int] = None  # labels file version the current model was fit on
+
+classifier_items_total = metrics_registry.counter(
+    'grocery_classifier_items_total', 'Item names scored by the local category classifier, by outcome.',
+    ('outcome',))
+
+# Words that make a part a phrase for the model ("2 lbs of apples", "mac and cheese"), not a plain name
+PHRASE_WORDS = frozenset(['a', 'an', 'and', 'buy', 'for', 'get', 'grab', 'i', 'need', 'of', 'or', 'pick',
+                          'some', 'the', 'we', 'with'])
+
+
+@metrics_registry.register_collector
+def _collect_classifier_state():
+    model = category_classifier
+    yield ('grocery_classifier_training_examples', 'gauge', 'Examples the current category classifier was fit on.',
+           [({}, model.examples if model else 0)])
+    yield ('grocery_classifier_vocabulary_size', 'gauge', 'Distinct n-grams known to the category classifier.',
+           [({}, len(model.vocabulary) if model else 0)])
+
+
+def _shard_labels(household_id: str) -> Dict[str, Tuple[str, str]]:
+    """{catalog key: (name, category)} from one shard's catalog and current list, read straight from disk.
+
+    No household lock or tenant cache: shards are replaced atomically, so a
+    plain read sees a whole committed version, and a scan of every household
+    doesn't evict the hot ones from the cache.
+    """
+    try:
+        with open(household_data_file(household_id), 'r') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    labels = {}
+    for record in raw.get('catalog', []) + raw.get('current', {}).get('items', []):
+        if isinstance(record, dict) and isinstance(record.get('name'), str):
+            labels.setdefault(catalog_key(record['name']), (record['name'], record.get('category', "Other")))
+    return labels
+
+
+def collect_category_labels() -> int:
+    """Write consensus (name, category) labels from a sample of households to CLASSIFIER_LABELS_FILE.
+
+    At most CLASSIFIER_SAMPLE_HOUSEHOLDS households are read per run, and
+    at most CLASSIFIER_MAX_LABELS distinct names are kept. Each household gets
+    one vote per name and a name takes its majority category, so one
+    household's odd choices don't become everyone's default (its own catalog
+    still wins for itself). "Other" votes are left out: it is also what
+    failed parses fall back to, so it says little about the item. Returns
+    the number of labels written.
+    """
+    households = known_households()
+    if len(households) > CLASSIFIER_SAMPLE_HOUSEHOLDS:
+        households = random.sample(households, CLASSIFIER_SAMPLE_HOUSEHOLDS)
+    names = {}
+    votes: Dict[str, Dict[str, int]] = {}
+    for household_id in households:
+        for key, (name, category) in _shard_labels(household_id).items():
+            if category == "Other":
+                continue
+            if key not in votes:
+                if len(votes) >= CLASSIFIER_MAX_LABELS:
+                    continue
+                names[key] = name
+                votes[key] = {}
+            votes[key][category] = votes[key].get(category, 0) + 1
+
+    os.makedirs(os.path.dirname(CLASSIFIER_LABELS_FILE) or '.', exist_ok=True)
+    temp_file = f"{CLASSIFIER_LABELS_FILE}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        for key, counts in votes.items():
+            f.write(json.dumps([names[key], max(counts, key=counts.get)], ensure_ascii=False) + '\n')
+    os.replace(temp_file, CLASSIFIER_LABELS_FILE)
+    print(f"Category labels: {len(votes)} names from {len(households)} household(s)")
+    return len(votes)
+
+
+def load_category_classifier(force: bool = False) -> bool:
+    """Fit a classifier on the taxonomy keywords plus the labels file if it changed; swap it in.
+
+    Runs in each worker (cheap: no shard reads). Requests keep using the
+    previous model until the new one is ready. Returns True when a new model
+    was installed.
+    """
+    global category_classifier, _classifier_labels_mtime
+    if not CLASSIFIER_ENABLED:
+        return False
+    try:
+        mtime = os.stat(CLASSIFIER_LABELS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if not force and category_classifier is not None and mtime == _classifier_labels_mtime:
+        return False
+
+    started = time.perf_counter()
+    taxonomy = get_taxonomy()
+    examples = [(keyword, name) for name, keywords in taxonomy.keywords.items() for keyword in keywords]
+    if mtime is not None:
+        with open(CLASSIFIER_LABELS_FILE, 'r', encoding='utf-8') as f:
+            examples.extend(tuple(json.loads(line)) for line in f if line.strip())
+    # Categories renamed or removed since the labels were collected are dropped
+    examples = [(name, category) for name, category in examples if category in taxonomy.order]
+    category_classifier = CategoryClassifier.train(examples)
+    _classifier_labels_mtime = mtime
+    print(f"Category classifier trained on {len(examples)} examples in {time.perf_counter() - started:.2f}s")
+    return True
+
+
+def refresh_category_classifier():
+    """Startup/CLI: collect labels unless another worker did so recently, then load the model."""
+    if CLASSIFIER_ENABLED:
+        maintenance.run_job('classifier_labels')
+        load_category_classifier()
+
+
+def classify_items(names: List[str]) -> List[Optional[str]]:
+    """Category per name where the local classifier is confident, else None (leave it to the model)."""
+    model = category_classifier
+    if model is None or not names:
+        return [None] * len(names)
+    categories = []
+    for category, confidence in model.classify_many(names):
+        confident = confidence >= CLASSIFIER_MIN_CONFIDENCE
+        classifier_items_total.inc(outcome='confident' if confident else 'deferred')
+        categories.append(category if confident else None)
+    return categories
+
+
+def plain_item_name(part: str) -> Optional[str]:
+    """Title-cased name if `part` is just an item name (no quantities, fillers or punctuation), else None."""
+    words = part.split()
+    if not words or len(words) > 4 or any(word.lower() in PHRASE_WORDS for word in words):
+        return None
+    if not re.fullmatch(r"[^\W\d_]+(?:[ '&-]+[^\W\d_]+)*", ' '.join(words)):
+        return None
+    return ' '.join(word.capitalize() for word in words)
+
+
+def resolve_items_locally(grocery_data: GroceryData, raw_text: str) -> Tuple[List[Dict], List[str]]:
+    """Split comma-separated text into items answered locally and the parts left for the model.
+
+    A part is answered locally when it is a catalog item with a real
+    category (its stored one), or a plain item name the classifier is
+    confident about. The plain names are classified in one batch. Catalog
+    items stored as "Other" (usually a fallback while the model was down) and
+    anything else, e.g. "2 gallons of milk", are returned for the model.
+    """
+    taxonomy = get_taxonomy()
+    parts = [part.strip() for part in re.split(r'[,\n]', raw_text) if part.strip()]
+    resolved: List[Optional[Dict]] = [None] * len(parts)
+    plain = {}  # part index -> plain name
+    for index, part in enumerate(parts):
+        entry = grocery_data.catalog.find(part)
+        if entry and entry.category != "Other" and entry.category in taxonomy.order:
+            resolved[index] = {'name': entry.name, 'category': entry.category}
+            continue
+        name = plain_item_name(part)
+        if name:
+            plain[index] = entry.name if entry else name
+    for (index, name), category in zip(plain.items(), classify_items(list(plain.values()))):
+        if category:
+            resolved[index] = {'name': name, 'category': category}
+    leftover = [part for part, item in zip(parts, resolved) if item is None]
+    return [item for item in resolved if item], leftover
+
+
+# ==================== MODEL CLIENT ====================
+
+_model = None
+_model_lock = threading.Lock()
+_model_ready = threading.Event()
+_data_ready = threading.Event()
+_bootstrap_lock = threading.Lock()
+_app_started = False
+
+
+def _create_model():
+    """Build the configured model client (imports the Gemini SDK only when needed)."""
+    if GEMINI_BACKEND == 'stub':
+        import fake_gemini
+        return fake_gemini.FakeGeminiModel.from_env(extract=simple_fallback_parse_with_categories)
+    if GEMINI_BACKEND == 'http':
+        import fake_gemini
+        return fake_gemini.HttpGeminiModel.from_env()
+
+    import google.generativeai as genai
+    # Configure Gemini API
+    genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+    # Use Gemini 2.5 Flash model
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+def get_model():
+    """Return the model client, creating it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                with timed_stage('model_init'):
+                    _model = _create_model()
+                _model_ready.set()
+    return _model
+
+
+def _warm_up_model():
+    try:
+        get_model()
+        print("Model client warmed up")
+    except Exception as e:
+        # /add-item retries lazily (and falls back) if warm-up fails
+        print(f"Model warm-up failed: {e}")
+
+
+def bootstrap_data():
+    """One-time data bootstrap/migration for the default household (plus a deep check in strict mode)."""
+    if _data_ready.is_set():
+        return
+    with _bootstrap_lock:
+        if not _data_ready.is_set():
+            ensure_data_initialized()
+            migrate_legacy_households()
+            if STRICT_VALIDATION:
+                problems = check_all_households()
+                if problems:
+                    raise RuntimeError(f"STRICT_VALIDATION: invalid data in {sorted(problems)}")
+            _data_ready.set()
+
+
+def known_households() -> List[str]:
+    """Household ids with a shard on disk."""
+    households = [DEFAULT_HOUSEHOLD] if os.path.exists(GROCERY_DATA_FILE) else []
+    if os.path.isdir(GROCERY_DATA_DIR):
+        households.extend(sorted(name[:-len('.json')] for name in os.listdir(GROCERY_DATA_DIR)
+                                 if name.endswith('.json')))
+    return households
+
+
+def check_all_households(household_ids: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Strict validation of each household's shard; returns {household_id: problems} for failures."""
+    problems = {}
+    for household_id in household_ids or known_households():
+        try:
+            with open(household_data_file(household_id), 'r') as f:
+                data = GroceryData(**json.load(f))
+        except OSError as e:
+            problems[household_id] = [f"cannot read shard: {e.strerror or e}"]
+            continue
+        except (TypeError, KeyError, ValueError) as e:
+            problems[household_id] = [f"unreadable: {e!r}"]
+            continue
+        errors = validate_household_data(data, strict=True)
+        if errors:
+            problems[household_id] = errors
+    return problems
+
+
+def init_app():
+    """Server startup: bootstrap data and start the background threads (maintenance, classifier, warm-up).
+
+    Called by the server entry points (`python app.py`, create_app(), the
+    ASGI lifespan) and otherwise by the first request, never on import, so
+    scripts and CLI commands that import the app don't start jobs. Runs once
+    per process.
+    """
+    global _app_started
+    bootstrap_data()  # first, so concurrent first requests all wait for the data
+    with _bootstrap_lock:
+        if _app_started:
+            return
+        _app_started = True
+    if CLASSIFIER_ENABLED:
+        threading.Thread(target=refresh_category_classifier, name='classifier-training', daemon=True).start()
+    if MAINTENANCE_ENABLED:
+        maintenance.start()
+    if GEMINI_WARMUP == 'background':
+        threading.Thread(target=_warm_up_model, name='model-warmup', daemon=True).start()
+
+
+def create_app():
+    """App factory for WSGI servers (e.g. `gunicorn 'app:create_app()'`): the app, with startup work done."""
+    init_app()
+    return app
+
+
+@app.before_request
+def _ensure_app_started():
+    """Servers that import `app:app` without create_app() get the startup work on their first request."""
+    init_app()
+
+
+def is_ready() -> bool:
+    """Whether startup work has finished."""
+    model_ok = _model_ready.is_set() or GEMINI_WARMUP != 'background'
+    return _data_ready.is_set() and model_ok
+
+
+# ==================== CIRCUIT BREAKER ====================
+
+BREAKER_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+gemini_breaker_transitions_total = metrics_registry.counter(
+    'grocery_gemini_breaker_transitions_total', 'Gemini circuit breaker state changes.', ('from_state', 'to_state'))
+
+
+def _record_breaker_transition(old_state, new_state):
+    gemini_breaker_transitions_total.inc(from_state=old_state, to_state=new_state)
+
+
+gemini_breaker = CircuitBreaker(
+    'gemini',
+    failure_rate_threshold=GEMINI_BREAKER_FAILURE_RATE,
+    window_size=GEMINI_BREAKER_WINDOW,
+    min_calls=GEMINI_BREAKER_MIN_CALLS,
+    open_seconds=GEMINI_BREAKER_OPEN_SECONDS,
+    base_timeout=GEMINI_TIMEOUT_SECONDS,
+    min_timeout=GEMINI_MIN_TIMEOUT_SECONDS,
+    max_timeout=GEMINI_MAX_TIMEOUT_SECONDS,
+    on_transition=_record_breaker_transition
+)
+
+
+@metrics_registry.register_collector
+def _collect_breaker_state():
+    status = gemini_breaker.snapshot()
+    yield ('grocery_gemini_breaker_state', 'gauge', 'Gemini breaker state (0=closed, 1=half_open, 2=open).',
+           [({}, BREAKER_STATE_VALUES[status['state']])])
+    yield ('grocery_gemini_timeout_seconds', 'gauge', 'Current adaptive deadline for Gemini calls.',
+           [({}, status['currentTimeoutSeconds'])])
+
+
+# ==================== ADMISSION CONTROL ====================
+
+admission_rejections_total = metrics_registry.counter(
+    'grocery_admission_rejections_total', 'Model-backed requests refused by admission control.',
+    ('reason', 'action'))
+
+client_buckets = TokenBucketLimiter(RATE_LIMIT_PER_MINUTE / 60, RATE_LIMIT_BURST)
+model_admission = ConcurrencyLimiter(MODEL_MAX_CONCURRENCY, MODEL_QUEUE_SIZE, MODEL_QUEUE_TIMEOUT_MS / 1000)
+
+
+@metrics_registry.register_collector
+def _collect_admission_state():
+    status = model_admission.snapshot()
+    yield ('grocery_model_calls_in_flight', 'gauge', 'Model calls holding an admission slot.',
+           [({}, status['inFlight'])])
+    yield ('grocery_model_calls_queued', 'gauge', 'Model calls waiting for an admission slot.',
+           [({}, status['queued'])])
+    yield ('grocery_rate_limited_clients', 'gauge', 'Clients with a tracked token bucket.',
+           [({}, len(client_buckets))])
+
+
+def client_key(api_key: Optional[str], remote_addr: Optional[str], forwarded_for: Optional[str] = None) -> str:
+    """Rate-limit identity: the API key if sent, else the client address."""
+    if api_key:
+        return f"key:{api_key}"
+    if RATE_LIMIT_TRUST_PROXY and forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f"ip:{remote_addr or 'unknown'}"
+
+
+def request_client_key() -> str:
+    return client_key(request.headers.get('X-API-Key'), request.remote_addr,
+                      request.headers.get('X-Forwarded-For'))
+
+
+def model_allowed_for(client: str) -> bool:
+    """Charge one model call to the client's bucket.
+
+    False means "answer with the local parser"; with RATE_LIMIT_OVERFLOW=reject
+    an empty bucket raises AdmissionRejected instead (a 429).
+    """
+    retry_after = client_buckets.take(client)
+    if not retry_after:
+        return True
+    admission_rejections_total.inc(reason='rate_limit', action=RATE_LIMIT_OVERFLOW)
+    if RATE_LIMIT_OVERFLOW == 'reject':
+        raise AdmissionRejected('rate_limit', retry_after)
+    return False
+
+
+def _shed_model_call(raw_text, rejected: AdmissionRejected, on_overload: str):
+    """No model slot within the queue budget: re-raise (429) or parse locally."""
+    admission_rejections_total.inc(reason=rejected.reason, action=on_overload)
+    if on_overload == 'reject':
+        raise rejected
+    return simple_fallback_parse_with_categories(raw_text)
+
+
+def too_many_requests_payload(rejected: AdmissionRejected):
+    """(JSON body, Retry-After seconds) for a refused request."""
+    retry_after = max(1, math.ceil(rejected.retry_after))
+    return {'error': 'Too many requests', 'reason': rejected.reason, 'retryAfter': retry_after}, retry_after
+
+
+@app.errorhandler(AdmissionRejected)
+def handle_admission_rejected(error):
+    payload, retry_after = too_many_requests_payload(error)
+    response = jsonify(payload)
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
 # ==================== GEMINI PARSING ====================
 
-def parse_grocery_items_with_gemini(raw_text):
-    """Use Gemini LLM to extract grocery items and assign categories."""
+# Bump when the prompt text or response schema changes (recorded with token metrics)
+PROMPT_VERSION = 'v2'
+
+PROMPT_TEMPLATE = """Extract grocery items from the text and assign each a category.
+Categories: {categories}
+Rules: item names only; drop quantities, units, filler words and articles; Title Case names.
+Example: "We need 2 gallons of milk and a loaf of bread" -> [{{"name": "Milk", "category": "Dairy"}}, {{"name": "Bread", "category": "Bakery"}}]
+Return a JSON array of {{"name", "category"}} objects.
+Text: """
+
+gemini_tokens = metrics_registry.histogram(
+    'grocery_gemini_tokens', 'Tokens per Gemini call by kind (prompt/output).', ('kind', 'prompt_version'),
+    buckets=(25, 50, 100, 200, 400, 800, 1600, 3200))
+
+
+@lru_cache(maxsize=8)
+def compile_prompt(category_names: tuple):
+    """Build the static prompt prefix and structured-output config once per category set."""
+    prefix = PROMPT_TEMPLATE.format(categories=", ".join(category_names))
+    generation_config = None
+    if GEMINI_STRUCTURED_OUTPUT:
+        generation_config = {
+            'response_mime_type': 'application/json',
+            'response_schema': {
+                'type': 'ARRAY',
+                'items': {
+                    'type': 'OBJECT',
+                    'properties': {
+                        'name': {'type': 'STRING'},
+                        'category': {'type': 'STRING', 'format': 'enum', 'enum': list(category_names)}
+                    },
+                    'required': ['name', 'category']
+                }
+            }
+        }
+    return prefix, generation_config
+
+
+def build_prompt(raw_text):
+    """Return (prompt, generation_config) for a request; raw_text is embedded once, JSON-quoted."""
+    prefix, generation_config = compile_prompt(get_taxonomy().names)
+    return prefix + json.dumps(raw_text, ensure_ascii=False), generation_config
+
+
+def _strip_code_fences(text):
+    """Remove a ```json ... ``` wrapper (free-form responses only)."""
+    if text.startswith('```'):
+        text = text.split('```')[1]
+        if text.startswith('json'):
+            text = text[4:]
+        text = text.strip()
+    return text
+
+
+def _record_token_usage(response, prompt):
+    """Record prompt/output token counts (estimated at ~4 chars/token if the backend omits them)."""
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None) or len(prompt) // 4
+    output_tokens = getattr(usage, 'candidates_token_count', None)
+    gemini_tokens.observe(prompt_tokens, kind='prompt', prompt_version=PROMPT_VERSION)
+    if output_tokens:
+        gemini_tokens.observe(output_tokens, kind='output', prompt_version=PROMPT_VERSION)
+
+
+def _gemini_request(raw_text):
+    """Prompt and generate_content kwargs for a parse call."""
+    prompt, generation_config = build_prompt(raw_text)
+    call_kwargs = {'generation_config': generation_config} if generation_config else {}
+    return prompt, call_kwargs
+
+
+def _items_from_response(response, prompt):
+    """Decode a model response into validated {name, category} items."""
+    _record_token_usage(response, prompt)
+
+    # Structured output is plain JSON; fences only show up in free-form mode
+    items = json.loads(_strip_code_fences(response.text.strip()))
     
-    categories_list = ", ".join([cat for cat in CATEGORIES.keys()])
+    if not items:
+        return []
     
-    prompt = f"""Extract grocery items from this text and assign categories.
+    # Validate and return items with categories
+    result = []
+    for item in items:
+        if isinstance(item, dict) and 'name' in item and 'category' in item:
+            result.append(item)
+    
+    return result
 
-Text: "{raw_text}"
 
-Categories: {categories_list}
+def _fallback_after_error(raw_text, error):
+    """Local parse when the model call failed or the circuit is open.
 
-Rules:
-- Extract ONLY grocery item names
-- Remove quantities, measurements, and numbers (2 gallons, a dozen, etc.)
-- Remove filler words (I, we, need, get, buy, grab, pick up, for, etc.)
-- Remove articles (a, an, the)
-- Normalize to title case (Milk, not milk)
-- Assign the most appropriate category
-- Return as JSON array
+    With the circuit open no call was made, so only real call failures are
+    logged and counted as errors.
+    """
+    if not isinstance(error, CircuitOpenError):
+        print(f"Gemini API error: {error}")
+        gemini_errors_total.inc(error=type(error).__name__)
+    gemini_fallbacks_total.inc()
+    # Fallback to simple parsing without categories
+    return simple_fallback_parse_with_categories(raw_text)
 
-Format:
-[
-  {{"name": "Milk", "category": "Dairy"}},
-  {{"name": "Apples", "category": "Produce"}}
-]
 
-Examples:
-Input: "We need milk, eggs, and bread"
-Output: [
-  {{"name": "Milk", "category": "Dairy"}},
-  {{"name": "Eggs", "category": "Dairy"}},
-  {{"name": "Bread", "category": "Bakery"}}
-]
+def parse_grocery_items_with_gemini(raw_text, on_overload='fallback'):
+    """Use Gemini LLM to extract grocery items and assign categories.
 
-Input: "Get stuff for tacos - ground beef, tortillas, cheese, lettuce"
-Output: [
-  {{"name": "Ground Beef", "category": "Meat & Seafood"}},
-  {{"name": "Tortillas", "category": "Bakery"}},
-  {{"name": "Cheese", "category": "Dairy"}},
-  {{"name": "Lettuce", "category": "Produce"}}
-]
+    The call waits briefly for a model slot; on_overload ('fallback' or
+    'reject') decides what happens when none frees up.
+    """
+    prompt, call_kwargs = _gemini_request(raw_text)
 
-Now extract from: "{raw_text}"
-"""
-    
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        
-        # Remove markdown code blocks if present
-        if text.startswith('```'):
-            text = text.split('```')[1]
-            if text.startswith('json'):
-                text = text[4:]
-            text = text.strip()
-        
-        # Parse JSON response
-        items = json.loads(text)
-        
-        if not items:
-            return []
-        
-        # Validate and return items with categories
-        result = []
-        for item in items:
-            if isinstance(item, dict) and 'name' in item and 'category' in item:
-                result.append(item)
-        
-        return result
-    
+        with model_admission.slot(), timed_stage('gemini_call'):
+            response = gemini_breaker.call(lambda: get_model().generate_content(prompt, **call_kwargs))
+        return _items_from_response(response, prompt)
+    except AdmissionRejected as e:
+        return _shed_model_call(raw_text, e, on_overload)
+    except Exception as e:
+        return _fallback_after_error(raw_text, e)
+
+
+async def parse_grocery_items_with_gemini_async(raw_text, on_overload='fallback'):
+    """Async variant for the ASGI entry point: awaits the model instead of holding a thread."""
+    prompt, call_kwargs = _gemini_request(raw_text)
+
+    try:
+        # First call may still be building the client; don't block the event loop on it
+        model = await asyncio.to_thread(get_model)
+        async with model_admission.slot_async():
+            with timed_stage('gemini_call'):
+                response = await gemini_breaker.call_async(
+                    lambda: model.generate_content_async(prompt, **call_kwargs))
+        return _items_from_response(response, prompt)
+    except AdmissionRejected as e:
+        return _shed_model_call(raw_text, e, on_overload)
     except Exception as e:
-        print(f"Gemini API error: {e}")
-        # Fallback to simple parsing without categories
-        return simple_fallback_parse_with_categories(raw_text)
+        return _fallback_after_error(raw_text, e)
 
 
 def simple_fallback_parse(raw_text):
@@ -509,6 +2007,7 @@ def simple_fallback_parse(raw_text):
     return cleaned_items
 
 
+@instrumented_stage('fallback_parse')
 def simple_fallback_parse_with_categories(raw_text):
     """Simple fallback parser with category detection if Gemini fails."""
     import re
@@ -540,181 +2039,755 @@ def simple_fallback_parse_with_categories(raw_text):
 # This function is no longer used in v2. Deduplication is now handled in the /add-item endpoint.
 
 
-# ==================== FLASK ROUTES ====================
+# ==================== BULK IMPORT ====================
+
+def iter_import_names(stream, fmt: str = 'lines', column: Optional[str] = None):
+    """Yield item names from a plain-text (one per line) or CSV stream without loading it whole."""
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        index = 0
+        if column is not None:
+            header = next(reader, [])
+            lowered = [name.strip().lower() for name in header]
+            if column.lower() not in lowered:
+                raise ValueError(f"Column '{column}' not in CSV header {header}")
+            index = lowered.index(column.lower())
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+        return
+
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def _known_category(name: str, grocery_data: GroceryData) -> Optional[str]:
+    """Category from purchase history, the keyword index or the local classifier; None if none knows the item."""
+    entry = grocery_data.catalog.find(name)
+    if entry and entry.id in grocery_data.itemStats and entry.category != "Other":
+        return entry.category
+    category = detect_category_fallback(name)
+    return None if category == "Other" else category
+
+
+def categorize_batch_with_model(names: List[str]) -> Dict[str, str]:
+    """Categorize a batch of names with one model call; returns {lowercased name: category}."""
+    # Comma-joined so the local fallback parser splits it the same way the model does
+    parsed = parse_grocery_items_with_gemini(", ".join(name.replace(',', ' ') for name in names))
+    by_name = {str(item['name']).lower(): validate_category(item['category']) for item in parsed}
+    if len(parsed) == len(names) and not all(name.lower() in by_name for name in names):
+        # Model normalized the names (e.g. dropped quantities) but kept the order
+        by_name.update({name.lower(): validate_category(item['category']) for name, item in zip(names, parsed)})
+    return {name.lower(): by_name.get(name.lower(), "Other") for name in names}
+
+
+def import_items(names, household_id: str = DEFAULT_HOUSEHOLD, batch_size: int = IMPORT_BATCH_SIZE,
+                 workers: int = IMPORT_MODEL_WORKERS, use_model: bool = True) -> Dict:
+    """Bulk-add names to a household's current list in one write; returns counts and throughput.
+
+    Names are consumed lazily. Known items (history, keyword index) are
+    categorized inline; the rest go to the model in batches of `batch_size`
+    with at most `workers` calls in flight.
+    """
+    started = time.perf_counter()
+    snapshot = read_grocery_data(household_id)
+    seen = {item.name.lower() for item in snapshot.current.items}
+
+    pending = []  # (name, category or None) in input order
+    model_batch = []
+    futures = []
+    in_flight = threading.BoundedSemaphore(max(1, workers) * 2)  # bounds queued batches too
+    counts = {'read': 0, 'duplicates': 0, 'keyword': 0, 'model': 0}
+
+    def submit(batch):
+        in_flight.acquire()
+        future = executor.submit(categorize_batch_with_model, batch)
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append(future)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='import') as executor:
+        for name in names:
+            counts['read'] += 1
+            key = name.lower()
+            if key in seen:
+                counts['duplicates'] += 1
+                continue
+            seen.add(key)
+
+            category = _known_category(name, snapshot)
+            if category or not use_model:
+                counts['keyword'] += 1
+                pending.append((name, category or "Other"))
+                continue
+
+            counts['model'] += 1
+            pending.append((name, None))
+            model_batch.append(name)
+            if len(model_batch) >= batch_size:
+                submit(model_batch)
+                model_batch = []
+        if model_batch:
+            submit(model_batch)
+
+        model_categories = {}
+        for future in futures:
+            model_categories.update(future.result())
+
+    categorized = time.perf_counter()
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        existing = {item.name.lower() for item in grocery_data.current.items}
+        added = 0
+        now = datetime.now().isoformat()
+        for name, category in pending:
+            if name.lower() in existing:
+                counts['duplicates'] += 1  # added concurrently since we started
+                continue
+            existing.add(name.lower())
+            grocery_data.current.items.append(GroceryItem(
+                id=str(uuid.uuid4()),
+                name=name,
+                category=category or model_categories.get(name.lower(), "Other"),
+                checked=False,
+                addedAt=now,
+                checkedAt=None
+            ))
+            added += 1
+        write_grocery_data(grocery_data, household_id)
+
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        'added': added,
+        'total': len(grocery_data.current.items),
+        'categorizeSeconds': round(categorized - started, 3),
+        'seconds': round(elapsed, 3),
+        'itemsPerSecond': round(counts['read'] / elapsed, 1) if elapsed else None,
+    }
 
-@app.route('/')
-def index():
-    """Serve the web UI."""
-    return render_template('index.html')
 
+# ==================== EXPORT / IMPORT (NDJSON) ====================
 
-@app.route('/get-items', methods=['GET'])
-def get_items():
-    """Return all grocery items (v1 compatibility - deprecated, use /get-current-list instead)."""
-    # Redirect to v2 endpoint
-    return get_current_list()
+NDJSON_FORMAT = 'grocery-ndjson/1'
+RECORD_COUNT_KEYS = {'item': 'items', 'trip': 'trips', 'stats': 'stats'}
 
 
-@app.route('/get-current-list', methods=['GET'])
-def get_current_list():
-    """Return current list grouped by categories (v2)."""
-    ensure_data_initialized()
-    
-    grocery_data = read_grocery_data()
-    
+class NdjsonImportError(ValueError):
+    """Invalid record in an NDJSON import (message includes the line number)."""
+
+
+def export_records(household_id: str = DEFAULT_HOUSEHOLD):
+    """Yield a household's data as NDJSON lines: header, items, trips, stats, end.
+
+    Only references are captured up front (under the household lock); each
+    record is encoded as it is yielded, so no full-document string is built.
+    """
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        version, date = grocery_data.version, grocery_data.current.date
+        items = list(grocery_data.current.items)
+        trips = list(grocery_data.history)
+        stats = [(grocery_data.catalog.get(item_id), item_stats) for item_id, item_stats in grocery_data.itemStats.items()]
+
+    yield json.dumps({
+        'type': 'header', 'format': NDJSON_FORMAT, 'version': version, 'household': household_id,
+        'date': date, 'exportedAt': datetime.now().isoformat(),
+        'counts': {'items': len(items), 'trips': len(trips), 'stats': len(stats)},
+    }) + '\n'
+    for item in items:
+        yield json.dumps({'type': 'item', **item.to_dict()}) + '\n'
+    # Catalog ids are per household, so trips and stats are exported by name
+    for trip in trips:
+        yield json.dumps({'type': 'trip', **trip.to_dict(), 'items': [item.to_dict() for item in trip.items]}) + '\n'
+    for entry, item_stats in stats:
+        yield json.dumps({'type': 'stats', 'name': entry.name, 'category': entry.category,
+                          **item_stats.to_dict()}) + '\n'
+    yield json.dumps({'type': 'end', 'records': len(items) + len(trips) + len(stats)}) + '\n'
+
+
+def _parse_record(line_number: int, record: Dict, catalog: ItemCatalog):
+    """Validate one NDJSON record and return (type, model object or header dict).
+
+    Trip items and stats names are interned into `catalog`.
+    """
+    record_type = record.pop('type', None)
+    try:
+        if record_type == 'item':
+            item = GroceryItem(**record)
+            if not item.id or not item.name:
+                raise ValueError('id and name are required')
+            item.category = validate_category(item.category)
+            return record_type, item
+        if record_type == 'trip':
+            items = record.pop('items')
+            if not isinstance(items, list) or not all(isinstance(item, dict) and item.get('name') for item in items):
+                raise ValueError('trip items must be objects with a name')
+            trip = ShoppingTrip(**record, items=[
+                TripItem(catalog.intern(item['name'], validate_category(item.get('category', 'Other'))),
+                         bool(item.get('checked')))
+                for item in items
+            ])
+            return record_type, trip
+        if record_type == 'stats':
+            entry = catalog.intern(record.pop('name'), validate_category(record.pop('category', 'Other')))
+            return record_type, (entry.id, ItemStats(**record))
+        if record_type in ('header', 'end'):
+            return record_type, record
+    except (TypeError, ValueError, KeyError) as e:
+        raise NdjsonImportError(f"line {line_number}: invalid {record_type} record: {e}")
+    raise NdjsonImportError(f"line {line_number}: unknown record type {record_type!r}")
+
+
+def import_records(lines, household_id: str = DEFAULT_HOUSEHOLD, mode: str = 'replace') -> Dict:
+    """Validate NDJSON lines one at a time into a staged copy, then commit it in one write.
+
+    mode 'replace' swaps in the imported data; 'merge' adds items, trips and
+    stats the household doesn't have yet (by name / trip id / name). Nothing
+    is written unless every record validates and the end marker is present.
+    Repeated items (same name or id) and trips (same id) are skipped.
+
+    The input is streamed, but the staged household is held in memory until
+    the commit: a household is one document, written whole, so this peak is
+    the size of the imported household's data model, the same as reading it.
+    Committing in batches would give up the all-or-nothing guarantee.
+    """
+    if mode not in ('replace', 'merge'):
+        raise NdjsonImportError(f"unknown mode {mode!r}")
+
+    staged = _create_empty_grocery_data()
+    counts = {'items': 0, 'trips': 0, 'stats': 0}
+    item_keys, trip_ids = set(), set()
+    duplicates = 0
+    header = end = None
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise NdjsonImportError(f"line {line_number}: not JSON: {e}")
+        if not isinstance(record, dict):
+            raise NdjsonImportError(f"line {line_number}: record must be an object")
+        if end is not None:
+            raise NdjsonImportError(f"line {line_number}: record after end marker")
+
+        record_type, value = _parse_record(line_number, record, staged.catalog)
+        if header is None and record_type != 'header':
+            raise NdjsonImportError(f"line {line_number}: expected header record first")
+        if record_type == 'header':
+            if header is not None or value.get('format') != NDJSON_FORMAT:
+                raise NdjsonImportError(f"line {line_number}: bad or repeated header")
+            header = value
+            staged.current.date = value.get('date') or staged.current.date
+        elif record_type == 'item':
+            if value.name.lower() in item_keys or value.id in item_keys:
+                duplicates += 1
+            else:
+                item_keys.update((value.name.lower(), value.id))
+                staged.current.items.append(value)
+        elif record_type == 'trip':
+            if value.id in trip_ids:
+                duplicates += 1
+            else:
+                trip_ids.add(value.id)
+                staged.history.append(value)
+        elif record_type == 'stats':
+            item_id, item_stats = value
+            if item_id in staged.itemStats:  # another spelling of the same item
+                staged.itemStats[item_id].merge(item_stats)
+            else:
+                staged.itemStats[item_id] = item_stats
+        else:
+            end = value
+        if record_type in RECORD_COUNT_KEYS:
+            counts[RECORD_COUNT_KEYS[record_type]] += 1
+
+    if end is None:
+        raise NdjsonImportError("missing end record (truncated export?)")
+    if end.get('records') != sum(counts.values()):
+        raise NdjsonImportError(f"end record says {end.get('records')} records, got {sum(counts.values())}")
+
+    with household_lock(household_id):
+        if mode == 'merge':
+            grocery_data = read_grocery_data(household_id)
+            names = {item.name.lower() for item in grocery_data.current.items}
+            grocery_data.current.items.extend(item for item in staged.current.items if item.name.lower() not in names)
+            trip_ids = {trip.id for trip in grocery_data.history}
+            catalog = grocery_data.catalog
+            for trip in staged.history:
+                if trip.id not in trip_ids:
+                    trip.items = [TripItem(catalog.adopt(item.entry), item.checked) for item in trip.items]
+                    grocery_data.history.append(trip)
+            grocery_data.history.sort(key=lambda trip: trip.completedAt)
+            for item_id, item_stats in staged.itemStats.items():
+                grocery_data.itemStats.setdefault(catalog.adopt(staged.catalog.get(item_id)).id, item_stats)
+        else:
+            grocery_data = staged
+        write_grocery_data(grocery_data, household_id)
+
+    return {'mode': mode, 'imported': counts, 'duplicates': duplicates,
+            'totalItems': len(grocery_data.current.items), 'totalTrips': len(grocery_data.history)}
+
+
+# ==================== MAINTENANCE JOBS ====================
+
+maintenance_job_runs_total = metrics_registry.counter(
+    'grocery_maintenance_job_runs_total', 'Maintenance job runs by outcome (ok/error/skipped).', ('job', 'outcome'))
+maintenance_job_duration = metrics_registry.histogram(
+    'grocery_maintenance_job_duration_seconds', 'Maintenance job run time.', ('job',))
+
+
+def _record_job_result(job, outcome, duration):
+    maintenance_job_runs_total.inc(job=job.name, outcome=outcome)
+    if outcome != 'skipped':
+        maintenance_job_duration.observe(duration, job=job.name)
+
+
+maintenance = Scheduler(MAINTENANCE_LOCK_DIR, on_result=_record_job_result)
+
+
+@metrics_registry.register_collector
+def _collect_maintenance_jobs():
+    """Last successful run per maintenance job (unix time; 0 = not yet in this process)."""
+    jobs = maintenance.snapshot()
+    yield ('grocery_maintenance_job_last_success_timestamp', 'gauge',
+           'Unix time of the last successful run of each maintenance job in this process.',
+           [({'job': name}, status['lastSuccess'] or 0) for name, status in jobs.items()])
+
+
+def prune_history(grocery_data: GroceryData, now: Optional[datetime] = None) -> int:
+    """Drop trips older than HISTORY_RETENTION_DAYS; returns how many were removed.
+
+    History is appended in completion order and ISO timestamps sort as
+    strings, so the cutoff is a bisect, with no date parsing.
+    """
+    cutoff = ((now or datetime.now()) - timedelta(days=HISTORY_RETENTION_DAYS)).isoformat()
+    index = bisect.bisect_right(grocery_data.history, cutoff, key=lambda trip: trip.completedAt)
+    if index:
+        del grocery_data.history[:index]
+    return index
+
+
+def rebuild_item_stats(grocery_data: GroceryData) -> int:
+    """Recompute lastBought/averageFrequency from purchases in history; returns entries changed."""
+    purchases = {}  # catalog id -> completedAt of trips where it was checked off
+    for trip in grocery_data.history:
+        for item in trip.items:
+            if item.checked:
+                purchases.setdefault(item.entry.id, []).append(trip.completedAt)
+
+    changed = 0
+    for item_id, dates in purchases.items():
+        stats = grocery_data.itemStats.get(item_id)
+        if stats is None:
+            continue
+        last_bought = max(dates + ([stats.lastBought] if stats.lastBought else []))
+        average = None
+        if len(dates) > 1:
+            span = datetime.fromisoformat(dates[-1]) - datetime.fromisoformat(dates[0])
+            average = max(1, round(span.days / (len(dates) - 1)))
+        average = average or stats.averageFrequency
+        if (last_bought, average) != (stats.lastBought, stats.averageFrequency):
+            stats.lastBought, stats.averageFrequency = last_bought, average
+            changed += 1
+    return changed
+
+
+def _for_each_household(update) -> Dict[str, int]:
+    """Apply `update(grocery_data) -> changes` to every stored household; saves only changed ones."""
+    results = {}
+    for household_id in known_households():
+        with household_lock(household_id):
+            grocery_data = read_grocery_data(household_id)
+            changes = update(grocery_data)
+            if changes:
+                write_grocery_data(grocery_data, household_id)
+        results[household_id] = changes
+    return results
+
+
+def run_history_retention():
+    removed = _for_each_household(prune_history)
+    print(f"Maintenance: pruned {sum(removed.values())} old trip(s)")
+
+
+def run_stats_rebuild():
+    _for_each_household(rebuild_item_stats)
+
+
+def run_compaction():
+    """Remove orphaned temp files, trim oversized appliedOps and drop unreferenced catalog entries."""
+    cutoff = time.time() - 300
+    for directory in {os.path.dirname(GROCERY_DATA_FILE) or '.', GROCERY_DATA_DIR}:
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.json.tmp') and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+    def compact(grocery_data):
+        overflow = len(grocery_data.appliedOps) - APPLIED_OPS_LIMIT
+        for op_id in list(grocery_data.appliedOps)[:max(0, overflow)]:
+            del grocery_data.appliedOps[op_id]
+        # Catalog entries no trip or stats entry refers to anymore (e.g. after history pruning)
+        referenced = set(grocery_data.itemStats)
+        referenced.update(item.entry.id for trip in grocery_data.history for item in trip.items)
+        return max(0, overflow) + grocery_data.catalog.retain(referenced)
+
+    _for_each_household(compact)
+
+
+def run_snapshot_rotation():
+    if not os.path.isdir(GROCERY_SNAPSHOT_DIR):
+        return
+    for household_id in os.listdir(GROCERY_SNAPSHOT_DIR):
+        rotate_snapshots(household_id)
+
+
+maintenance.add('history_retention', run_history_retention, JOB_HISTORY_RETENTION_SECONDS, MAINTENANCE_JITTER,
+                run_at_start=True)
+maintenance.add('stats_rebuild', run_stats_rebuild, JOB_STATS_REBUILD_SECONDS, MAINTENANCE_JITTER)
+maintenance.add('compaction', run_compaction, JOB_COMPACTION_SECONDS, MAINTENANCE_JITTER)
+maintenance.add('snapshot_rotation', run_snapshot_rotation, JOB_SNAPSHOT_ROTATION_SECONDS, MAINTENANCE_JITTER,
+                run_at_start=True)
+# One worker collects labels from the shards; every worker refits its in-memory model when they change
+maintenance.add('classifier_labels', collect_category_labels, JOB_CLASSIFIER_LABELS_SECONDS, MAINTENANCE_JITTER)
+maintenance.add('classifier_reload', load_category_classifier, JOB_CLASSIFIER_RELOAD_SECONDS, MAINTENANCE_JITTER,
+                shared=False)
+
+
+# ==================== AUTOCOMPLETE ====================
+
+@lru_cache(maxsize=4096)
+def _iso_timestamp(value: str) -> float:
+    """Unix time of an ISO timestamp (cached: a trip's timestamp is shared by all its items)."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def suggest_items(grocery_data: GroceryData, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[Dict]:
+    """Known items matching `query`, best first; items already on the current list are left out.
+
+    Rank: purchase count decayed by age of the last purchase (half-life
+    AUTOCOMPLETE_HALF_LIFE_DAYS), then names that start with the query, then
+    shorter names. The decay factor common to all items cancels out, so the
+    score is log2(purchases) + lastBought / half-life, with no clock involved.
+    """
+    half_life = AUTOCOMPLETE_HALF_LIFE_DAYS * 86400
+    on_list = {catalog_key(item.name) for item in grocery_data.current.items}
+    query_key = catalog_key(query)
+    ranked = []
+    for entry in grocery_data.catalog.search(query):
+        if entry.key in on_list:
+            continue
+        stats = grocery_data.itemStats.get(entry.id)
+        score = float('-inf')
+        if stats and stats.totalPurchases:
+            score = math.log2(stats.totalPurchases)
+            if stats.lastBought:
+                score += _iso_timestamp(stats.lastBought) / half_life
+        ranked.append((-score, not entry.key.startswith(query_key), len(entry.key), entry.key, entry, stats))
+
+    return [{
+        'name': entry.name,
+        'category': entry.category,
+        'purchases': stats.totalPurchases if stats else 0,
+        'lastBought': stats.lastBought if stats else None,
+    } for *_, entry, stats in heapq.nsmallest(limit, ranked, key=lambda row: row[:4])]
+
+
+# ==================== VIEW MODELS ====================
+
+def _frequency_label(average_frequency: Optional[int]) -> Optional[str]:
+    """Human-readable purchase frequency."""
+    if not average_frequency:
+        return None
+    if average_frequency <= 3:
+        return "Every few days"
+    if average_frequency <= 7:
+        return "Weekly"
+    if average_frequency <= 14:
+        return "Every 2 weeks"
+    return f"Every {average_frequency} days"
+
+
+def build_item_view(item: GroceryItem, grocery_data: GroceryData, now: Optional[datetime] = None) -> Dict:
+    """Client representation of a current-list item, with "last bought" info."""
+    now = now or datetime.now()
+    last_bought_info = None
+    days_since = None
+    frequency_label = None
+
+    stats = grocery_data.stats_for(item.name)
+    if stats:
+        if stats.lastBought:
+            days_since = (now - datetime.fromisoformat(stats.lastBought)).days
+            last_bought_info = stats.lastBought
+        frequency_label = _frequency_label(stats.averageFrequency)
+
+    return {
+        'id': item.id,
+        'name': item.name,
+        'checked': item.checked,
+        'addedAt': item.addedAt,
+        'checkedAt': item.checkedAt,
+        'lastBought': last_bought_info,
+        'daysSinceLastBought': days_since,
+        'frequency': frequency_label
+    }
+
+
+def build_current_list_view(grocery_data: GroceryData) -> Dict:
+    """Current list grouped by category in display order (the /get-current-list payload)."""
+    now = datetime.now()
+
     # Group items by category
     categories = {}
     for item in grocery_data.current.items:
-        if item.category not in categories:
-            categories[item.category] = []
-        
-        # Calculate "last bought" info
-        last_bought_info = None
-        days_since = None
-        frequency_label = None
-        
-        if item.name in grocery_data.itemStats:
-            stats = grocery_data.itemStats[item.name]
-            if stats.lastBought:
-                last_bought_date = datetime.fromisoformat(stats.lastBought)
-                days_since = (datetime.now() - last_bought_date).days
-                last_bought_info = stats.lastBought
-            
-            if stats.averageFrequency:
-                if stats.averageFrequency <= 3:
-                    frequency_label = "Every few days"
-                elif stats.averageFrequency <= 7:
-                    frequency_label = "Weekly"
-                elif stats.averageFrequency <= 14:
-                    frequency_label = "Every 2 weeks"
-                else:
-                    frequency_label = f"Every {stats.averageFrequency} days"
-        
-        categories[item.category].append({
-            'id': item.id,
-            'name': item.name,
-            'checked': item.checked,
-            'addedAt': item.addedAt,
-            'checkedAt': item.checkedAt,
-            'lastBought': last_bought_info,
-            'daysSinceLastBought': days_since,
-            'frequency': frequency_label
-        })
-    
-    # Sort categories by order
+        categories.setdefault(item.category, []).append(build_item_view(item, grocery_data, now))
+
+    # Sort categories by order (unknown ones, e.g. from a since-edited config, go last)
+    taxonomy = get_taxonomy()
     sorted_categories = {}
-    for category in sorted(CATEGORIES.keys(), key=lambda c: CATEGORIES[c]['order']):
-        if category in categories and len(categories[category]) > 0:
-            sorted_categories[category] = categories[category]
-    
-    # Count totals
-    total_items = len(grocery_data.current.items)
-    checked_items = sum(1 for item in grocery_data.current.items if item.checked)
-    
-    return jsonify({
+    for category in sorted(categories, key=lambda c: taxonomy.order.get(c, len(taxonomy.names))):
+        sorted_categories[category] = categories[category]
+
+    return {
         'date': grocery_data.current.date,
         'categories': sorted_categories,
-        'totalItems': total_items,
-        'checkedItems': checked_items
-    })
+        'totalItems': len(grocery_data.current.items),
+        'checkedItems': sum(1 for item in grocery_data.current.items if item.checked)
+    }
+
+
+def build_trip_view(trip: ShoppingTrip) -> Dict:
+    """Client representation of a trip, with catalog references resolved to names/categories."""
+    trip_dict = trip.to_dict()
+    trip_dict['items'] = [item.to_dict() for item in trip.items]
+    return trip_dict
 
 
-@app.route('/add-item', methods=['POST'])
-def add_item():
+# ==================== FLASK ROUTES ====================
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once data bootstrap and model warm-up have finished."""
+    status = {
+        'ready': is_ready(),
+        'data': _data_ready.is_set(),
+        'model': _model_ready.is_set(),
+        'warmup': GEMINI_WARMUP
+    }
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/gemini-status', methods=['GET'])
+def gemini_status():
+    """Circuit breaker state, current deadline and recent transitions."""
+    return jsonify(gemini_breaker.snapshot())
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose Prometheus-style metrics."""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/admin/profiles', methods=['GET'])
+def profiles_index():
+    """Recent request profiles (newest first)."""
+    if not profiling_authorized():
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({'profiles': profile_store.summaries()})
+
+
+@app.route('/admin/profiles/<profile_id>', methods=['GET'])
+def profile_detail(profile_id):
+    """One capture as ?format=text (pstats report, default), pstats (binary dump), collapsed or alloc."""
+    if not profiling_authorized():
+        return jsonify({'error': 'Not found'}), 404
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    fmt = request.args.get('format', 'text')
+    if fmt == 'pstats':
+        response = Response(pstats_dump(profile['stats']), mimetype='application/octet-stream')
+        response.headers['Content-Disposition'] = f'attachment; filename=profile-{profile_id}.pstats'
+        return response
+    if fmt == 'collapsed':
+        return Response(profile['collapsed'], mimetype='text/plain')
+    if fmt == 'alloc':
+        return Response('\n'.join(profile['allocations']), mimetype='text/plain')
+    if fmt == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls'):
+            return jsonify({'error': f"Unknown sort '{sort}'"}), 400
+        return Response(pstats_report(profile['stats'], sort=sort), mimetype='text/plain')
+    return jsonify({'error': f"Unknown format '{fmt}'"}), 400
+
+
+@household_route('/')
+def index(household_id):
+    """Serve the web UI, pre-rendered with the current list so first paint needs no API call."""
+    api_base = '' if household_id == DEFAULT_HOUSEHOLD else f'/h/{household_id}'
+    with household_lock(household_id):
+        current_list = build_current_list_view(read_grocery_data(household_id))
+    taxonomy = get_taxonomy()
+    return render_template('index.html', api_base=api_base, current_list=current_list,
+                           category_emojis=taxonomy.emojis, category_config=taxonomy.client_payload)
+
+
+@app.route('/sw.js', methods=['GET'])
+def service_worker():
+    """Serve the service worker from the root so its scope covers every household."""
+    response = app.send_static_file('sw.js')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/categories', methods=['GET'])
+def categories():
+    """Category names, emojis and order for the client (ETag = taxonomy version)."""
+    taxonomy = get_taxonomy()
+    response = jsonify(taxonomy.client_payload)
+    response.set_etag(taxonomy.version)
+    response.cache_control.no_cache = True  # revalidate: a reload changes the ETag
+    return response.make_conditional(request)
+
+
+@household_route('/get-items', methods=['GET'])
+def get_items(household_id):
+    """Return all grocery items (v1 compatibility - deprecated, use /get-current-list instead)."""
+    # Redirect to v2 endpoint
+    return get_current_list(household_id)
+
+
+@household_route('/get-current-list', methods=['GET'])
+def get_current_list(household_id):
+    """Return current list grouped by categories (v2)."""
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        return jsonify(build_current_list_view(grocery_data))
+
+
+@household_route('/autocomplete', methods=['GET'])
+def autocomplete(household_id):
+    """Typeahead: known items whose name (or a word in it) starts with ?q=, ranked by purchases and recency."""
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', AUTOCOMPLETE_LIMIT, type=int), 1), 20)
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        suggestions = suggest_items(grocery_data, query, limit) if query.strip() else []
+    return jsonify({'query': query, 'suggestions': suggestions})
+
+
+@household_route('/add-item', methods=['POST'])
+def add_item(household_id):
     """Add items from natural language with categories (v2)."""
-    ensure_data_initialized()
-    
-    data = request.get_json()
+    raw_text, error = read_add_item_text(request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Known items and confidently classified plain names need no model call
+    with household_lock(household_id):
+        parsed_items, leftover = resolve_items_locally(read_grocery_data(household_id), raw_text)
+
+    # Parse the rest with Gemini (returns items with categories), unless this client is over its rate limit
+    if leftover:
+        leftover_text = ', '.join(leftover)
+        if model_allowed_for(request_client_key()):
+            parsed_items += parse_grocery_items_with_gemini(leftover_text, on_overload=MODEL_OVERFLOW)
+        else:
+            parsed_items += simple_fallback_parse_with_categories(leftover_text)
     
+    return jsonify(apply_parsed_items(household_id, parsed_items))
+
+
+def read_add_item_text(data):
+    """Validate an /add-item body; return (raw_text, error message)."""
     if not data or 'text' not in data:
-        return jsonify({'error': 'No text provided'}), 400
+        return None, 'No text provided'
     
-    raw_text = data.get('text', '').strip()
+    raw_text = str(data.get('text') or '').strip()
     
     if not raw_text:
-        return jsonify({'error': 'Empty text'}), 400
-    
-    # Parse with Gemini (returns items with categories)
-    parsed_items = parse_grocery_items_with_gemini(raw_text)
-    
-    if not parsed_items:
-        grocery_data = read_grocery_data()
-        return jsonify({
-            'success': True,
-            'message': 'No grocery items found in text',
-            'added': [],
-            'skipped': [],
-            'total': len(grocery_data.current.items)
-        })
-    
-    # Load current data
-    grocery_data = read_grocery_data()
+        return None, 'Empty text'
+    return raw_text, None
+
+
+def apply_parsed_items(household_id, parsed_items):
+    """Add parsed items to a household's current list; return the /add-item payload.
+
+    Shared by the Flask view and the async ASGI handler (which runs it in a worker thread).
+    """
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+
+        if not parsed_items:
+            return {
+                'success': True,
+                'message': 'No grocery items found in text',
+                'added': [],
+                'skipped': [],
+                'total': len(grocery_data.current.items)
+            }
     
-    # Get existing item names (case-insensitive)
-    existing_names = {item.name.lower(): item for item in grocery_data.current.items}
+        # Get existing item names (case-insensitive)
+        existing_names = {item.name.lower(): item for item in grocery_data.current.items}
     
-    added = []
-    skipped = []
+        added = []
+        skipped = []
+        new_items = []
     
-    for parsed_item in parsed_items:
-        item_name = parsed_item['name']
-        item_category = validate_category(parsed_item['category'])
+        for parsed_item in parsed_items:
+            item_name = parsed_item['name']
+            item_category = validate_category(parsed_item['category'])
         
-        # Check for duplicates (case-insensitive)
-        if item_name.lower() in existing_names:
-            skipped.append({
-                'name': item_name,
-                'category': item_category,
-                'reason': 'Already in list'
-            })
-            continue
+            # Check for duplicates (case-insensitive)
+            if item_name.lower() in existing_names:
+                skipped.append({
+                    'name': item_name,
+                    'category': item_category,
+                    'reason': 'Already in list'
+                })
+                continue
         
-        # Create new item
-        new_item = GroceryItem(
-            id=str(uuid.uuid4()),
-            name=item_name,
-            category=item_category,
-            checked=False,
-            addedAt=datetime.now().isoformat(),
-            checkedAt=None
-        )
-        
-        grocery_data.current.items.append(new_item)
-        existing_names[item_name.lower()] = new_item
+            # Create new item
+            new_item = GroceryItem(
+                id=str(uuid.uuid4()),
+                name=item_name,
+                category=item_category,
+                checked=False,
+                addedAt=datetime.now().isoformat(),
+                checkedAt=None
+            )
         
-        # Get "last bought" info from stats
-        last_bought_info = None
-        days_since = None
-        if item_name in grocery_data.itemStats:
-            stats = grocery_data.itemStats[item_name]
-            if stats.lastBought:
-                last_bought_date = datetime.fromisoformat(stats.lastBought)
-                days_since = (datetime.now() - last_bought_date).days
-                last_bought_info = stats.lastBought
+            grocery_data.current.items.append(new_item)
+            new_items.append(new_item)
+            existing_names[item_name.lower()] = new_item
         
-        added.append({
-            'name': item_name,
-            'category': item_category,
-            'lastBought': last_bought_info,
-            'daysSinceLastBought': days_since
-        })
+            # Full item view (with "last bought" info) so clients can insert it without refetching
+            added.append({**build_item_view(new_item, grocery_data), 'category': item_category})
     
-    # Save updated data
-    write_grocery_data(grocery_data)
+        # Save updated data
+        write_grocery_data(grocery_data, household_id, Changes(items=tuple(new_items)))
     
-    return jsonify({
-        'success': True,
-        'added': added,
-        'skipped': skipped,
-        'total': len(grocery_data.current.items)
-    })
+        return {
+            'success': True,
+            'added': added,
+            'skipped': skipped,
+            'total': len(grocery_data.current.items)
+        }
 
 
-@app.route('/toggle-item', methods=['POST'])
-def toggle_item():
+@household_route('/toggle-item', methods=['POST'])
+def toggle_item(household_id):
     """Toggle item checked status (v2)."""
-    ensure_data_initialized()
-    
     data = request.get_json()
     
     if not data or 'itemId' not in data:
@@ -722,38 +2795,37 @@ def toggle_item():
     
     item_id = data.get('itemId')
     
-    grocery_data = read_grocery_data()
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
     
-    # Find item by ID
-    item_found = None
-    for item in grocery_data.current.items:
-        if item.id == item_id:
-            item_found = item
-            break
+        # Find item by ID
+        item_found = None
+        for item in grocery_data.current.items:
+            if item.id == item_id:
+                item_found = item
+                break
     
-    if not item_found:
-        return jsonify({'error': 'Item not found'}), 404
+        if not item_found:
+            return jsonify({'error': 'Item not found'}), 404
     
-    # Toggle checked status
-    item_found.checked = not item_found.checked
-    item_found.checkedAt = datetime.now().isoformat() if item_found.checked else None
+        # Toggle checked status
+        item_found.checked = not item_found.checked
+        item_found.checkedAt = datetime.now().isoformat() if item_found.checked else None
     
-    # Save updated data
-    write_grocery_data(grocery_data)
+        # Save updated data
+        write_grocery_data(grocery_data, household_id, Changes(items=(item_found,)))
     
-    return jsonify({
-        'success': True,
-        'itemId': item_id,
-        'checked': item_found.checked,
-        'checkedAt': item_found.checkedAt
-    })
+        return jsonify({
+            'success': True,
+            'itemId': item_id,
+            'checked': item_found.checked,
+            'checkedAt': item_found.checkedAt
+        })
 
 
-@app.route('/delete-item', methods=['POST'])
-def delete_item():
+@household_route('/delete-item', methods=['POST'])
+def delete_item(household_id):
     """Delete an item from the list (v2)."""
-    ensure_data_initialized()
-    
     data = request.get_json()
     
     if not data or 'itemId' not in data:
@@ -761,207 +2833,431 @@ def delete_item():
     
     item_id = data.get('itemId')
     
-    grocery_data = read_grocery_data()
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
     
-    # Find and remove item by ID
-    item_found = None
-    for i, item in enumerate(grocery_data.current.items):
-        if item.id == item_id:
-            item_found = grocery_data.current.items.pop(i)
-            break
+        # Find and remove item by ID
+        item_found = None
+        for i, item in enumerate(grocery_data.current.items):
+            if item.id == item_id:
+                item_found = grocery_data.current.items.pop(i)
+                break
     
-    if not item_found:
-        return jsonify({'error': 'Item not found'}), 404
+        if not item_found:
+            return jsonify({'error': 'Item not found'}), 404
     
-    # Save updated data
-    write_grocery_data(grocery_data)
+        # Save updated data
+        write_grocery_data(grocery_data, household_id, Changes())
     
-    return jsonify({
-        'success': True,
-        'deleted': item_found.name,
-        'total': len(grocery_data.current.items)
-    })
+        return jsonify({
+            'success': True,
+            'deleted': item_found.name,
+            'total': len(grocery_data.current.items)
+        })
 
 
-@app.route('/complete-trip', methods=['POST'])
-def complete_trip():
+@household_route('/complete-trip', methods=['POST'])
+def complete_trip(household_id):
     """Complete current shopping trip and move to history (v2)."""
-    ensure_data_initialized()
-    
-    grocery_data = read_grocery_data()
-    
-    # Check if there are items to complete
-    if not grocery_data.current.items:
-        return jsonify({'error': 'No items in current list'}), 400
-    
-    # Create shopping trip from current list
-    trip_id = str(uuid.uuid4())
-    completion_time = datetime.now().isoformat()
-    
-    # Count totals
-    total_items = len(grocery_data.current.items)
-    checked_items = sum(1 for item in grocery_data.current.items if item.checked)
-    
-    # Create trip object
-    shopping_trip = ShoppingTrip(
-        id=trip_id,
-        date=grocery_data.current.date,
-        completedAt=completion_time,
-        items=grocery_data.current.items.copy(),  # Copy current items
-        totalItems=total_items,
-        checkedItems=checked_items
-    )
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+    
+        # Check if there are items to complete
+        if not grocery_data.current.items:
+            return jsonify({'error': 'No items in current list'}), 400
+    
+        # Create shopping trip from current list
+        trip_id = str(uuid.uuid4())
+        completion_time = datetime.now().isoformat()
+    
+        # Count totals
+        total_items = len(grocery_data.current.items)
+        checked_items = sum(1 for item in grocery_data.current.items if item.checked)
+    
+        # Create trip object
+        shopping_trip = ShoppingTrip(
+            id=trip_id,
+            date=grocery_data.current.date,
+            completedAt=completion_time,
+            items=[TripItem(grocery_data.catalog.intern(item.name, item.category), item.checked)
+                   for item in grocery_data.current.items],
+            totalItems=total_items,
+            checkedItems=checked_items
+        )
     
-    # Update item statistics for checked items
-    for item in grocery_data.current.items:
-        if item.checked:
-            if item.name not in grocery_data.itemStats:
-                grocery_data.itemStats[item.name] = ItemStats(
-                    category=item.category
-                )
-            
-            stats = grocery_data.itemStats[item.name]
-            stats.lastBought = completion_time
-            stats.totalPurchases += 1
-            
-            # Calculate average frequency if we have previous purchase
-            if stats.totalPurchases > 1 and stats.lastBought:
-                # Simple frequency calculation (can be improved)
-                # For now, just estimate based on total purchases
-                days_since_first = (datetime.now() - datetime.fromisoformat(stats.lastBought)).days
-                if days_since_first > 0:
-                    stats.averageFrequency = max(1, days_since_first // stats.totalPurchases)
-    
-    # Add trip to history
-    grocery_data.history.append(shopping_trip)
-    
-    # Clean history - keep only last 4 weeks
-    four_weeks_ago = datetime.now() - timedelta(weeks=4)
-    grocery_data.history = [
-        trip for trip in grocery_data.history
-        if datetime.fromisoformat(trip.completedAt) > four_weeks_ago
-    ]
-    
-    # Create new empty current list
-    grocery_data.current = CurrentList(
-        date=datetime.now().strftime('%Y-%m-%d'),
-        items=[]
-    )
+        # Update item statistics for checked items
+        bought_ids = []
+        for trip_item in shopping_trip.items:
+            if trip_item.checked:
+                bought_ids.append(trip_item.entry.id)
+                stats = grocery_data.itemStats.setdefault(trip_item.entry.id, ItemStats())
+                stats.lastBought = completion_time
+                stats.totalPurchases += 1
+                # averageFrequency is recomputed from history by the stats_rebuild job
+    
+        # Add trip to history (trips older than HISTORY_RETENTION_DAYS are pruned by the
+        # history_retention job, off the request path)
+        grocery_data.history.append(shopping_trip)
+    
+        # Create new empty current list
+        grocery_data.current = CurrentList(
+            date=datetime.now().strftime('%Y-%m-%d'),
+            items=[]
+        )
     
-    # Save updated data
-    write_grocery_data(grocery_data)
+        # Save updated data
+        write_grocery_data(grocery_data, household_id, Changes(trips=(shopping_trip,), stats=tuple(bought_ids)))
     
-    return jsonify({
-        'success': True,
-        'trip': shopping_trip.to_dict(),
-        'message': f'Shopping trip completed! {checked_items} of {total_items} items checked off.'
-    })
+        return jsonify({
+            'success': True,
+            'trip': build_trip_view(shopping_trip),
+            'message': f'Shopping trip completed! {checked_items} of {total_items} items checked off.'
+        })
 
 
-@app.route('/get-history', methods=['GET'])
-def get_history():
+@household_route('/get-history', methods=['GET'])
+def get_history(household_id):
     """Get shopping history (last 4 weeks) (v2)."""
-    ensure_data_initialized()
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
     
-    grocery_data = read_grocery_data()
+        # Calculate days ago for each trip
+        now = datetime.now()
+        trips_with_metadata = []
     
-    # Calculate days ago for each trip
-    now = datetime.now()
-    trips_with_metadata = []
-    
-    for trip in grocery_data.history:
-        trip_date = datetime.fromisoformat(trip.completedAt)
-        days_ago = (now - trip_date).days
+        for trip in grocery_data.history:
+            trip_date = datetime.fromisoformat(trip.completedAt)
+            days_ago = (now - trip_date).days
         
-        trip_dict = trip.to_dict()
-        trip_dict['daysAgo'] = days_ago
-        trips_with_metadata.append(trip_dict)
+            trip_dict = build_trip_view(trip)
+            trip_dict['daysAgo'] = days_ago
+            trips_with_metadata.append(trip_dict)
     
-    # Sort by completion date (newest first)
-    trips_with_metadata.sort(key=lambda x: x['completedAt'], reverse=True)
+        # Sort by completion date (newest first)
+        trips_with_metadata.sort(key=lambda x: x['completedAt'], reverse=True)
     
-    return jsonify({
-        'trips': trips_with_metadata,
-        'totalTrips': len(trips_with_metadata)
-    })
+        return jsonify({
+            'trips': trips_with_metadata,
+            'totalTrips': len(trips_with_metadata)
+        })
 
 
-@app.route('/copy-from-last-trip', methods=['POST'])
-def copy_from_last_trip():
+@household_route('/copy-from-last-trip', methods=['POST'])
+def copy_from_last_trip(household_id):
     """Copy items from the most recent trip to current list (v2)."""
-    ensure_data_initialized()
-    
-    grocery_data = read_grocery_data()
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+    
+        # Check if there's any history
+        if not grocery_data.history:
+            return jsonify({'error': 'No previous trips found'}), 404
+    
+        # Get the most recent trip
+        last_trip = max(grocery_data.history, key=lambda t: t.completedAt)
+    
+        # Get existing item names (case-insensitive) for duplicate checking
+        existing_names = {item.name.lower(): item for item in grocery_data.current.items}
+    
+        copied = []
+        skipped = []
+        new_items = []
+    
+        for trip_item in last_trip.items:
+            # Check for duplicates (case-insensitive)
+            if trip_item.name.lower() in existing_names:
+                skipped.append({
+                    'name': trip_item.name,
+                    'category': trip_item.category,
+                    'reason': 'Already in current list'
+                })
+                continue
+        
+            # Create new item (with new ID and timestamp)
+            new_item = GroceryItem(
+                id=str(uuid.uuid4()),
+                name=trip_item.name,
+                category=trip_item.category,
+                checked=False,  # Always start unchecked
+                addedAt=datetime.now().isoformat(),
+                checkedAt=None
+            )
+        
+            grocery_data.current.items.append(new_item)
+            new_items.append(new_item)
+            existing_names[trip_item.name.lower()] = new_item
+        
+            copied.append({
+                'name': trip_item.name,
+                'category': trip_item.category
+            })
     
-    # Check if there's any history
-    if not grocery_data.history:
-        return jsonify({'error': 'No previous trips found'}), 404
+        # Save updated data
+        write_grocery_data(grocery_data, household_id, Changes(items=tuple(new_items)))
     
-    # Get the most recent trip
-    last_trip = max(grocery_data.history, key=lambda t: t.completedAt)
+        return jsonify({
+            'success': True,
+            'copied': copied,
+            'skipped': skipped,
+            'copiedCount': len(copied),
+            'skippedCount': len(skipped),
+            'totalItems': len(grocery_data.current.items)
+        })
+
+
+def _apply_batch_op(grocery_data: GroceryData, op: Dict, existing_names: Dict, touched: List) -> Dict:
+    """Apply one /batch operation in memory and return its result; added/toggled items go to `touched`."""
+    op_type = op.get('type')
+    now = datetime.now().isoformat()
+
+    if op_type in ('toggle', 'delete'):
+        item_id = op.get('itemId')
+        index = next((i for i, item in enumerate(grocery_data.current.items) if item.id == item_id), None)
+        if index is None:
+            return {'status': 'error', 'error': 'Item not found', 'itemId': item_id}
+        item = grocery_data.current.items[index]
+
+        if op_type == 'delete':
+            grocery_data.current.items.pop(index)
+            existing_names.pop(item.name.lower(), None)
+            return {'status': 'applied', 'itemId': item_id, 'deleted': item.name}
+
+        # An explicit target state keeps queued toggles idempotent; otherwise flip
+        checked = op['checked'] if isinstance(op.get('checked'), bool) else not item.checked
+        if checked != item.checked:
+            item.checked = checked
+            item.checkedAt = now if checked else None
+            touched.append(item)
+        return {'status': 'applied', 'itemId': item_id, 'checked': item.checked, 'checkedAt': item.checkedAt}
+
+    if op_type == 'add':
+        name = (op.get('name') or '').strip()
+        if not name:
+            return {'status': 'error', 'error': 'No name provided'}
+        if name.lower() in existing_names:
+            existing = existing_names[name.lower()]
+            return {'status': 'skipped', 'reason': 'Already in list', 'itemId': existing.id, 'name': existing.name}
+
+        category = validate_category(op['category']) if op.get('category') else detect_category_fallback(name)
+        # Offline clients pre-assign ids so later queued ops can reference the new item
+        client_id = op.get('itemId')
+        taken = any(item.id == client_id for item in grocery_data.current.items)
+        item_id = client_id if isinstance(client_id, str) and 0 < len(client_id) <= 64 and not taken else str(uuid.uuid4())
+
+        new_item = GroceryItem(id=item_id, name=name, category=category, checked=False, addedAt=now, checkedAt=None)
+        grocery_data.current.items.append(new_item)
+        existing_names[name.lower()] = new_item
+        touched.append(new_item)
+        return {'status': 'applied', 'itemId': item_id, 'name': name, 'category': category}
+
+    return {'status': 'error', 'error': f"Unknown op type '{op_type}'"}
+
+
+@household_route('/batch', methods=['POST'])
+def batch(household_id):
+    """Apply an ordered list of toggle/delete/add ops in one load-modify-persist cycle.
+
+    Each op carries a client opId; ops already applied are not re-applied and
+    return their original result, so offline queues can be replayed safely.
+    """
+    data = request.get_json(silent=True)
     
-    # Get existing item names (case-insensitive) for duplicate checking
-    existing_names = {item.name.lower(): item for item in grocery_data.current.items}
+    if not data or not isinstance(data.get('ops'), list):
+        return jsonify({'error': 'No ops provided'}), 400
     
-    copied = []
-    skipped = []
+    ops = data['ops']
+    if len(ops) > BATCH_MAX_OPS:
+        return jsonify({'error': f'Too many ops (max {BATCH_MAX_OPS})'}), 400
     
-    for trip_item in last_trip.items:
-        # Check for duplicates (case-insensitive)
-        if trip_item.name.lower() in existing_names:
-            skipped.append({
-                'name': trip_item.name,
-                'category': trip_item.category,
-                'reason': 'Already in current list'
-            })
-            continue
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        existing_names = {item.name.lower(): item for item in grocery_data.current.items}
         
-        # Create new item (with new ID and timestamp)
-        new_item = GroceryItem(
-            id=str(uuid.uuid4()),
-            name=trip_item.name,
-            category=trip_item.category,
-            checked=False,  # Always start unchecked
-            addedAt=datetime.now().isoformat(),
-            checkedAt=None
-        )
+        results = []
+        changed = False
+        touched = []
+        for op in ops:
+            op_id = op.get('opId') if isinstance(op, dict) else None
+            if not isinstance(op_id, str) or not op_id:
+                results.append({'opId': op_id, 'status': 'error', 'error': 'Missing opId'})
+                continue
+            
+            if op_id in grocery_data.appliedOps:
+                results.append({**grocery_data.appliedOps[op_id], 'opId': op_id, 'replayed': True})
+                continue
+            
+            result = _apply_batch_op(grocery_data, op, existing_names, touched)
+            grocery_data.appliedOps[op_id] = result
+            results.append({**result, 'opId': op_id})
+            changed = True
         
-        grocery_data.current.items.append(new_item)
-        existing_names[trip_item.name.lower()] = new_item
+        if changed:
+            # Remember only the most recent op ids
+            overflow = len(grocery_data.appliedOps) - APPLIED_OPS_LIMIT
+            for old_op_id in list(grocery_data.appliedOps)[:max(0, overflow)]:
+                del grocery_data.appliedOps[old_op_id]
+            
+            # Save updated data
+            write_grocery_data(grocery_data, household_id, Changes(items=tuple(touched)))
         
-        copied.append({
-            'name': trip_item.name,
-            'category': trip_item.category
+        return jsonify({
+            'success': True,
+            'results': results,
+            'totalItems': len(grocery_data.current.items),
+            'checkedItems': sum(1 for item in grocery_data.current.items if item.checked)
         })
-    
-    # Save updated data
-    write_grocery_data(grocery_data)
-    
-    return jsonify({
-        'success': True,
-        'copied': copied,
-        'skipped': skipped,
-        'copiedCount': len(copied),
-        'skippedCount': len(skipped),
-        'totalItems': len(grocery_data.current.items)
-    })
 
 
-@app.route('/clear-all', methods=['POST'])
-def clear_all():
+@household_route('/export', methods=['GET'])
+def export_data(household_id):
+    """Stream the household's items, trips and stats as NDJSON."""
+    response = Response(stream_with_context(export_records(household_id)), mimetype='application/x-ndjson')
+    filename = f"grocery-{household_id}-{datetime.now().strftime('%Y%m%d')}.ndjson"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@household_route('/import', methods=['POST'])
+def import_data(household_id):
+    """Replace (or ?mode=merge) the household's data from an NDJSON body, read line by line."""
+    try:
+        result = import_records(request.stream, household_id, request.args.get('mode', 'replace'))
+    except NdjsonImportError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, **result})
+
+
+@household_route('/clear-all', methods=['POST'])
+def clear_all(household_id):
     """Clear all items from the list (v2)."""
-    ensure_data_initialized()
-    
-    grocery_data = read_grocery_data()
-    grocery_data.current.items = []  # Clear all items
-    write_grocery_data(grocery_data)
+    with household_lock(household_id):
+        grocery_data = read_grocery_data(household_id)
+        grocery_data.current.items = []  # Clear all items
+        write_grocery_data(grocery_data, household_id, Changes())
     
-    return jsonify({
-        'success': True,
-        'message': 'All items cleared',
-        'total': 0
-    })
+        return jsonify({
+            'success': True,
+            'message': 'All items cleared',
+            'total': 0
+        })
+
+
+# ==================== CLI ====================
+
+snapshots_cli = AppGroup('snapshots', help='List and restore household snapshots.')
+app.cli.add_command(snapshots_cli)
+
+
+@snapshots_cli.command('list')
+@click.option('--household', 'household_id', default=DEFAULT_HOUSEHOLD, show_default=True)
+def snapshots_list_command(household_id):
+    """List a household's snapshots, newest first."""
+    snapshots = list_snapshots(household_id)
+    if not snapshots:
+        click.echo(f"No snapshots for household '{household_id}'")
+        return
+    for taken_at, path in snapshots:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        click.echo(f"{os.path.basename(path)}  {taken_at:%Y-%m-%d %H:%M:%S}  "
+                   f"{os.path.getsize(path):>9} bytes  {len(data['current']['items']):>4} items  "
+                   f"{len(data['history']):>5} trips")
+
+
+@snapshots_cli.command('restore')
+@click.argument('snapshot')
+@click.option('--household', 'household_id', default=DEFAULT_HOUSEHOLD, show_default=True)
+def snapshots_restore_command(snapshot, household_id):
+    """Roll a household back to SNAPSHOT (a name from `flask snapshots list`)."""
+    snapshot_path = os.path.join(household_snapshot_dir(household_id), os.path.basename(snapshot))
+    if not os.path.exists(snapshot_path):
+        raise click.ClickException(f"Snapshot '{snapshot}' not found for household '{household_id}'")
+    restore_snapshot(household_id, snapshot_path)
+    click.echo(f"Restored household '{household_id}' from {os.path.basename(snapshot_path)}")
+
+
+@app.cli.command('import-items')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--household', 'household_id', default=DEFAULT_HOUSEHOLD, show_default=True)
+@click.option('--format', 'fmt', type=click.Choice(['auto', 'lines', 'csv']), default='auto', show_default=True,
+              help='auto: csv for *.csv, otherwise one item per line')
+@click.option('--column', help='CSV column holding item names (default: first column, no header)')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Names per model call')
+@click.option('--workers', default=IMPORT_MODEL_WORKERS, show_default=True, help='Concurrent model calls')
+@click.option('--no-model', is_flag=True, help='Keyword index only; unknown items go to Other')
+def import_items_command(source, household_id, fmt, column, batch_size, workers, no_model):
+    """Add every item in SOURCE (a file, or - for stdin) to a household's list in one write."""
+    if fmt == 'auto':
+        fmt = 'csv' if source.name.lower().endswith('.csv') else 'lines'
+    bootstrap_data()
+    refresh_category_classifier()  # no background training in CLI commands
+    try:
+        result = import_items(iter_import_names(source, fmt, column), household_id,
+                              batch_size=batch_size, workers=workers, use_model=not no_model)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Read {result['read']} names: added {result['added']}, skipped {result['duplicates']} duplicates "
+               f"({result['keyword']} categorized by keyword, {result['model']} by model)")
+    click.echo(f"{result['seconds']:.2f}s, {result['itemsPerSecond']} items/s; "
+               f"list now has {result['total']} items")
+
+
+@app.cli.command('export-data')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--household', 'household_id', default=DEFAULT_HOUSEHOLD, show_default=True)
+def export_data_command(output, household_id):
+    """Write a household's data as NDJSON to OUTPUT (default stdout)."""
+    bootstrap_data()
+    for line in export_records(household_id):
+        output.write(line)
+
+
+@app.cli.command('import-data')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--household', 'household_id', default=DEFAULT_HOUSEHOLD, show_default=True)
+@click.option('--mode', type=click.Choice(['replace', 'merge']), default='replace', show_default=True)
+def import_data_command(source, household_id, mode):
+    """Load an NDJSON export from SOURCE (a file, or - for stdin) into a household."""
+    bootstrap_data()
+    try:
+        result = import_records(source, household_id, mode)
+    except NdjsonImportError as e:
+        raise click.ClickException(str(e))
+    counts = result['imported']
+    click.echo(f"Imported {counts['items']} items, {counts['trips']} trips, {counts['stats']} stats ({mode}, "
+               f"{result['duplicates']} duplicates skipped); "
+               f"household now has {result['totalItems']} items and {result['totalTrips']} trips")
+
+
+@app.cli.command('validate-data')
+@click.option('--household', 'household_ids', multiple=True, help='Household to check (default: all on disk)')
+def validate_data_command(household_ids):
+    """Strict, full deep check of stored households (exit status 1 on problems)."""
+    household_ids = list(household_ids) or known_households()
+    problems = check_all_households(household_ids)
+    for household_id in household_ids:
+        errors = problems.get(household_id, [])
+        click.echo(f"{household_id}: {'OK' if not errors else f'{len(errors)} problem(s)'}")
+        for error in errors:
+            click.echo(f"  - {error}")
+    if problems:
+        raise SystemExit(1)
+
+
+@app.cli.command('run-maintenance')
+@click.argument('jobs', nargs=-1)
+def run_maintenance_command(jobs):
+    """Run maintenance JOBS now (default: all), ignoring their schedules."""
+    bootstrap_data()
+    for name in jobs or maintenance.jobs:
+        if name not in maintenance.jobs:
+            raise click.ClickException(f"Unknown job '{name}' (known: {', '.join(maintenance.jobs)})")
+        started = time.perf_counter()
+        outcome = maintenance.run_job(name, force=True)
+        click.echo(f"{name}: {outcome} in {time.perf_counter() - started:.2f}s")
 
 
 if __name__ == '__main__':
+    # With the debug reloader, start background work only in the child process that serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        init_app()
     app.run(host='127.0.0.1', port=5000, debug=True)
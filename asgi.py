@@ -0,0 +1,176 @@
+"""
+ASGI entry point for Smart Grocery List
+
+/add-item (and /h/<household>/add-item) is handled natively on the event
+loop: the Gemini call is awaited through the model's async client, so a slow
+parse holds a coroutine instead of a worker thread. The storage half of the
+request (read, merge, write under the household lock) runs on a thread pool.
+Every other route is the unchanged Flask app, run on the same pool.
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+SYNC_WORKER_THREADS (default 16) sizes the thread pool shared by the Flask
+routes and the storage step of /add-item.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+import app as grocery_app
+
+SYNC_WORKER_THREADS = int(os.getenv('SYNC_WORKER_THREADS', '16'))
+MAX_BODY_BYTES = 64 * 1024  # /add-item bodies are a line of text
+
+sync_executor = ThreadPoolExecutor(max_workers=SYNC_WORKER_THREADS, thread_name_prefix='asgi-sync')
+
+ADD_ITEM_PATH = re.compile(
+    rf'^(?:/h/(?P<household_id>{grocery_app.HouseholdIdConverter.regex}))?/add-item$'
+)
+
+
+# ==================== WSGI DELEGATION ====================
+
+# asgiref exposes no executor option for WsgiToAsgi: run_wsgi_app is a plain
+# method wrapped in @sync_to_async (a SyncToAsync, with the method as .func)
+# and must run on the same thread as the WSGI app. We rewrap that method for
+# our pool, so fail at import if a release has changed that layout (checked
+# against asgiref 3.8 to 3.12).
+_run_wsgi_app = getattr(vars(WsgiToAsgiInstance).get('run_wsgi_app'), 'func', None)
+if not callable(_run_wsgi_app):
+    raise ImportError('asgiref.wsgi.WsgiToAsgiInstance.run_wsgi_app is no longer a sync_to_async wrapper; '
+                      'update _PooledWsgiInstance for this asgiref release')
+
+
+class _PooledWsgiInstance(WsgiToAsgiInstance):
+    """WsgiToAsgiInstance that runs the WSGI app on sync_executor.
+
+    asgiref's default is thread_sensitive, which funnels every request through
+    a single thread; Flask views are thread-safe here (per-household locks).
+    """
+
+    run_wsgi_app = sync_to_async(_run_wsgi_app, thread_sensitive=False, executor=sync_executor)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _PooledWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+flask_application = PooledWsgiToAsgi(grocery_app.app)
+
+
+# ==================== ASYNC /add-item ====================
+
+async def _read_body(receive):
+    """Collect the request body; None if it exceeds MAX_BODY_BYTES."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                    *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _resolve_locally(household_id, raw_text):
+    """Catalog and classifier pass of the Flask view (runs on the pool: it may read the shard)."""
+    grocery_app.bootstrap_data()  # no-op once done; covers servers without lifespan events
+    with grocery_app.household_lock(household_id):
+        return grocery_app.resolve_items_locally(grocery_app.read_grocery_data(household_id), raw_text)
+
+
+def _client_key(scope):
+    """Same rate-limit identity as the Flask view (API key, else client address)."""
+    headers = {name: value.decode('latin-1') for name, value in scope['headers']}  # names are lower-case
+    client = scope.get('client')
+    return grocery_app.client_key(headers.get(b'x-api-key'), client[0] if client else None,
+                                  headers.get(b'x-forwarded-for'))
+
+
+async def add_item(scope, receive, send, household_id):
+    """Async /add-item: same validation, parsing and payload as the Flask view."""
+    started = time.perf_counter()
+    status = 200
+
+    body = await _read_body(receive)
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+
+    raw_text, error = grocery_app.read_add_item_text(data) if body is not None else (None, 'Request too large')
+    headers = []
+    if error:
+        status = 413 if body is None else 400
+        payload = {'error': error}
+    else:
+        try:
+            parsed_items, leftover = await sync_to_async(_resolve_locally, thread_sensitive=False,
+                                                         executor=sync_executor)(household_id, raw_text)
+            if leftover:
+                leftover_text = ', '.join(leftover)
+                if grocery_app.model_allowed_for(_client_key(scope)):
+                    parsed_items += await grocery_app.parse_grocery_items_with_gemini_async(
+                        leftover_text, on_overload=grocery_app.MODEL_OVERFLOW)
+                else:
+                    parsed_items += grocery_app.simple_fallback_parse_with_categories(leftover_text)
+        except grocery_app.AdmissionRejected as rejected:
+            status = 429
+            payload, retry_after = grocery_app.too_many_requests_payload(rejected)
+            headers.append((b'retry-after', str(retry_after).encode()))
+        else:
+            payload = await sync_to_async(grocery_app.apply_parsed_items, thread_sensitive=False,
+                                          executor=sync_executor)(household_id, parsed_items)
+
+    await _send_json(send, status, payload, headers)
+
+    grocery_app.http_request_duration.observe(time.perf_counter() - started, route='add_item', method='POST')
+    grocery_app.http_requests_total.inc(route='add_item', method='POST', status=str(status))
+
+
+# ==================== APPLICATION ====================
+
+async def application(scope, receive, send):
+    """ASGI app: native async /add-item, everything else through Flask."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Data bootstrap and background jobs start with the server, not on import
+                await sync_to_async(grocery_app.init_app, thread_sensitive=False, executor=sync_executor)()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                sync_executor.shutdown(wait=True)
+                grocery_app.flush_pending_writes()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] == 'http' and scope['method'] == 'POST':
+        match = ADD_ITEM_PATH.match(scope['path'])
+        if match:
+            await add_item(scope, receive, send, match.group('household_id') or grocery_app.DEFAULT_HOUSEHOLD)
+            return
+
+    await flask_application(scope, receive, send)
@@ -0,0 +1,3 @@
+"""
+Benchmark suite for Smart Grocery List endpoints
+"""
@@ -0,0 +1,133 @@
+"""
+Catalog benchmark: data format 2.0 (full item copies) vs 2.1 (item catalog)
+
+Generates a large synthetic history as a 2.0 document and measures, for both
+formats, the on-disk size (plain and gzip), decode time and the memory held
+by the decoded GroceryData (tracemalloc), plus the 2.0 -> 2.1 migration time.
+The 2.0 decode is modeled by the objects 2.0 held in memory: one GroceryItem
+per trip line and name-keyed stats.
+
+Usage:
+    python -m benchmarks.catalog_benchmark
+    python -m benchmarks.catalog_benchmark --trips 2000 --items-per-list 40 --distinct-items 1500
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+_WORK_DIR = tempfile.mkdtemp(prefix='grocery-catalog-bench-')
+os.environ['GROCERY_DATA_FILE'] = os.path.join(_WORK_DIR, 'grocery_data.json')
+os.environ['GROCERY_DATA_DIR'] = os.path.join(_WORK_DIR, 'households')
+# Snapshots and job locks too, so runs never touch the checkout's snapshots/
+os.environ['GROCERY_SNAPSHOT_DIR'] = os.path.join(_WORK_DIR, 'snapshots')
+os.environ['MAINTENANCE_LOCK_DIR'] = os.path.join(_WORK_DIR, 'locks')
+os.environ.setdefault('GEMINI_WARMUP', 'lazy')
+os.environ.setdefault('MAINTENANCE_ENABLED', '0')
+
+import app as grocery_app  # noqa: E402
+from benchmarks.datagen import generate_legacy_payload  # noqa: E402
+from benchmarks.run_benchmarks import save_results  # noqa: E402
+
+
+def decode_legacy(raw):
+    """What a 2.0 document cost in memory: a GroceryItem per trip line, stats keyed by name."""
+    history = [
+        {**trip, 'items': [grocery_app.GroceryItem(**item) for item in trip['items']]}
+        for trip in raw['history']
+    ]
+    stats = {name: dict(value) for name, value in raw['itemStats'].items()}
+    return history, stats
+
+
+def decode_current(raw):
+    return grocery_app.GroceryData(**raw)
+
+
+def measure_decode(decode, text, repeat):
+    """(median decode seconds, bytes retained by the decoded structure)."""
+    times = []
+    for _ in range(repeat):
+        raw = json.loads(text)
+        start = time.perf_counter()
+        decode(raw)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    decoded = decode(json.loads(text))
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del decoded
+    return statistics.median(times), retained
+
+
+def format_stats(label, text, decode, repeat):
+    encoded = text.encode('utf-8')
+    decode_s, retained = measure_decode(decode, text, repeat)
+    return {
+        'label': label,
+        'bytes': len(encoded),
+        'gzipBytes': len(gzip.compress(encoded, 6)),
+        'decodeMedianMs': decode_s * 1000,
+        'retainedBytes': retained,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trips', type=int, default=1000)
+    parser.add_argument('--items-per-list', type=int, default=30)
+    parser.add_argument('--distinct-items', type=int, default=800)
+    parser.add_argument('--years', type=float, default=5.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Where to save the JSON results')
+    args = parser.parse_args(argv)
+
+    legacy = generate_legacy_payload(args.items_per_list, args.trips, args.distinct_items, args.years, args.seed)
+    legacy_text = json.dumps(legacy, separators=(',', ':'))
+
+    migrations = []
+    for _ in range(args.repeat):
+        raw = json.loads(legacy_text)
+        start = time.perf_counter()
+        migrated = grocery_app.GroceryData(**raw)
+        migrations.append(time.perf_counter() - start)
+    current_text = json.dumps(migrated.to_dict(), separators=(',', ':'))
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'params': vars(args),
+            'catalogEntries': len(migrated.catalog),
+            'tripLines': sum(len(trip.items) for trip in migrated.history),
+        },
+        'formats': {
+            grocery_app.LEGACY_DATA_VERSION: format_stats('full copies', legacy_text, decode_legacy, args.repeat),
+            grocery_app.DATA_VERSION: format_stats('catalog', current_text, decode_current, args.repeat),
+        },
+        'migrationMedianMs': statistics.median(migrations) * 1000,
+    }
+
+    old = results['formats'][grocery_app.LEGACY_DATA_VERSION]
+    new = results['formats'][grocery_app.DATA_VERSION]
+    print(f"{results['meta']['tripLines']} trip lines, {results['meta']['catalogEntries']} catalog entries\n")
+    print(f"{'':<18}{'2.0':>14}{'2.1':>14}{'change':>10}")
+    for key in ('bytes', 'gzipBytes', 'retainedBytes', 'decodeMedianMs'):
+        print(f"{key:<18}{old[key]:>14,.1f}{new[key]:>14,.1f}{(new[key] / old[key] - 1) * 100:>9.0f}%")
+    print(f"\nMigration 2.0 -> 2.1: {results['migrationMedianMs']:.1f} ms")
+    print(f"Results saved to {save_results(results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
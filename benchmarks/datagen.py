@@ -0,0 +1,114 @@
+"""
+Synthetic GroceryData generator for benchmarks
+Builds households of configurable size from realistic item names
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from app import (
+    LEGACY_DATA_VERSION,
+    GroceryData,
+    GroceryItem,
+    detect_category_fallback,
+)
+from tests.fixtures.test_data import COMMON_GROCERY_ITEMS
+
+# Prefixes used to grow COMMON_GROCERY_ITEMS into as many distinct names as needed
+NAME_MODIFIERS = [
+    "Organic", "Fresh", "Whole", "Low Fat", "Smoked", "Baby", "Large", "Mini",
+    "Spicy", "Sweet", "Unsalted", "Roasted", "Wild", "Family Size", "Store Brand",
+]
+
+
+def generate_item_names(distinct_items, seed=0):
+    """Return `distinct_items` unique, realistic-looking item names."""
+    rng = random.Random(seed)
+    names = list(COMMON_GROCERY_ITEMS)
+    combos = [f"{modifier} {base}" for modifier in NAME_MODIFIERS for base in COMMON_GROCERY_ITEMS]
+    rng.shuffle(combos)
+    names.extend(combos)
+
+    counter = 2
+    while len(names) < distinct_items:
+        names.extend(f"{base} {counter}" for base in COMMON_GROCERY_ITEMS)
+        counter += 1
+
+    return names[:distinct_items]
+
+
+def _make_item(name, category, added_at, checked=False):
+    return GroceryItem(
+        id=str(uuid.uuid4()),
+        name=name,
+        category=category,
+        checked=checked,
+        addedAt=added_at.isoformat(),
+        checkedAt=added_at.isoformat() if checked else None
+    )
+
+
+def generate_legacy_payload(items_per_list=30, trips=100, distinct_items=300, years=1.0, seed=0):
+    """
+    Generate a household as a data format 2.0 document (dict).
+
+    2.0 stored a full item copy in every trip and keyed itemStats by name;
+    loading it into GroceryData migrates it to the catalog format.
+
+    - items_per_list: items on the current list and on each historical trip
+    - trips: number of completed trips, spread evenly over `years` of history
+    - distinct_items: size of the item vocabulary drawn from
+    - years: how far back the history goes
+    """
+    rng = random.Random(seed)
+    names = generate_item_names(distinct_items, seed)
+    categories = {name: detect_category_fallback(name) for name in names}
+    per_list = min(items_per_list, len(names))
+
+    now = datetime.now()
+    span = timedelta(days=365 * years)
+    history = []
+    item_stats = {}
+
+    for trip_index in range(trips):
+        completed_at = now - span + span * (trip_index + 1) / max(trips, 1)
+        trip_items = [
+            _make_item(name, categories[name], completed_at - timedelta(hours=2), checked=rng.random() < 0.85)
+            for name in rng.sample(names, per_list)
+        ]
+        history.append({
+            'id': str(uuid.uuid4()),
+            'date': completed_at.strftime('%Y-%m-%d'),
+            'completedAt': completed_at.isoformat(),
+            'items': [item.to_dict() for item in trip_items],
+            'totalItems': len(trip_items),
+            'checkedItems': sum(1 for item in trip_items if item.checked)
+        })
+
+        for item in trip_items:
+            if not item.checked:
+                continue
+            stats = item_stats.setdefault(item.name, {'lastBought': None, 'totalPurchases': 0,
+                                                      'averageFrequency': None, 'category': item.category})
+            stats['totalPurchases'] += 1
+            stats['lastBought'] = completed_at.isoformat()
+            stats['averageFrequency'] = max(1, int(365 * years) // stats['totalPurchases'])
+
+    current_items = [
+        _make_item(name, categories[name], now - timedelta(minutes=i), checked=rng.random() < 0.3)
+        for i, name in enumerate(rng.sample(names, per_list))
+    ]
+
+    return {
+        'version': LEGACY_DATA_VERSION,
+        'current': {'date': now.strftime('%Y-%m-%d'), 'items': [item.to_dict() for item in current_items]},
+        'history': history,
+        'itemStats': item_stats,
+        'appliedOps': {}
+    }
+
+
+def generate_grocery_data(items_per_list=30, trips=100, distinct_items=300, years=1.0, seed=0):
+    """Generate a GroceryData structure (see generate_legacy_payload for the parameters)."""
+    return GroceryData(**generate_legacy_payload(items_per_list, trips, distinct_items, years, seed))
@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for Smart Grocery List
+
+Spawns fresh interpreters and measures how long `import app` takes, how long
+until the first request is served, and (with -X importtime) which modules
+dominate the import.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 20 --backend gemini
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Same place as run_benchmarks (not imported: it imports the app in this process)
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+# Runs in the child interpreter; prints timings as JSON
+CHILD_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.get('/get-current-list')
+first_response = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'first_response_s': first_response - start}))
+"""
+
+
+def _child_env(backend, work_dir):
+    env = dict(os.environ)
+    env['GEMINI_BACKEND'] = backend
+    env['GROCERY_DATA_FILE'] = os.path.join(work_dir, 'grocery_data.json')
+    env['GROCERY_DATA_DIR'] = os.path.join(work_dir, 'households')
+    env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def time_cold_starts(runs, backend):
+    """Return per-run import and first-response timings (seconds)."""
+    samples = []
+    for _ in range(runs):
+        work_dir = tempfile.mkdtemp(prefix='grocery-coldstart-')
+        out = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT],
+            cwd=work_dir, env=_child_env(backend, work_dir),
+            capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def slowest_imports(backend, top):
+    """Parse `-X importtime` output and return the `top` modules by cumulative time."""
+    work_dir = tempfile.mkdtemp(prefix='grocery-importtime-')
+    out = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=work_dir, env=_child_env(backend, work_dir),
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({'module': name.strip(), 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+    return rows[:top]
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        'min_ms': values[0] * 1000,
+        'median_ms': statistics.median(values) * 1000,
+        'max_ms': values[-1] * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--backend', default='gemini', help='GEMINI_BACKEND for the child processes')
+    parser.add_argument('--top', type=int, default=10, help='How many slow imports to list')
+    parser.add_argument('--output', help='Where to save the JSON results')
+    args = parser.parse_args(argv)
+
+    samples = time_cold_starts(args.runs, args.backend)
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'params': vars(args),
+        },
+        'import': summarize([s['import_s'] for s in samples]),
+        'firstResponse': summarize([s['first_response_s'] for s in samples]),
+        'slowestImports': slowest_imports(args.backend, args.top),
+    }
+
+    print(f"import app:      median {results['import']['median_ms']:.1f} ms "
+          f"(min {results['import']['min_ms']:.1f}, max {results['import']['max_ms']:.1f})")
+    print(f"first response:  median {results['firstResponse']['median_ms']:.1f} ms")
+    print("\nSlowest imports (cumulative):")
+    for row in results['slowestImports']:
+        print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    if args.output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        args.output = os.path.join(RESULTS_DIR, f"coldstart-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Prompt benchmark: v1 free-form prompt vs the compiled structured-output prompt
+
+Runs the sample messages from tests/fixtures through both prompt builders and
+the in-process fake model, and records prompt size, estimated input tokens,
+build time, parse time and parse outcomes.
+
+Token counts are estimated at ~4 characters per token (the fake model's
+estimator). Modeled model latency is `--base-ms + --ms-per-1k-tokens` per
+1000 input tokens; set those from your own Gemini measurements.
+
+Usage:
+    python -m benchmarks.prompt_benchmark
+    python -m benchmarks.prompt_benchmark --ms-per-1k-tokens 120 --malformed-rate 0.02
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+_WORK_DIR = tempfile.mkdtemp(prefix='grocery-prompt-bench-')
+os.environ['GROCERY_DATA_FILE'] = os.path.join(_WORK_DIR, 'grocery_data.json')
+os.environ['GROCERY_DATA_DIR'] = os.path.join(_WORK_DIR, 'households')
+# Snapshots and job locks too, so runs never touch the checkout's snapshots/
+os.environ['GROCERY_SNAPSHOT_DIR'] = os.path.join(_WORK_DIR, 'snapshots')
+os.environ['MAINTENANCE_LOCK_DIR'] = os.path.join(_WORK_DIR, 'locks')
+os.environ.setdefault('GEMINI_WARMUP', 'lazy')
+
+import app as grocery_app  # noqa: E402
+import fake_gemini  # noqa: E402
+from benchmarks.run_benchmarks import save_results  # noqa: E402
+from tests.fixtures.test_data import COMPLEX_SCENARIOS, IOS_TEST_MESSAGES, NATURAL_LANGUAGE_TESTS  # noqa: E402
+
+
+def build_v1_prompt(raw_text):
+    """The original prompt: rebuilt per call, raw_text embedded twice, two few-shot examples."""
+    categories_list = ", ".join(grocery_app.get_taxonomy().names)
+    return f"""Extract grocery items from this text and assign categories.
+
+Text: "{raw_text}"
+
+Categories: {categories_list}
+
+Rules:
+- Extract ONLY grocery item names
+- Remove quantities, measurements, and numbers (2 gallons, a dozen, etc.)
+- Remove filler words (I, we, need, get, buy, grab, pick up, for, etc.)
+- Remove articles (a, an, the)
+- Normalize to title case (Milk, not milk)
+- Assign the most appropriate category
+- Return as JSON array
+
+Format:
+[
+  {{"name": "Milk", "category": "Dairy"}},
+  {{"name": "Apples", "category": "Produce"}}
+]
+
+Examples:
+Input: "We need milk, eggs, and bread"
+Output: [
+  {{"name": "Milk", "category": "Dairy"}},
+  {{"name": "Eggs", "category": "Dairy"}},
+  {{"name": "Bread", "category": "Bakery"}}
+]
+
+Input: "Get stuff for tacos - ground beef, tortillas, cheese, lettuce"
+Output: [
+  {{"name": "Ground Beef", "category": "Meat & Seafood"}},
+  {{"name": "Tortillas", "category": "Bakery"}},
+  {{"name": "Cheese", "category": "Dairy"}},
+  {{"name": "Lettuce", "category": "Produce"}}
+]
+
+Now extract from: "{raw_text}"
+"""
+
+
+def build_v2_prompt(raw_text):
+    return grocery_app.build_prompt(raw_text)
+
+
+def sample_messages():
+    messages = [m['message'] for m in IOS_TEST_MESSAGES if m['message']]
+    messages += [text for text, _ in COMPLEX_SCENARIOS + NATURAL_LANGUAGE_TESTS]
+    return messages
+
+
+def time_builder(builder, messages, repeat):
+    """Median microseconds to build one prompt."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            builder(message)
+        samples.append((time.perf_counter() - start) / len(messages))
+    return statistics.median(samples) * 1e6
+
+
+def run_through_stub(label, builder, messages, malformed_rate, seed):
+    """Send every message through the fake model and parse the reply like the app does."""
+    structured = label == 'v2'
+    injector = fake_gemini.FaultInjector(malformed_rate=malformed_rate, fence_rate=1.0, seed=seed)
+    model = fake_gemini.FakeGeminiModel(grocery_app.simple_fallback_parse_with_categories, injector)
+
+    parse_failures = 0
+    parse_times = []
+    prompt_tokens = []
+    for message in messages:
+        built = builder(message)
+        prompt, generation_config = built if structured else (built, None)
+        response = model.generate_content(prompt, generation_config=generation_config)
+        prompt_tokens.append(response.usage_metadata.prompt_token_count)
+
+        start = time.perf_counter()
+        try:
+            json.loads(grocery_app._strip_code_fences(response.text.strip()))
+        except ValueError:
+            parse_failures += 1
+        parse_times.append(time.perf_counter() - start)
+
+    return {
+        'promptTokensMean': statistics.mean(prompt_tokens),
+        'parseMedianUs': statistics.median(parse_times) * 1e6,
+        'parseFailures': parse_failures,
+        'calls': len(messages),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--base-ms', type=float, default=300.0, help='Modeled fixed model latency')
+    parser.add_argument('--ms-per-1k-tokens', type=float, default=100.0, help='Modeled latency per 1000 input tokens')
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help='Chatty/non-JSON reply rate injected in free-form (v1) mode; JSON mode is schema-constrained')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Where to save the JSON results')
+    args = parser.parse_args(argv)
+
+    messages = sample_messages()
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'promptVersion': grocery_app.PROMPT_VERSION,
+            'messages': len(messages),
+            'params': vars(args),
+        },
+        'prompts': {}
+    }
+
+    for label, builder, malformed_rate in (
+        ('v1', build_v1_prompt, args.malformed_rate),
+        ('v2', build_v2_prompt, 0.0),
+    ):
+        prompts = [builder(m) if label == 'v1' else builder(m)[0] for m in messages]
+        stub = run_through_stub(label, builder, messages, malformed_rate, args.seed)
+        results['prompts'][label] = {
+            'promptCharsMean': statistics.mean(len(p) for p in prompts),
+            'buildMedianUs': time_builder(builder, messages, args.repeat),
+            'modeledModelLatencyMs': args.base_ms + args.ms_per_1k_tokens * stub['promptTokensMean'] / 1000,
+            **stub,
+        }
+
+    v1, v2 = results['prompts']['v1'], results['prompts']['v2']
+    print(f"{'':<26}{'v1':>12}{'v2':>12}")
+    for key in ('promptCharsMean', 'promptTokensMean', 'buildMedianUs', 'parseMedianUs',
+                'modeledModelLatencyMs', 'parseFailures'):
+        print(f"{key:<26}{v1[key]:>12.1f}{v2[key]:>12.1f}")
+    print(f"\nInput tokens: -{(1 - v2['promptTokensMean'] / v1['promptTokensMean']) * 100:.0f}%")
+    print(f"Results saved to {save_results(results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
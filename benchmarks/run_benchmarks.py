@@ -0,0 +1,365 @@
+"""
+Endpoint benchmarks for Smart Grocery List
+
+Generates a synthetic household, drives the page, list, mutation,
+autocomplete, export/import, /metrics and /categories routes through the test
+client with the Gemini parser stubbed out, and reports latency percentiles,
+throughput and peak memory per endpoint, plus a response size report
+(identity vs gzip vs brotli bytes for pages, list payloads and static assets).
+Endpoints with a latency target (TARGETS_P50_MS) are checked against it;
+--check-targets makes a miss exit with status 1.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --items-per-list 60 --trips 500 --distinct-items 2000 --years 3
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/bench-20251031-101500.json
+
+    # End-to-end through the fake model (latency/failure injection) instead of stubbing the parser
+    GEMINI_BACKEND=stub FAKE_GEMINI_LATENCY=lognormal:400,0.5 FAKE_GEMINI_ERROR_RATE=0.05 \
+        python -m benchmarks.run_benchmarks --no-parser-stub --only add_item
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+# Point the app at a scratch data directory before it is imported
+_WORK_DIR = tempfile.mkdtemp(prefix='grocery-bench-')
+os.environ['GROCERY_DATA_FILE'] = os.path.join(_WORK_DIR, 'grocery_data.json')
+os.environ['GROCERY_DATA_DIR'] = os.path.join(_WORK_DIR, 'households')
+# Snapshots and job locks too, so runs never touch the checkout's snapshots/
+os.environ['GROCERY_SNAPSHOT_DIR'] = os.path.join(_WORK_DIR, 'snapshots')
+os.environ['MAINTENANCE_LOCK_DIR'] = os.path.join(_WORK_DIR, 'locks')
+# Measure the routes, not admission control: no per-client rate limit or model-call cap
+os.environ['RATE_LIMIT_PER_MINUTE'] = '0'
+os.environ['MODEL_MAX_CONCURRENCY'] = '0'
+# ...and no background jobs (the first request starts them) rewriting the data or the model mid-run
+os.environ['MAINTENANCE_ENABLED'] = '0'
+os.environ['CLASSIFIER_ENABLED'] = '0'
+
+import app as grocery_app  # noqa: E402
+from benchmarks.datagen import generate_grocery_data  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# p50 latency each endpoint is expected to stay under (ms)
+TARGETS_P50_MS = {
+    'autocomplete': 1.0,
+}
+
+
+# ==================== HELPERS ====================
+
+def stub_parse_grocery_items(raw_text, on_overload='fallback'):
+    """Stand-in for parse_grocery_items_with_gemini (no network, deterministic)."""
+    return grocery_app.simple_fallback_parse_with_categories(raw_text)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def reset_data(baseline):
+    """Restore the default household to the generated baseline."""
+    grocery_app.write_grocery_data(grocery_app.GroceryData(**baseline))
+
+
+def add_scratch_item(name):
+    """Append an item directly to storage and return its id."""
+    data = grocery_app.read_grocery_data()
+    item = grocery_app.GroceryItem(id=str(uuid.uuid4()), name=name, category="Other")
+    data.current.items.append(item)
+    grocery_app.write_grocery_data(data)
+    return item.id
+
+
+# ==================== SCENARIOS ====================
+
+def build_scenarios(baseline):
+    """
+    Return (name, method, path, prepare) tuples.
+
+    `prepare(i)` runs untimed before each call and returns the request payload
+    (see send_request), or None.
+    """
+    first_item_id = baseline['current']['items'][0]['id'] if baseline['current']['items'] else 'missing'
+    item_ids = [item['id'] for item in baseline['current']['items'][:30]]
+    # Typeahead as the user types: 1-3 letter prefixes of known names
+    names = sorted({entry['name'] for entry in baseline['catalog']}) or ['milk']
+    prefixes = [name[:length] for name in names[:50] for length in (1, 2, 3)]
+    export_body = grocery_app.app.test_client().get('/export').get_data()
+
+    def batch_toggles(i):
+        return {'ops': [{'opId': f'bench-{i}-{n}', 'type': 'toggle', 'itemId': item_id}
+                        for n, item_id in enumerate(item_ids)]}
+
+    def no_body(i):
+        return None
+
+    def reset_then_no_body(i):
+        reset_data(baseline)
+        return None
+
+    return [
+        ('index', 'GET', '/', no_body),
+        ('get_current_list', 'GET', '/get-current-list', no_body),
+        ('get_history', 'GET', '/get-history', no_body),
+        ('add_item', 'POST', '/add-item', lambda i: {'text': f'bench item {i}, milk and eggs'}),
+        ('toggle_item', 'POST', '/toggle-item', lambda i: {'itemId': first_item_id}),
+        ('batch_30_toggles', 'POST', '/batch', batch_toggles),
+        ('delete_item', 'POST', '/delete-item', lambda i: {'itemId': add_scratch_item(f'Scratch {i}')}),
+        ('complete_trip', 'POST', '/complete-trip', reset_then_no_body),
+        ('copy_from_last_trip', 'POST', '/copy-from-last-trip', reset_then_no_body),
+        ('clear_all', 'POST', '/clear-all', reset_then_no_body),
+        ('autocomplete', 'GET', '/autocomplete', lambda i: {'q': prefixes[i % len(prefixes)]}),
+        ('export', 'GET', '/export', no_body),
+        ('import_replace', 'POST', '/import', lambda i: export_body),
+        ('metrics', 'GET', '/metrics', no_body),
+        ('categories', 'GET', '/categories', no_body),
+    ]
+
+
+def send_request(client, method, path, body):
+    """One call with the whole response read (streamed bodies included).
+
+    GET bodies are query parameters; POST bodies are JSON, or raw NDJSON when bytes.
+    """
+    if method == 'GET':
+        response = client.get(path, query_string=body)
+    elif isinstance(body, bytes):
+        response = client.post(path, data=body, content_type='application/x-ndjson')
+    else:
+        response = client.post(path, json=body)
+    response.get_data()
+    response.close()
+    return response
+
+
+def run_scenario(client, method, path, prepare, iterations, warmup):
+    """Time `iterations` calls; return latencies (seconds) and the status codes seen.
+
+    Raises RuntimeError on any non-2xx response, so an error path is never
+    reported as the endpoint's latency.
+    """
+    latencies = []
+    statuses = set()
+    for i in range(warmup + iterations):
+        body = prepare(i)
+        start = time.perf_counter()
+        response = send_request(client, method, path, body)
+        elapsed = time.perf_counter() - start
+        statuses.add(response.status_code)
+        if not 200 <= response.status_code < 300:
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: "
+                               f"{response.get_data(as_text=True)[:200]}")
+        if i >= warmup:
+            latencies.append(elapsed)
+    return latencies, statuses
+
+
+def measure_peak_memory(client, method, path, prepare, iterations):
+    """Peak bytes allocated during a single call (max over `iterations` calls)."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(iterations):
+            body = prepare(i)
+            tracemalloc.reset_peak()
+            baseline_bytes, _ = tracemalloc.get_traced_memory()
+            send_request(client, method, path, body)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            peak = max(peak, peak_bytes - baseline_bytes)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure_response_sizes(client):
+    """Bytes on the wire per encoding for the heaviest GET responses."""
+    index_html = client.get('/', headers={'Accept-Encoding': 'identity'}).get_data(as_text=True)
+    with grocery_app.app.test_request_context():
+        static_urls = [grocery_app.app.url_for('static', filename=name) for name in ('style.css', 'script.js')]
+    assert all(url in index_html for url in static_urls), 'index should link fingerprinted assets'
+
+    encodings = ['identity', 'gzip'] + (['br'] if grocery_app.brotli is not None else [])
+    sizes = {}
+    for path in ['/', '/get-current-list', '/get-history'] + static_urls:
+        sizes[path] = {}
+        for encoding in encodings:
+            response = client.get(path, headers={'Accept-Encoding': encoding})
+            sizes[path][encoding] = len(response.get_data())
+            response.close()
+    return sizes
+
+
+# ==================== REPORTING ====================
+
+def print_report(results):
+    """Print a fixed-width summary table."""
+    header = f"{'endpoint':<22}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'req/s':>10}{'peak KiB':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results['endpoints'].items():
+        print(f"{name:<22}{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['throughput_rps']:>10.1f}{r['peak_memory_kib']:>12.1f}")
+
+
+def check_targets(results):
+    """Compare p50 latencies with TARGETS_P50_MS; returns the endpoints that missed."""
+    missed = []
+    for name, target in TARGETS_P50_MS.items():
+        r = results['endpoints'].get(name)
+        if r is None:
+            continue
+        ok = r['p50_ms'] < target
+        results['targets'][name] = {'p50_ms': r['p50_ms'], 'target_ms': target, 'ok': ok}
+        if not ok:
+            missed.append(name)
+    return missed
+
+
+def print_target_report(results):
+    """Print each checked endpoint's p50 against its target."""
+    if not results['targets']:
+        return
+    print()
+    for name, check in results['targets'].items():
+        print(f"{name:<22}p50 {check['p50_ms']:.3f} ms (target < {check['target_ms']} ms): "
+              f"{'OK' if check['ok'] else 'MISSED'}")
+
+
+def print_size_report(sizes):
+    """Print response sizes per encoding (KiB) and the saving of the best encoding."""
+    print(f"\n{'response':<40}{'identity':>10}{'gzip':>10}{'br':>10}{'saved':>8}")
+    for path, by_encoding in sizes.items():
+        identity = by_encoding['identity']
+        best = min(by_encoding.get('br', identity), by_encoding['gzip'])
+        br = f"{by_encoding['br'] / 1024:>10.1f}" if 'br' in by_encoding else f"{'-':>10}"
+        saved = 1 - best / identity if identity else 0.0
+        print(f"{path:<40}{identity / 1024:>10.1f}{by_encoding['gzip'] / 1024:>10.1f}{br}{saved:>8.0%}")
+
+
+def print_comparison(results, previous_path):
+    """Print p50/p99 ratios against a previously saved run (<1.0 is faster)."""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nComparison against {previous_path} (new / old):")
+    for name, r in results['endpoints'].items():
+        old = previous.get('endpoints', {}).get(name)
+        if not old or not old['p50_ms'] or not old['p99_ms']:
+            continue
+        print(f"  {name:<22} p50 x{r['p50_ms'] / old['p50_ms']:.2f}  p99 x{r['p99_ms'] / old['p99_ms']:.2f}")
+
+
+def save_results(results, output_path=None):
+    """Write results as JSON and return the path."""
+    if output_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output_path = os.path.join(RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return output_path
+
+
+# ==================== MAIN ====================
+
+def run(args):
+    if not args.no_parser_stub:
+        grocery_app.parse_grocery_items_with_gemini = stub_parse_grocery_items
+
+    data = generate_grocery_data(
+        items_per_list=args.items_per_list,
+        trips=args.trips,
+        distinct_items=args.distinct_items,
+        years=args.years,
+        seed=args.seed
+    )
+    baseline = data.to_dict()
+    reset_data(baseline)
+    data_file_bytes = os.path.getsize(grocery_app.GROCERY_DATA_FILE)
+
+    client = grocery_app.app.test_client()
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'params': vars(args),
+            'dataFileBytes': data_file_bytes,
+        },
+        'endpoints': {},
+        'targets': {}
+    }
+
+    for name, method, path, prepare in build_scenarios(baseline):
+        if args.only and name not in args.only:
+            continue
+        reset_data(baseline)
+        latencies, statuses = run_scenario(client, method, path, prepare, args.iterations, args.warmup)
+        reset_data(baseline)
+        peak = measure_peak_memory(client, method, path, prepare, args.memory_iterations)
+
+        latencies.sort()
+        total = sum(latencies)
+        results['endpoints'][name] = {
+            'iterations': len(latencies),
+            'statusCodes': sorted(statuses),
+            'mean_ms': total / len(latencies) * 1000,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p90_ms': percentile(latencies, 90) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+            'throughput_rps': len(latencies) / total if total else 0.0,
+            'peak_memory_kib': peak / 1024,
+        }
+
+    reset_data(baseline)
+    results['responseSizes'] = measure_response_sizes(client)
+    check_targets(results)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items-per-list', type=int, default=30)
+    parser.add_argument('--trips', type=int, default=100)
+    parser.add_argument('--distinct-items', type=int, default=300)
+    parser.add_argument('--years', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--memory-iterations', type=int, default=5)
+    parser.add_argument('--no-parser-stub', action='store_true',
+                        help='Call the configured model backend (e.g. GEMINI_BACKEND=stub) instead of stubbing the parser')
+    parser.add_argument('--only', nargs='*', help='Only run these endpoints')
+    parser.add_argument('--output', help='Where to save the JSON results')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    parser.add_argument('--check-targets', action='store_true',
+                        help='Exit with status 1 if an endpoint misses its p50 target')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print_report(results)
+    print_target_report(results)
+    print_size_report(results['responseSizes'])
+    path = save_results(results, args.output)
+    print(f"\nResults saved to {path}")
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.check_targets and any(not check['ok'] for check in results['targets'].values()):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Circuit breaker with adaptive per-call deadlines
+
+Wraps a slow, failure-prone dependency (the Gemini call). Each call runs on a
+small thread pool (or, via call_async, as a coroutine on the caller's event
+loop) and is abandoned once its deadline passes, so callers never wait longer
+than the deadline. The deadline adapts to recent successful
+latencies (p95 x multiplier, clamped).
+
+States:
+- closed: calls go through; outcomes are tracked in a rolling window
+- open: the failure rate crossed the threshold; calls fail fast with CircuitOpenError
+- half_open: after the cool-down a few probe calls are let through; success closes
+  the circuit, failure re-opens it
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+
+class CallTimeoutError(TimeoutError):
+    """The call did not finish within its deadline."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker around a blocking call."""
+
+    def __init__(self, name, failure_rate_threshold=0.5, window_size=20, min_calls=5,
+                 open_seconds=30.0, half_open_max_calls=1, base_timeout=8.0, min_timeout=1.0,
+                 max_timeout=15.0, timeout_multiplier=2.0, max_workers=16, on_transition=None):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.base_timeout = base_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.on_transition = on_transition
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._outcomes = deque(maxlen=window_size)  # True = success
+        self._latencies = deque(maxlen=50)  # successful call durations (seconds)
+        self._transitions = deque(maxlen=20)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'{name}-call')
+
+    # ---------- state ----------
+
+    def _transition(self, new_state):
+        """Change state (caller holds the lock)."""
+        old_state = self._state
+        if old_state == new_state:
+            return
+        self._state = new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state in (OPEN, CLOSED):
+            self._half_open_in_flight = 0
+        if new_state == CLOSED:
+            self._outcomes.clear()
+        self._transitions.append({'from': old_state, 'to': new_state, 'at': datetime.now().isoformat()})
+        print(f"Circuit '{self.name}': {old_state} -> {new_state}")
+        if self.on_transition:
+            self.on_transition(old_state, new_state)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def allow_request(self):
+        """Whether a call may go through now (reserves a probe slot when half-open)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            return False
+
+    def record_success(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            else:
+                self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._outcomes.append(False)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate_threshold:
+                    self._transition(OPEN)
+
+    # ---------- deadlines ----------
+
+    def current_timeout(self):
+        """Deadline for the next call: p95 of recent successes x multiplier, clamped."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 10:
+            return self.base_timeout
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier))
+
+    # ---------- calls ----------
+
+    def call(self, func, *args, **kwargs):
+        """Run func under the breaker and a hard deadline."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        timeout = self.current_timeout()
+        start = time.perf_counter()
+        future = self._executor.submit(func, *args, **kwargs)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.record_failure()
+            raise CallTimeoutError(f"'{self.name}' call exceeded {timeout:.2f}s deadline")
+        except Exception:
+            self.record_failure()
+            raise
+
+        self.record_success(time.perf_counter() - start)
+        return result
+
+    async def call_async(self, coro_func, *args, **kwargs):
+        """Await coro_func(...) under the breaker and the same adaptive deadline (no thread used)."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        timeout = self.current_timeout()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro_func(*args, **kwargs), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.record_failure()
+            raise CallTimeoutError(f"'{self.name}' call exceeded {timeout:.2f}s deadline")
+        except (Exception, asyncio.CancelledError):
+            # Cancellation (client went away) must still release a half-open probe slot
+            self.record_failure()
+            raise
+
+        self.record_success(time.perf_counter() - start)
+        return result
+
+    def snapshot(self):
+        """State, window statistics and recent transitions (for status endpoints)."""
+        timeout = self.current_timeout()
+        with self._lock:
+            self._maybe_half_open()
+            outcomes = list(self._outcomes)
+            return {
+                'name': self.name,
+                'state': self._state,
+                'windowCalls': len(outcomes),
+                'windowFailures': outcomes.count(False),
+                'failureRateThreshold': self.failure_rate_threshold,
+                'openSeconds': self.open_seconds,
+                'secondsUntilHalfOpen': (
+                    max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+                    if self._state == OPEN else None
+                ),
+                'currentTimeoutSeconds': timeout,
+                'transitions': list(self._transitions),
+            }
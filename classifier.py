@@ -0,0 +1,135 @@
+"""
+Local item category classifier
+
+A multinomial naive Bayes model over character n-grams of item names
+(" oat milk " -> " oa", "oat", "at ", ..., " milk", "milk "). Names that were
+never seen still share evidence with known ones through their n-grams, e.g.
+"Oat Milk" with "Milk" and "Almond Milk", "Paper Plates" with "Paper Towels".
+Training is one counting pass over (name, category) examples. Scoring an item
+sums one row of per-category log-likelihoods for each n-gram the model knows.
+
+With NumPy installed the log-likelihoods are one matrix, and a whole list is
+scored with a single gather and segmented sum. Without it the same model is
+scored in pure Python, somewhat slower on long lists but still microseconds
+per item.
+
+A trained CategoryClassifier is never modified; retraining builds a new one
+and the caller swaps the reference.
+"""
+
+import itertools
+import math
+from collections import Counter
+
+try:
+    import numpy as np  # optional: vectorized scoring
+except ImportError:
+    np = None
+
+NGRAM_SIZES = (3, 4, 5)
+
+# Adjacent n-grams overlap heavily, so naive Bayes counts the same evidence
+# several times and its raw posteriors are overconfident. Scaling the summed
+# log-likelihoods down brings confidence closer to accuracy.
+EVIDENCE_WEIGHT = 1 / len(NGRAM_SIZES)
+
+
+def item_features(name):
+    """Character n-grams of the normalized name, padded so word starts and ends are features too."""
+    padded = f" {' '.join(name.casefold().split())} "
+    return [padded[start:start + size] for size in NGRAM_SIZES for start in range(len(padded) - size + 1)]
+
+
+class CategoryClassifier:
+    """Trained model: classify(name) / classify_many(names) -> (category, confidence in [0, 1])."""
+
+    def __init__(self, classes, vocabulary, log_prior, log_likelihood, examples):
+        self.classes = tuple(classes)
+        self.vocabulary = vocabulary  # n-gram -> row of log_likelihood
+        self.examples = examples
+        self._log_prior = log_prior  # per class
+        self._log_likelihood = log_likelihood  # rows: n-grams, columns: classes
+
+    @classmethod
+    def train(cls, examples, alpha=0.5):
+        """Fit on (name, category) pairs with Laplace smoothing `alpha`; None with fewer than two categories."""
+        class_index = {}
+        counts = []  # per class: Counter of n-grams
+        documents = []  # per class: number of examples
+        for name, category in examples:
+            features = item_features(name)
+            if not features:
+                continue
+            if category not in class_index:
+                class_index[category] = len(class_index)
+                counts.append(Counter())
+                documents.append(0)
+            column = class_index[category]
+            counts[column].update(features)
+            documents[column] += 1
+        if len(class_index) < 2:
+            return None
+
+        vocabulary = {feature: row for row, feature in enumerate(sorted(set().union(*counts)))}
+        total = sum(documents)
+        log_prior = [math.log(count / total) for count in documents]
+        log_denominators = [math.log(sum(counter.values()) + alpha * len(vocabulary)) for counter in counts]
+
+        if np is not None:
+            matrix = np.full((len(vocabulary), len(counts)), alpha)
+            for column, counter in enumerate(counts):
+                rows = np.fromiter((vocabulary[feature] for feature in counter), dtype=np.intp, count=len(counter))
+                matrix[rows, column] += np.fromiter(counter.values(), dtype=float, count=len(counter))
+            log_likelihood = (np.log(matrix) - np.array(log_denominators)) * EVIDENCE_WEIGHT
+            return cls(class_index, vocabulary, np.array(log_prior), log_likelihood, total)
+
+        log_likelihood = [
+            tuple((math.log(counter.get(feature, 0) + alpha) - denominator) * EVIDENCE_WEIGHT
+                  for counter, denominator in zip(counts, log_denominators))
+            for feature in vocabulary
+        ]
+        return cls(class_index, vocabulary, log_prior, log_likelihood, total)
+
+    def _rows(self, name):
+        vocabulary = self.vocabulary
+        return [vocabulary[feature] for feature in item_features(name) if feature in vocabulary]
+
+    def classify(self, name):
+        """Best category for one name and its posterior probability (0 if no n-gram is known)."""
+        rows = self._rows(name)
+        if not rows:
+            return self.classes[0], 0.0
+        log_likelihood = self._log_likelihood
+        if np is not None:
+            scores = (log_likelihood[rows].sum(axis=0) + self._log_prior).tolist()
+        else:
+            scores = [prior + sum(column) for prior, column in
+                      zip(self._log_prior, zip(*(log_likelihood[row] for row in rows)))]
+        return self._best(scores)
+
+    def _best(self, scores):
+        top = max(scores)
+        weights = [math.exp(score - top) for score in scores]
+        best = weights.index(1.0)
+        return self.classes[best], weights[best] / sum(weights)
+
+    def classify_many(self, names):
+        """classify() for a whole list; one vectorized pass when NumPy is available."""
+        if np is None or len(names) < 2:
+            return [self.classify(name) for name in names]
+
+        rows = [self._rows(name) for name in names]
+        lengths = np.fromiter((len(item_rows) for item_rows in rows), dtype=np.intp, count=len(rows))
+        scores = np.zeros((len(names), len(self.classes)))
+        known = np.flatnonzero(lengths)
+        if known.size:
+            flat = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.intp, count=int(lengths.sum()))
+            starts = (np.cumsum(lengths) - lengths)[known]
+            scores[known] = np.add.reduceat(self._log_likelihood[flat], starts, axis=0)
+        scores += self._log_prior
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.classes[column], float(probabilities[index, column]) if lengths[index] else 0.0)
+                for index, column in enumerate(best)]
@@ -0,0 +1,296 @@
+"""
+Local Gemini stand-in for offline load testing
+
+Two interchangeable backends with the same `generate_content(prompt)` and
+`generate_content_async(prompt)` surface as `genai.GenerativeModel`:
+
+- FakeGeminiModel: in-process stub (GEMINI_BACKEND=stub)
+- HttpGeminiModel: client for the small HTTP server in this module (GEMINI_BACKEND=http)
+
+Both return realistic JSON item arrays (randomly wrapped in ```json fences)
+and support injected latency, errors, timeouts and malformed output.
+
+Run the server with:
+    python fake_gemini.py --port 8765 --latency lognormal:400,0.5 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Where the user's text sits in the prompts built by parse_grocery_items_with_gemini
+PROMPT_JSON_TEXT = re.compile(r'^Text: (".*")\s*$', re.MULTILINE | re.DOTALL)  # current (JSON-quoted)
+PROMPT_TEXT_PATTERNS = [  # legacy free-form prompt
+    re.compile(r'Now extract from: "(.*)"\s*$', re.DOTALL),
+    re.compile(r'Text: "(.*?)"\n', re.DOTALL),
+]
+
+
+class FakeGeminiError(RuntimeError):
+    """Injected model failure."""
+
+
+class FakeUsage:
+    """Token counts estimated at ~4 characters per token."""
+
+    def __init__(self, prompt, text):
+        self.prompt_token_count = max(1, len(prompt) // 4)
+        self.candidates_token_count = max(1, len(text) // 4)
+
+
+class FakeResponse:
+    """Minimal stand-in for a GenerateContentResponse."""
+
+    def __init__(self, text, prompt=''):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt, text)
+
+
+def parse_latency_spec(spec):
+    """
+    Turn a latency spec into a sampler returning seconds.
+
+    - fixed:MS
+    - uniform:LOW_MS,HIGH_MS
+    - normal:MEAN_MS,STD_MS
+    - lognormal:MEDIAN_MS,SIGMA
+    """
+    kind, _, params = (spec or 'fixed:0').partition(':')
+    values = [float(v) for v in params.split(',') if v.strip()] or [0.0]
+    kind = kind.strip().lower()
+
+    if kind == 'fixed':
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform':
+        low, high = values[0], values[1]
+        return lambda rng: rng.uniform(low, high) / 1000
+    if kind == 'normal':
+        mean, std = values[0], values[1]
+        return lambda rng: max(0.0, rng.gauss(mean, std)) / 1000
+    if kind == 'lognormal':
+        median, sigma = values[0], values[1]
+        return lambda rng: median * math.exp(sigma * rng.gauss(0, 1)) / 1000
+    raise ValueError(f"Unknown latency distribution '{kind}'")
+
+
+def extract_prompt_text(prompt):
+    """Pull the user's raw text back out of the prompt."""
+    match = PROMPT_JSON_TEXT.search(prompt)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            pass
+    for pattern in PROMPT_TEXT_PATTERNS:
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1)
+    return prompt
+
+
+class FaultInjector:
+    """Shared latency/failure behaviour for the stub and the HTTP server."""
+
+    def __init__(self, latency='fixed:0', error_rate=0.0, timeout_rate=0.0, timeout_seconds=30.0,
+                 malformed_rate=0.0, fence_rate=0.5, seed=None):
+        self.sample_latency = parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.malformed_rate = malformed_rate
+        self.fence_rate = fence_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build from FAKE_GEMINI_* environment variables."""
+        seed = os.getenv('FAKE_GEMINI_SEED')
+        return cls(
+            latency=os.getenv('FAKE_GEMINI_LATENCY', 'fixed:0'),
+            error_rate=float(os.getenv('FAKE_GEMINI_ERROR_RATE', '0')),
+            timeout_rate=float(os.getenv('FAKE_GEMINI_TIMEOUT_RATE', '0')),
+            timeout_seconds=float(os.getenv('FAKE_GEMINI_TIMEOUT_SECONDS', '30')),
+            malformed_rate=float(os.getenv('FAKE_GEMINI_MALFORMED_RATE', '0')),
+            fence_rate=float(os.getenv('FAKE_GEMINI_FENCE_RATE', '0.5')),
+            seed=int(seed) if seed else None
+        )
+
+    def _roll(self):
+        with self._lock:
+            return self.sample_latency(self._rng), self._rng.random(), self._rng.random()
+
+    def _plan(self, items, structured):
+        """Decide one response: (seconds to wait, exception to raise or None, text)."""
+        latency, fault_roll, fence_roll = self._roll()
+
+        if fault_roll < self.timeout_rate:
+            error = TimeoutError(f"Injected timeout after {self.timeout_seconds}s (fake backend)")
+            return self.timeout_seconds, error, None
+
+        fault_roll -= self.timeout_rate
+        if 0 <= fault_roll < self.error_rate:
+            return latency, FakeGeminiError("Injected Gemini error (fake backend)"), None
+        fault_roll -= self.error_rate
+        if 0 <= fault_roll < self.malformed_rate:
+            return latency, None, "Sure! Here are the grocery items I found:"
+
+        text = json.dumps(items, indent=2)
+        if not structured and fence_roll < self.fence_rate:
+            text = f"```json\n{text}\n```"
+        return latency, None, text
+
+    def respond(self, items, structured=False):
+        """Sleep, maybe fail, and return the response text for `items`.
+
+        Structured (JSON mode) responses are never fenced.
+        """
+        delay, error, text = self._plan(items, structured)
+        time.sleep(delay)
+        if error:
+            raise error
+        return text
+
+    async def respond_async(self, items, structured=False):
+        """respond() for async callers: waits with asyncio.sleep instead of blocking."""
+        delay, error, text = self._plan(items, structured)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return text
+
+
+class FakeGeminiModel:
+    """In-process stand-in for genai.GenerativeModel."""
+
+    def __init__(self, extract, injector=None):
+        self.extract = extract
+        self.injector = injector or FaultInjector()
+
+    @classmethod
+    def from_env(cls, extract):
+        return cls(extract, FaultInjector.from_env())
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        items = self.extract(extract_prompt_text(prompt))
+        structured = bool(generation_config) and generation_config.get('response_mime_type') == 'application/json'
+        return FakeResponse(self.injector.respond(items, structured), prompt)
+
+    async def generate_content_async(self, prompt, generation_config=None, **kwargs):
+        items = self.extract(extract_prompt_text(prompt))
+        structured = bool(generation_config) and generation_config.get('response_mime_type') == 'application/json'
+        return FakeResponse(await self.injector.respond_async(items, structured), prompt)
+
+
+class HttpGeminiModel:
+    """Client for the local fake Gemini HTTP server."""
+
+    def __init__(self, url='http://127.0.0.1:8765', timeout=30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            url=os.getenv('FAKE_GEMINI_URL', 'http://127.0.0.1:8765'),
+            timeout=float(os.getenv('FAKE_GEMINI_CLIENT_TIMEOUT', '30'))
+        )
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        body = json.dumps({'prompt': prompt, 'generation_config': generation_config}).encode('utf-8')
+        req = urllib.request.Request(
+            f"{self.url}/generate", data=body, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return FakeResponse(json.loads(resp.read())['text'], prompt)
+        except urllib.error.HTTPError as e:
+            raise FakeGeminiError(f"Fake Gemini server returned {e.code}") from e
+
+    async def generate_content_async(self, prompt, generation_config=None, **kwargs):
+        # urllib has no async API; the wait happens on a worker thread instead
+        return await asyncio.to_thread(self.generate_content, prompt, generation_config, **kwargs)
+
+
+# ==================== HTTP SERVER ====================
+
+def make_handler(model):
+    """Request handler class bound to an in-process FakeGeminiModel."""
+
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/generate':
+                self.send_error(404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request_body = json.loads(self.rfile.read(length))
+                response = model.generate_content(request_body['prompt'], request_body.get('generation_config'))
+                payload = {'text': response.text}
+                status = 200
+            except (FakeGeminiError, TimeoutError) as e:
+                payload, status = {'error': str(e)}, 503
+            except (ValueError, KeyError) as e:
+                payload, status = {'error': f"Bad request: {e}"}, 400
+
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeGeminiHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default=os.getenv('FAKE_GEMINI_LATENCY', 'fixed:0'))
+    parser.add_argument('--error-rate', type=float, default=float(os.getenv('FAKE_GEMINI_ERROR_RATE', '0')))
+    parser.add_argument('--timeout-rate', type=float, default=float(os.getenv('FAKE_GEMINI_TIMEOUT_RATE', '0')))
+    parser.add_argument('--timeout-seconds', type=float, default=float(os.getenv('FAKE_GEMINI_TIMEOUT_SECONDS', '30')))
+    parser.add_argument('--malformed-rate', type=float, default=float(os.getenv('FAKE_GEMINI_MALFORMED_RATE', '0')))
+    parser.add_argument('--fence-rate', type=float, default=float(os.getenv('FAKE_GEMINI_FENCE_RATE', '0.5')))
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    # Reuse the app's offline parser so responses look like what Gemini returns
+    os.environ['GEMINI_BACKEND'] = 'stub'
+    from app import simple_fallback_parse_with_categories
+
+    injector = FaultInjector(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        malformed_rate=args.malformed_rate,
+        fence_rate=args.fence_rate,
+        seed=args.seed
+    )
+    model = FakeGeminiModel(simple_fallback_parse_with_categories, injector)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(model))
+    print(f"Fake Gemini listening on http://{args.host}:{args.port}/generate (latency {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
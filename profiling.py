@@ -0,0 +1,159 @@
+"""
+On-demand profiling of single requests
+
+A RequestProfiler captures, for one block of code on one thread:
+- a cProfile profile (served as a pstats dump or a text report)
+- collapsed stacks from a sampling thread (`frame;frame;frame count` lines,
+  the input format of flamegraph.pl / speedscope)
+- a tracemalloc diff (allocations that grew between start and stop)
+
+Only one request is profiled at a time: tracemalloc is process-wide, so an
+overlapping capture would mix allocations from both. ProfileStore keeps the
+last N captures in memory.
+"""
+
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+
+_capture_lock = threading.Lock()
+
+
+class StackSampler:
+    """Samples one thread's stack every `interval` seconds into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.counts[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.counts.most_common())
+
+
+class RequestProfiler:
+    """Profiles the calling thread between start() and stop(); start() returns False if another capture runs."""
+
+    def __init__(self, sample_interval=0.005, alloc_top=25):
+        self.sample_interval = sample_interval
+        self.alloc_top = alloc_top
+        self._profile = None
+        self._sampler = None
+        self._before = None
+        self._started_tracemalloc = False
+        self._started = None
+
+    def start(self):
+        if not _capture_lock.acquire(blocking=False):
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._before = tracemalloc.take_snapshot()
+        self._sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return True
+
+    def stop(self):
+        """Finish the capture; returns (duration seconds, pstats dict, collapsed stacks, allocation lines)."""
+        try:
+            self._profile.disable()
+            duration = time.perf_counter() - self._started
+            self._sampler.stop()
+            after = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self._profile.create_stats()
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            growth = after.filter_traces(filters).compare_to(self._before.filter_traces(filters), 'lineno')
+            allocations = [str(stat) for stat in growth[:self.alloc_top] if stat.size_diff > 0]
+            return duration, self._profile.stats, self._sampler.collapsed(), allocations
+        finally:
+            self._before = None
+            _capture_lock.release()
+
+
+def pstats_report(stats, sort='cumulative', limit=40):
+    """Human-readable pstats table for a captured stats dict."""
+    stream = io.StringIO()
+    report = pstats.Stats(_StatsSource(stats), stream=stream)
+    report.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def pstats_dump(stats):
+    """Bytes in the format Profile.dump_stats writes (loadable with pstats/snakeviz)."""
+    return marshal.dumps(stats)
+
+
+class _StatsSource:
+    """Adapter so pstats.Stats accepts a bare stats dict."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfileStore:
+    """Ring buffer of the last `capacity` captures, by id."""
+
+    def __init__(self, capacity=20):
+        self.capacity = capacity
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        """Store a capture dict; returns its id."""
+        with self._lock:
+            profile_id = str(next(self._ids))
+            profile['id'] = profile_id
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self):
+        """Newest first, without the bulky payloads."""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        bulky = ('stats', 'collapsed', 'allocations')
+        return [{key: value for key, value in profile.items() if key not in bulky} for profile in reversed(profiles)]
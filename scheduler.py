@@ -0,0 +1,179 @@
+"""
+Background maintenance scheduler
+
+Runs periodic jobs on one daemon thread, off the request path. Each job has:
+- an interval and a jitter fraction (runs are spread so workers and jobs
+  don't all fire at once)
+- single-instance locking across worker processes: a non-blocking flock on
+  <lock_dir>/<job>.lock, plus the last run time stored in that file, so only
+  one worker runs a job per interval however many workers there are. Only
+  successful runs are recorded, and a failed job is retried after
+  ERROR_RETRY_SECONDS (at most its interval) instead of a full interval.
+  Jobs that refresh per-process state (shared=False) skip this and run in
+  every worker
+- a result callback (outcome + duration) for metrics
+
+On platforms without fcntl the lock is per process only.
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: fall back to in-process locking
+    fcntl = None
+
+OK = 'ok'
+ERROR = 'error'
+SKIPPED = 'skipped'  # another worker holds the lock or ran the job recently
+
+ERROR_RETRY_SECONDS = 60.0
+
+
+class Job:
+    """A named periodic task."""
+
+    def __init__(self, name, func, interval, jitter=0.1, run_at_start=False, shared=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.shared = shared  # False: runs in every process, not once per interval overall
+        self.next_run = 0.0
+        self.last_success = None  # wall-clock timestamp
+        self.last_error = None
+        self.runs = 0
+
+    def schedule_next(self, now, delay=None):
+        delay = self.interval if delay is None else delay
+        spread = delay * self.jitter
+        self.next_run = now + delay + random.uniform(-spread, spread)
+
+
+class Scheduler:
+    """Runs registered jobs when due, one at a time, on a background thread."""
+
+    def __init__(self, lock_dir, on_result=None, tick=1.0):
+        self.lock_dir = lock_dir
+        self.on_result = on_result
+        self.tick = tick
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._local_locks = {}
+
+    def add(self, name, func, interval, jitter=0.1, run_at_start=False, shared=True):
+        """Register a job; returns it."""
+        job = Job(name, func, interval, jitter, run_at_start, shared)
+        self.jobs[name] = job
+        return job
+
+    def start(self):
+        if self._thread is not None or not self.jobs:
+            return
+        now = time.monotonic()
+        for job in self.jobs.values():
+            if job.run_at_start:
+                job.next_run = now + random.uniform(0, job.interval * job.jitter)
+            else:
+                job.schedule_next(now)
+        self._thread = threading.Thread(target=self._run, name='maintenance-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            for job in list(self.jobs.values()):
+                if time.monotonic() >= job.next_run:
+                    self.run_job(job.name)
+
+    def run_job(self, name, force=False):
+        """Run a job now if this worker can claim it; returns ok/error/skipped."""
+        job = self.jobs[name]
+        job.schedule_next(time.monotonic())
+        start = time.perf_counter()
+        with self._claim(job, force) as claim:
+            if not claim['claimed']:
+                outcome = SKIPPED
+            else:
+                try:
+                    job.func()
+                    claim['succeeded'] = True
+                    outcome = OK
+                    job.last_success = time.time()
+                    job.last_error = None
+                except Exception as e:
+                    outcome = ERROR
+                    job.last_error = f"{type(e).__name__}: {e}"
+                    job.schedule_next(time.monotonic(), min(job.interval, ERROR_RETRY_SECONDS))
+                    print(f"Maintenance job '{name}' failed: {job.last_error}")
+        job.runs += 1
+        if self.on_result:
+            self.on_result(job, outcome, time.perf_counter() - start)
+        return outcome
+
+    @contextmanager
+    def _claim(self, job, force):
+        """Hold the job's cross-process lock for the run.
+
+        Yields {'claimed': bool, 'succeeded': False}; the caller sets
+        'succeeded' when the job ran cleanly, and only then is the run time
+        stored for the other workers.
+        """
+        claim = {'claimed': False, 'succeeded': False}
+        local = self._local_locks.setdefault(job.name, threading.Lock())
+        if not local.acquire(blocking=False):
+            yield claim
+            return
+        try:
+            if fcntl is None or not job.shared:
+                claim['claimed'] = True
+                yield claim
+                return
+            os.makedirs(self.lock_dir, exist_ok=True)
+            path = os.path.join(self.lock_dir, f"{job.name}.lock")
+            with open(path, 'a+') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    yield claim
+                    return
+                try:
+                    lock_file.seek(0)
+                    last_run = float(lock_file.read().strip() or 0)
+                    # Another worker ran it within this interval (minus jitter): nothing to do
+                    if not force and time.time() - last_run < job.interval * (1 - job.jitter):
+                        yield claim
+                        return
+                    claim['claimed'] = True
+                    yield claim
+                    if claim['succeeded']:  # a failed run leaves the job due for every worker
+                        lock_file.seek(0)
+                        lock_file.truncate()
+                        lock_file.write(str(time.time()))
+                        lock_file.flush()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            local.release()
+
+    def snapshot(self):
+        """Per-job status (for status endpoints)."""
+        now = time.monotonic()
+        return {
+            name: {
+                'intervalSeconds': job.interval,
+                'secondsUntilNextRun': max(0.0, job.next_run - now),
+                'lastSuccess': job.last_success,
+                'lastError': job.last_error,
+                'runs': job.runs,
+            }
+            for name, job in self.jobs.items()
+        }
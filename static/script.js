@@ -1,6 +1,7 @@
 // DOM Elements
 const itemInput = document.getElementById('item-input');
 const addForm = document.getElementById('add-form');
+const suggestionList = document.getElementById('item-suggestions');
 const groceryListContainer = document.getElementById('grocery-list-container');
 const emptyState = document.getElementById('empty-state');
 const loading = document.getElementById('loading');
@@ -13,6 +14,9 @@ const historyContent = document.getElementById('history-content');
 const copyLastTripBtn = document.getElementById('copy-last-trip-btn');
 const toast = document.getElementById('toast');
 
+// Household-scoped API prefix ('' for the default household, '/h/<id>' otherwise)
+const API_BASE = document.body.dataset.apiBase || '';
+
 // State
 let currentList = {
     categories: {},
@@ -20,30 +24,48 @@ let currentList = {
     checkedItems: 0
 };
 
-// Category emoji mapping
-const CATEGORY_EMOJIS = {
-    "Produce": "🍎",
-    "Dairy": "🥛",
-    "Meat & Seafood": "🥩",
-    "Bakery": "🍞",
-    "Pantry": "🥫",
-    "Frozen": "🧊",
-    "Household": "🧴",
-    "Snacks": "🍫",
-    "Beverages": "🥤",
-    "Other": "📦"
-};
+// Category display config (names, emojis, order): embedded in the page, refreshed from /categories
+let categoryConfig = { version: null, categories: [] };
+let categoryEmojis = {};
+let categoryRanks = {};
+
+// Offline support
+const SNAPSHOT_KEY = `grocery-snapshot:${API_BASE || 'default'}`;
+const QUEUE_DB_NAME = 'grocery-offline';
+const QUEUE_STORE = 'ops';
+const SYNC_CHUNK_SIZE = 200;
+let queueDbPromise = null;
+let syncInFlight = false;
+
+// Typeahead
+const SUGGEST_DEBOUNCE_MS = 80;
+let suggestTimer = null;
+let suggestController = null;
+let suggestions = [];
+let activeSuggestion = -1;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
-    loadItems();
+    applyCategoryConfig(readEmbeddedJson('category-config'));
+    if (!hydrateFromBootstrap()) {
+        renderFromSnapshot();
+        loadItems();
+    }
     loadHistory();
     setupEventListeners();
+    loadCategories();
+    registerServiceWorker();
+    syncQueue();
 });
 
+window.addEventListener('online', syncQueue);
+
 // Event Listeners
 function setupEventListeners() {
     addForm.addEventListener('submit', handleAddItem);
+    itemInput.addEventListener('input', handleSuggestInput);
+    itemInput.addEventListener('keydown', handleSuggestKeydown);
+    itemInput.addEventListener('blur', hideSuggestions);
     clearAllBtn.addEventListener('click', handleClearAll);
     completeTripBtn.addEventListener('click', handleCompleteTrip);
     copyLastTripBtn.addEventListener('click', handleCopyFromLastTrip);
@@ -52,16 +74,144 @@ function setupEventListeners() {
 // Load items from server (v2)
 async function loadItems() {
     try {
-        const response = await fetch('/get-current-list');
+        const response = await fetch(`${API_BASE}/get-current-list`);
         currentList = await response.json();
+
+        // Re-apply changes the server hasn't seen yet so they don't flicker back
+        const queued = await readQueuedOps();
+        queued.forEach(record => applyOpToState(record.op));
+
+        saveSnapshot();
         renderItems();
     } catch (error) {
         console.error('Error loading items:', error);
-        showToast('Failed to load items', 'error');
+        if (!navigator.onLine) {
+            showToast('Offline - showing your last list', 'warning');
+        } else {
+            showToast('Failed to load items', 'error');
+        }
+    }
+}
+
+// Parse a <script type="application/json"> blob embedded by the server
+function readEmbeddedJson(elementId) {
+    const element = document.getElementById(elementId);
+    if (!element) return null;
+    try {
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        console.error(`Error reading embedded ${elementId}:`, error);
+        return null;
+    }
+}
+
+function applyCategoryConfig(config) {
+    if (!config || !Array.isArray(config.categories)) return;
+    categoryConfig = config;
+    categoryEmojis = {};
+    categoryRanks = {};
+    config.categories.forEach(category => {
+        categoryEmojis[category.name] = category.emoji;
+        categoryRanks[category.name] = category.order;
+    });
+}
+
+// Pick up taxonomy edits made since the page was rendered (cheap: ETag revalidation)
+async function loadCategories() {
+    try {
+        const response = await fetch('/categories');
+        if (!response.ok) return;
+        const config = await response.json();
+        if (config.version === categoryConfig.version) return;
+
+        applyCategoryConfig(config);
+        for (const [categoryName, section] of categoryElements) {
+            section.querySelector('.category-emoji').textContent = categoryEmojis[categoryName] || '📦';
+        }
+        renderItems();
+    } catch (error) {
+        console.error('Error loading categories:', error);
+    }
+}
+
+// Adopt the server-rendered list: read the embedded snapshot and register its nodes
+function hydrateFromBootstrap() {
+    const bootstrap = document.getElementById('initial-list');
+    if (!bootstrap) return false;
+
+    try {
+        currentList = JSON.parse(bootstrap.textContent);
+    } catch (error) {
+        console.error('Error reading embedded list:', error);
+        return false;
+    }
+
+    groceryListContainer.querySelectorAll('.category-section').forEach(section => {
+        categoryElements.set(section.dataset.category, section);
+    });
+    groceryListContainer.querySelectorAll('.grocery-item').forEach(li => {
+        const itemId = li.dataset.itemId;
+        const found = findItemInState(itemId);
+        if (!found) return;
+        li.dataset.renderKey = itemRenderKey(found.item);
+        itemElements.set(itemId, li);
+        bindItemElement(li, itemId);
+    });
+
+    // Layer on changes the server hasn't seen yet (renderItems patches only what they touch)
+    readQueuedOps()
+        .then(queued => {
+            queued.forEach(record => applyOpToState(record.op));
+            if (queued.length > 0) {
+                renderItems();
+            }
+            saveSnapshot();
+        })
+        .catch(error => console.error('Error reading queued changes:', error));
+
+    return true;
+}
+
+// Paint the last known list immediately, before any network round trip
+function renderFromSnapshot() {
+    try {
+        const snapshot = localStorage.getItem(SNAPSHOT_KEY);
+        if (snapshot) {
+            currentList = JSON.parse(snapshot);
+            renderItems();
+        }
+    } catch (error) {
+        console.error('Error reading snapshot:', error);
+    }
+}
+
+function saveSnapshot() {
+    try {
+        localStorage.setItem(SNAPSHOT_KEY, JSON.stringify(currentList));
+    } catch (error) {
+        console.error('Error saving snapshot:', error);
     }
 }
 
-// Render items to DOM (v2 - categorized)
+// Register the service worker (caches the app shell and list snapshots)
+function registerServiceWorker() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(error => {
+            console.error('Service worker registration failed:', error);
+        });
+    }
+}
+
+// Rendered nodes keyed by item id / category name (lets renderItems patch instead of rebuild)
+const itemElements = new Map();
+const categoryElements = new Map();
+
+// Display order of categories (same order the server uses)
+function categoryOrder(categoryName) {
+    return categoryName in categoryRanks ? categoryRanks[categoryName] : Number.MAX_SAFE_INTEGER;
+}
+
+// Render items to DOM (v2 - categorized, keyed diff against existing nodes)
 function renderItems() {
     // Update count
     itemCount.textContent = currentList.totalItems;
@@ -71,49 +221,107 @@ function renderItems() {
         groceryListContainer.classList.add('hidden');
         completeTripSection.style.display = 'none';
         emptyState.classList.add('show');
-        return;
+    } else {
+        emptyState.classList.remove('show');
+        groceryListContainer.classList.remove('hidden');
+
+        // Show complete trip button if there are items
+        completeTripSection.style.display = 'block';
     }
 
-    emptyState.classList.remove('show');
-    groceryListContainer.classList.remove('hidden');
-    
-    // Show complete trip button if there are items
-    completeTripSection.style.display = 'block';
+    const categoryNames = Object.keys(currentList.categories)
+        .filter(name => currentList.categories[name].length > 0)
+        .sort((a, b) => categoryOrder(a) - categoryOrder(b));
+    const liveItemIds = new Set();
+
+    categoryNames.forEach((categoryName, position) => {
+        const items = currentList.categories[categoryName];
+        let section = categoryElements.get(categoryName);
+        if (!section) {
+            section = createCategorySection(categoryName);
+            categoryElements.set(categoryName, section);
+        }
+
+        // Only move the section if it's out of place
+        const expectedSection = groceryListContainer.children[position];
+        if (expectedSection !== section) {
+            groceryListContainer.insertBefore(section, expectedSection || null);
+        }
+        section.querySelector('.category-count').textContent = items.length;
+
+        const itemsList = section.querySelector('.category-items');
+        items.forEach((item, index) => {
+            liveItemIds.add(item.id);
+            const li = patchItemElement(item);
+            const expectedItem = itemsList.children[index];
+            if (expectedItem !== li) {
+                itemsList.insertBefore(li, expectedItem || null);
+            }
+        });
+    });
+
+    // Drop nodes for items and categories that are gone
+    for (const [itemId, li] of itemElements) {
+        if (!liveItemIds.has(itemId)) {
+            li.remove();
+            itemElements.delete(itemId);
+        }
+    }
+    for (const [categoryName, section] of categoryElements) {
+        if (!categoryNames.includes(categoryName)) {
+            section.remove();
+            categoryElements.delete(categoryName);
+        }
+    }
+}
 
-    // Clear container
-    groceryListContainer.innerHTML = '';
+// Fingerprint of everything an item row displays
+function itemRenderKey(item) {
+    return JSON.stringify([item.name, item.checked, item.lastBought, item.daysSinceLastBought, item.frequency]);
+}
 
-    // Render each category
-    for (const [categoryName, items] of Object.entries(currentList.categories)) {
-        if (items.length === 0) continue;
+// Return the row for `item`, creating or updating it only if its content changed
+function patchItemElement(item) {
+    const key = itemRenderKey(item);
+    const existing = itemElements.get(item.id);
 
-        const categorySection = createCategorySection(categoryName, items);
-        groceryListContainer.appendChild(categorySection);
+    if (existing && existing.dataset.renderKey === key) {
+        return existing;
     }
+
+    if (existing && existing.dataset.renderKey === itemRenderKey({ ...item, checked: !item.checked })) {
+        // Only the checked state differs: patch in place
+        updateItemElement(existing, item);
+        existing.dataset.renderKey = key;
+        return existing;
+    }
+
+    const li = createItemElement(item);
+    li.dataset.renderKey = key;
+    if (existing) {
+        existing.replaceWith(li);
+    }
+    itemElements.set(item.id, li);
+    return li;
 }
 
-// Create category section
-function createCategorySection(categoryName, items) {
+// Create category section (items are filled in by renderItems)
+function createCategorySection(categoryName) {
     const section = document.createElement('div');
     section.className = 'category-section';
+    section.dataset.category = categoryName;
     
-    const emoji = CATEGORY_EMOJIS[categoryName] || '📦';
+    const emoji = categoryEmojis[categoryName] || '📦';
     
     section.innerHTML = `
         <div class="category-header">
             <span class="category-emoji">${emoji}</span>
-            <span class="category-name">${categoryName}</span>
-            <span class="category-count">${items.length}</span>
+            <span class="category-name">${escapeHtml(categoryName)}</span>
+            <span class="category-count">0</span>
         </div>
         <ul class="category-items"></ul>
     `;
     
-    const itemsList = section.querySelector('.category-items');
-    items.forEach(item => {
-        const li = createItemElement(item);
-        itemsList.appendChild(li);
-    });
-    
     return section;
 }
 
@@ -156,13 +364,18 @@ function createItemElement(item) {
         </button>
     `;
 
+    bindItemElement(li, item.id);
+    return li;
+}
+
+// Wire up toggle/delete handlers on an item row (fresh or server-rendered)
+function bindItemElement(li, itemId) {
     // Click checkbox area to toggle
-    const checkbox = li.querySelector('.item-checkbox');
     const itemContent = li.querySelector('.item-content');
     
     itemContent.addEventListener('click', (e) => {
         if (!e.target.closest('.delete-btn')) {
-            handleToggleItem(item.id, li);
+            handleToggleItem(itemId, li);
         }
     });
 
@@ -170,10 +383,8 @@ function createItemElement(item) {
     const deleteBtn = li.querySelector('.delete-btn');
     deleteBtn.addEventListener('click', (e) => {
         e.stopPropagation();
-        handleDeleteItem(item.id, li);
+        handleDeleteItem(itemId, li);
     });
-
-    return li;
 }
 
 // Handle add item
@@ -181,14 +392,20 @@ async function handleAddItem(e) {
     e.preventDefault();
 
     const text = itemInput.value.trim();
+    hideSuggestions();
     if (!text) return;
 
+    if (!navigator.onLine) {
+        await queueOfflineAdd(text);
+        return;
+    }
+
     // Show loading
     loading.classList.add('show');
     itemInput.disabled = true;
 
     try {
-        const response = await fetch('/add-item', {
+        const response = await fetch(`${API_BASE}/add-item`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -202,14 +419,14 @@ async function handleAddItem(e) {
             // Show feedback
             if (data.added.length > 0) {
                 const addedText = data.added.length === 1 
-                    ? `Added: ${data.added[0]}` 
+                    ? `Added: ${data.added[0].name}` 
                     : `Added ${data.added.length} items`;
                 showToast(addedText, 'success');
             }
 
             if (data.skipped.length > 0) {
                 const skippedText = data.skipped.length === 1
-                    ? `${data.skipped[0]} already in list`
+                    ? `${data.skipped[0].name} already in list`
                     : `${data.skipped.length} items already in list`;
                 setTimeout(() => showToast(skippedText, 'warning'), 2000);
             }
@@ -218,15 +435,22 @@ async function handleAddItem(e) {
                 showToast('No items found in text', 'warning');
             }
 
-            // Clear input and reload
+            // Clear input and insert the new items (the response carries full item views)
             itemInput.value = '';
-            await loadItems();
+            data.added.forEach(addedItem => insertItemIntoState(addedItem));
+            saveSnapshot();
+            renderItems();
         } else {
             showToast(data.error || 'Failed to add items', 'error');
         }
     } catch (error) {
         console.error('Error adding item:', error);
-        showToast('Failed to add items', 'error');
+        if (error instanceof TypeError) {
+            // Network failure: keep the items locally and sync later
+            await queueOfflineAdd(text);
+        } else {
+            showToast('Failed to add items', 'error');
+        }
     } finally {
         loading.classList.remove('show');
         itemInput.disabled = false;
@@ -234,78 +458,152 @@ async function handleAddItem(e) {
     }
 }
 
-// Handle toggle item (v2)
-async function handleToggleItem(itemId, element) {
+// Typeahead: suggest known items for the part after the last comma
+function currentFragment() {
+    const parts = itemInput.value.split(',');
+    return parts[parts.length - 1].trim();
+}
+
+function handleSuggestInput() {
+    clearTimeout(suggestTimer);
+    const fragment = currentFragment();
+    if (!fragment || !navigator.onLine) {
+        hideSuggestions();
+        return;
+    }
+    suggestTimer = setTimeout(() => fetchSuggestions(fragment), SUGGEST_DEBOUNCE_MS);
+}
+
+async function fetchSuggestions(fragment) {
+    if (suggestController) suggestController.abort();
+    suggestController = new AbortController();
     try {
-        const response = await fetch('/toggle-item', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ itemId }),
+        const response = await fetch(`${API_BASE}/autocomplete?q=${encodeURIComponent(fragment)}`, {
+            signal: suggestController.signal,
         });
-
         const data = await response.json();
-
-        if (data.success) {
-            // Update UI immediately
-            const checkbox = element.querySelector('.item-checkbox');
-            const itemName = element.querySelector('.item-name');
-            
-            if (data.checked) {
-                element.classList.add('checked');
-                checkbox.classList.add('checked');
-                itemName.classList.add('checked');
-                checkbox.innerHTML = '<svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="3"><polyline points="20 6 9 17 4 12"></polyline></svg>';
-            } else {
-                element.classList.remove('checked');
-                checkbox.classList.remove('checked');
-                itemName.classList.remove('checked');
-                checkbox.innerHTML = '';
-            }
-            
-            // Reload to update counts
-            await loadItems();
-        } else {
-            showToast('Failed to toggle item', 'error');
-        }
+        if (fragment !== currentFragment()) return;  // the user kept typing
+        renderSuggestions(data.suggestions || []);
     } catch (error) {
-        console.error('Error toggling item:', error);
-        showToast('Failed to toggle item', 'error');
+        if (error.name !== 'AbortError') hideSuggestions();
+    }
+}
+
+function renderSuggestions(items) {
+    suggestions = items;
+    activeSuggestion = -1;
+    suggestionList.replaceChildren(...items.map((suggestion, index) => {
+        const li = document.createElement('li');
+        li.className = 'suggestion';
+        li.id = `suggestion-${index}`;
+        li.setAttribute('role', 'option');
+        li.textContent = `${categoryEmojis[suggestion.category] || '📦'} ${suggestion.name}`;
+        // mousedown fires before the input's blur hides the list
+        li.addEventListener('mousedown', e => {
+            e.preventDefault();
+            pickSuggestion(index);
+        });
+        return li;
+    }));
+    suggestionList.hidden = items.length === 0;
+    itemInput.setAttribute('aria-expanded', String(items.length > 0));
+    itemInput.removeAttribute('aria-activedescendant');
+}
+
+function hideSuggestions() {
+    clearTimeout(suggestTimer);
+    if (suggestController) suggestController.abort();
+    renderSuggestions([]);
+}
+
+function highlightSuggestion(index) {
+    activeSuggestion = index;
+    suggestionList.querySelectorAll('.suggestion').forEach((li, i) => li.classList.toggle('active', i === index));
+    if (index >= 0) {
+        itemInput.setAttribute('aria-activedescendant', `suggestion-${index}`);
+    } else {
+        itemInput.removeAttribute('aria-activedescendant');
+    }
+}
+
+function handleSuggestKeydown(e) {
+    if (suggestions.length === 0) return;
+    if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+        e.preventDefault();
+        // Cycle through the suggestions and back to "none" (the typed text)
+        const step = e.key === 'ArrowDown' ? 1 : -1;
+        const positions = suggestions.length + 1;
+        highlightSuggestion((activeSuggestion + 1 + step + positions) % positions - 1);
+    } else if (e.key === 'Enter' && activeSuggestion >= 0) {
+        e.preventDefault();  // pick, don't submit
+        pickSuggestion(activeSuggestion);
+    } else if (e.key === 'Escape') {
+        hideSuggestions();
     }
 }
 
-// Handle delete item (v2)
+// Replace the fragment being typed with the picked name. Known names are added
+// from the household's catalog by /add-item, without a model call.
+function pickSuggestion(index) {
+    const parts = itemInput.value.split(',');
+    parts[parts.length - 1] = (parts.length > 1 ? ' ' : '') + suggestions[index].name;
+    itemInput.value = `${parts.join(',')}, `;
+    hideSuggestions();
+    itemInput.focus();
+}
+
+// Handle toggle item (v2 - optimistic, synced through /batch)
+async function handleToggleItem(itemId, element) {
+    const found = findItemInState(itemId);
+    if (!found) return;
+
+    const op = { opId: newOpId(), type: 'toggle', itemId, checked: !found.item.checked };
+    applyOpToState(op);
+    patchItemElement(found.item);
+    saveSnapshot();
+
+    await enqueueOp(op);
+    syncQueue();
+}
+
+// Update a rendered item's checked state in place
+function updateItemElement(element, item) {
+    const checkbox = element.querySelector('.item-checkbox');
+    const itemName = element.querySelector('.item-name');
+
+    if (item.checked) {
+        element.classList.add('checked');
+        checkbox.classList.add('checked');
+        itemName.classList.add('checked');
+        checkbox.innerHTML = '<svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="3"><polyline points="20 6 9 17 4 12"></polyline></svg>';
+    } else {
+        element.classList.remove('checked');
+        checkbox.classList.remove('checked');
+        itemName.classList.remove('checked');
+        checkbox.innerHTML = '';
+    }
+}
+
+// Handle delete item (v2 - optimistic, synced through /batch)
 async function handleDeleteItem(itemId, element) {
+    const found = findItemInState(itemId);
+    if (!found) return;
+
     // Animate out
     element.classList.add('deleting');
 
-    try {
-        const response = await fetch('/delete-item', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ itemId }),
-        });
+    const op = { opId: newOpId(), type: 'delete', itemId };
+    await enqueueOp(op);
 
-        const data = await response.json();
+    // Wait for animation
+    setTimeout(() => {
+        applyOpToState(op);
+        saveSnapshot();
+        renderItems();
+        showToast(`Deleted: ${found.item.name}`, 'success');
+    }, 300);
 
-        if (data.success) {
-            // Wait for animation
-            setTimeout(async () => {
-                await loadItems();
-                showToast(`Deleted: ${data.deleted}`, 'success');
-            }, 300);
-        } else {
-            element.classList.remove('deleting');
-            showToast('Failed to delete item', 'error');
-        }
-    } catch (error) {
-        console.error('Error deleting item:', error);
-        element.classList.remove('deleting');
-        showToast('Failed to delete item', 'error');
-    }
+    syncQueue();
 }
 
 // Handle clear all (v2)
@@ -317,7 +615,7 @@ async function handleClearAll() {
     }
 
     try {
-        const response = await fetch('/clear-all', {
+        const response = await fetch(`${API_BASE}/clear-all`, {
             method: 'POST',
         });
 
@@ -366,7 +664,7 @@ async function handleCompleteTrip() {
     }
 
     try {
-        const response = await fetch('/complete-trip', {
+        const response = await fetch(`${API_BASE}/complete-trip`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -391,7 +689,7 @@ async function handleCompleteTrip() {
 // Load shopping history
 async function loadHistory() {
     try {
-        const response = await fetch('/get-history');
+        const response = await fetch(`${API_BASE}/get-history`);
         const data = await response.json();
         renderHistory(data);
     } catch (error) {
@@ -464,7 +762,7 @@ function createTripElement(trip) {
 // Handle copy from last trip
 async function handleCopyFromLastTrip() {
     try {
-        const response = await fetch('/copy-from-last-trip', {
+        const response = await fetch(`${API_BASE}/copy-from-last-trip`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -489,3 +787,217 @@ async function handleCopyFromLastTrip() {
 }
 
 // No auto-refresh needed (not using iOS Shortcuts)
+
+// ==================== OFFLINE QUEUE ====================
+
+function newOpId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+// Find an item in the current list state
+function findItemInState(itemId) {
+    for (const [category, items] of Object.entries(currentList.categories)) {
+        const index = items.findIndex(item => item.id === itemId);
+        if (index !== -1) {
+            return { category, index, item: items[index] };
+        }
+    }
+    return null;
+}
+
+// Add an item view (with its category) to local state
+function insertItemIntoState(itemView) {
+    const { category, ...item } = itemView;
+    if (!currentList.categories[category]) {
+        currentList.categories[category] = [];
+    }
+    currentList.categories[category].push(item);
+    recountState();
+}
+
+function recountState() {
+    const allItems = Object.values(currentList.categories).flat();
+    currentList.totalItems = allItems.length;
+    currentList.checkedItems = allItems.filter(item => item.checked).length;
+}
+
+// Apply a queued op to local state (mirrors the server's /batch semantics)
+function applyOpToState(op) {
+    if (op.type === 'add') {
+        const exists = Object.values(currentList.categories)
+            .some(items => items.some(item => item.name.toLowerCase() === op.name.toLowerCase()));
+        if (exists) return;
+
+        insertItemIntoState({
+            category: op.category || 'Other',
+            id: op.itemId,
+            name: op.name,
+            checked: false,
+            addedAt: new Date().toISOString(),
+            checkedAt: null,
+            lastBought: null,
+            daysSinceLastBought: null,
+            frequency: null,
+            pending: true
+        });
+    } else {
+        const found = findItemInState(op.itemId);
+        if (!found) return;
+
+        if (op.type === 'toggle') {
+            found.item.checked = op.checked;
+            found.item.checkedAt = op.checked ? new Date().toISOString() : null;
+        } else if (op.type === 'delete') {
+            currentList.categories[found.category].splice(found.index, 1);
+            if (currentList.categories[found.category].length === 0) {
+                delete currentList.categories[found.category];
+            }
+        }
+    }
+
+    recountState();
+}
+
+// Split free text into item names when /add-item (and Gemini) is unreachable
+function splitOfflineText(text) {
+    return text
+        .split(/,|\band\b|\bor\b/i)
+        .map(part => part.trim().replace(/\s+/g, ' '))
+        .filter(part => part.length > 0)
+        .map(part => part.replace(/\b\w/g, c => c.toUpperCase()));
+}
+
+async function queueOfflineAdd(text) {
+    const names = splitOfflineText(text);
+    for (const name of names) {
+        const op = { opId: newOpId(), type: 'add', name, itemId: newOpId() };
+        applyOpToState(op);
+        await enqueueOp(op);
+    }
+
+    saveSnapshot();
+    renderItems();
+    itemInput.value = '';
+    showToast(`Offline - ${names.length} item(s) will sync when you're back online`, 'warning');
+}
+
+function openQueueDb() {
+    if (!queueDbPromise) {
+        queueDbPromise = new Promise((resolve, reject) => {
+            const request = indexedDB.open(QUEUE_DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore(QUEUE_STORE, { keyPath: 'seq', autoIncrement: true });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+    return queueDbPromise;
+}
+
+// Run `work(store)` in a transaction; resolves with the last request's result
+async function queueTransaction(mode, work) {
+    const db = await openQueueDb();
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(QUEUE_STORE, mode);
+        const request = work(tx.objectStore(QUEUE_STORE));
+        tx.oncomplete = () => resolve(request ? request.result : undefined);
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+async function enqueueOp(op) {
+    try {
+        await queueTransaction('readwrite', store => store.add({ base: API_BASE, op }));
+    } catch (error) {
+        console.error('Error queueing change:', error);
+    }
+}
+
+async function readQueuedOps() {
+    try {
+        const records = await queueTransaction('readonly', store => store.getAll());
+        return (records || []).filter(record => record.base === API_BASE);
+    } catch (error) {
+        console.error('Error reading queued changes:', error);
+        return [];
+    }
+}
+
+async function removeQueuedOps(seqs) {
+    await queueTransaction('readwrite', store => {
+        let request = null;
+        seqs.forEach(seq => { request = store.delete(seq); });
+        return request;
+    });
+}
+
+// Flush queued ops to /batch (the server dedupes replays by opId)
+async function syncQueue() {
+    if (syncInFlight || !navigator.onLine) return;
+    syncInFlight = true;
+
+    try {
+        let synced = 0;
+        let needsRefetch = false;
+
+        // Keep draining: ops queued while a chunk is in flight go out in the next one
+        while (navigator.onLine) {
+            const chunk = (await readQueuedOps()).slice(0, SYNC_CHUNK_SIZE);
+            if (chunk.length === 0) break;
+
+            const response = await fetch(`${API_BASE}/batch`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ ops: chunk.map(record => record.op) }),
+            });
+
+            if (response.status >= 400 && response.status < 500) {
+                // Rejected as malformed: retrying would block the queue forever
+                await removeQueuedOps(chunk.map(record => record.seq));
+                throw new Error(`Batch rejected with status ${response.status}; dropped ${chunk.length} queued change(s)`);
+            }
+            if (!response.ok) {
+                throw new Error(`Batch sync failed with status ${response.status}`);
+            }
+
+            const data = await response.json();
+            await removeQueuedOps(chunk.map(record => record.seq));
+            synced += chunk.length;
+
+            chunk.forEach((record, index) => {
+                const result = data.results[index];
+                if (record.op.type !== 'toggle' || !result || result.status === 'error') {
+                    needsRefetch = true;
+                    return;
+                }
+                // Reconcile just this row with the server's view
+                const found = findItemInState(result.itemId);
+                if (found) {
+                    found.item.checked = result.checked;
+                    found.item.checkedAt = result.checkedAt;
+                }
+            });
+        }
+
+        if (synced === 0) return;
+
+        if (needsRefetch) {
+            // Adds and deletes change ids/categories/stats; take the server's list
+            await loadItems();
+        } else {
+            recountState();
+            saveSnapshot();
+            renderItems();
+        }
+    } catch (error) {
+        console.error('Error syncing queued changes:', error);
+    } finally {
+        syncInFlight = false;
+    }
+}
@@ -0,0 +1,72 @@
+// Service worker: offline app shell + last list snapshot
+const CACHE_NAME = 'grocery-shell-v4';
+const SHELL_URLS = ['/', '/static/script.js', '/static/style.css'];
+
+// List endpoints: network first, last good response when offline
+const SNAPSHOT_SUFFIXES = ['/get-current-list', '/get-history', '/categories'];
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => cache.addAll(SHELL_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;  // mutations are queued by script.js
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    // Pages embed the current list, so they are fresh-first like the list endpoints
+    if (request.mode === 'navigate' || SNAPSHOT_SUFFIXES.some(suffix => url.pathname.endsWith(suffix))) {
+        event.respondWith(networkFirst(request));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(cacheFirst(request));
+    }
+});
+
+// Static URLs are fingerprinted (?v=<hash>), so a cached copy never goes stale
+async function cacheFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        // Offline with a new fingerprint: any cached version beats nothing
+        const fallback = await cache.match(request, { ignoreSearch: true });
+        if (fallback) return fallback;
+        throw error;
+    }
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        throw error;
+    }
+}
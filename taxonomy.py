@@ -0,0 +1,154 @@
+"""
+Category taxonomy loaded from categories.json and compiled for fast lookups
+
+The config file lists categories (name, emoji, order, keywords). Loading it
+compiles:
+- names: category names in display order
+- by_casefold: case-folded name -> canonical name (validate_category)
+- keyword matcher: one regex that reproduces the old loop's priority (the
+  first category in order with any keyword contained in the item name wins)
+- client_payload: the JSON served by /categories, with a content-hash ETag
+
+TaxonomyLoader re-reads the file when its mtime changes (checked at most
+every `check_interval` seconds). The new taxonomy is compiled fully before
+the reference is swapped, so requests always see one complete version, and a
+broken file keeps the previous one in place.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+FALLBACK_CATEGORY = "Other"
+
+
+class TaxonomyError(ValueError):
+    """The category config file is malformed."""
+
+
+class Taxonomy:
+    """Immutable, compiled category configuration."""
+
+    def __init__(self, categories, source=None):
+        if not categories:
+            raise TaxonomyError("no categories defined")
+        seen = set()
+        for category in categories:
+            if not isinstance(category, dict):
+                raise TaxonomyError(f"category must be an object: {category!r}")
+            if not isinstance(category.get('name'), str) or not category['name']:
+                raise TaxonomyError(f"category without a name: {category}")
+            keywords = category.get('keywords', [])
+            if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+                raise TaxonomyError(f"{category['name']!r}: keywords must be a list of strings")
+            if not isinstance(category.get('emoji', ''), str):
+                raise TaxonomyError(f"{category['name']!r}: emoji must be a string")
+            order = category.get('order', 0)
+            if isinstance(order, bool) or not isinstance(order, (int, float)):
+                raise TaxonomyError(f"{category['name']!r}: order must be a number")
+            if category['name'].casefold() in seen:
+                raise TaxonomyError(f"duplicate category {category['name']!r}")
+            seen.add(category['name'].casefold())
+        if FALLBACK_CATEGORY.casefold() not in seen:
+            raise TaxonomyError(f"the {FALLBACK_CATEGORY!r} category is required")
+
+        ordered = sorted(categories, key=lambda category: category.get('order', 0))
+        self.source = source
+        self.names = tuple(category['name'] for category in ordered)
+        self.emojis = {category['name']: category.get('emoji', '📦') for category in ordered}
+        self.keywords = {category['name']: tuple(keyword.casefold() for keyword in category.get('keywords', ()))
+                         for category in ordered}
+        self.order = {name: index for index, name in enumerate(self.names)}
+        self.by_casefold = {name.casefold(): name for name in self.names}
+        self._matcher, self._group_names = self._compile_matcher()
+
+        client = [{'name': name, 'emoji': self.emojis[name], 'order': self.order[name]} for name in self.names]
+        body = json.dumps({'categories': client}, ensure_ascii=False, separators=(',', ':'))
+        self.version = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+        self.client_payload = {'version': self.version, 'categories': client}
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise TaxonomyError(f"{path}: {e}")
+        if not isinstance(config, dict) or not isinstance(config.get('categories'), list):
+            raise TaxonomyError(f"{path}: expected {{\"categories\": [...]}}")
+        return cls(config['categories'], source=path)
+
+    def _compile_matcher(self):
+        """One alternation branch per category, tried in order; each branch looks ahead
+        through the whole name for any of that category's keywords."""
+        branches = []
+        group_names = {}
+        for index, name in enumerate(self.names):
+            keywords = [keyword for keyword in self.keywords[name] if keyword]
+            if name == FALLBACK_CATEGORY or not keywords:
+                continue
+            group = f"c{index}"
+            group_names[group] = name
+            alternatives = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+            branches.append(f"(?=.*?(?:{alternatives}))(?P<{group}>)")
+        if not branches:
+            return None, group_names
+        return re.compile(f"^(?:{'|'.join(branches)})", re.DOTALL), group_names
+
+    def match_keyword(self, item_name):
+        """Category whose keyword occurs in item_name (category order decides ties), else Other."""
+        if self._matcher is None:
+            return FALLBACK_CATEGORY
+        match = self._matcher.match(item_name.casefold())
+        return self._group_names[match.lastgroup] if match else FALLBACK_CATEGORY
+
+    def canonical(self, category):
+        """Canonical spelling of a category name (case-insensitive), or None if unknown."""
+        if category in self.order:
+            return category
+        return self.by_casefold.get(str(category).casefold())
+
+
+class TaxonomyLoader:
+    """Holds the current Taxonomy and swaps in a recompiled one when the file changes."""
+
+    def __init__(self, path, check_interval=1.0, on_reload=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        self._current = Taxonomy.from_file(path)
+        self._next_check = time.monotonic() + check_interval
+
+    def get(self):
+        """Current taxonomy (reloaded first if the file changed since the last check)."""
+        if time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._current
+
+    def reload_if_changed(self):
+        """Recompile if the file's mtime moved; returns True when a new taxonomy was installed."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                return False  # keep serving the last good version
+            if mtime == self._mtime:
+                return False
+            try:
+                taxonomy = Taxonomy.from_file(self.path)
+            except Exception as e:
+                # Anything a malformed file can raise; _mtime stays put so a fixed file is picked up
+                print(f"Category config reload failed, keeping previous version: {e}")
+                return False
+            self._mtime = mtime
+            old, self._current = self._current, taxonomy
+        print(f"Category config reloaded from {self.path} (version {taxonomy.version})")
+        if self.on_reload:
+            self.on_reload(old, taxonomy)
+        return True
@@ -0,0 +1,40 @@
+"""
+Shared test setup: point every data path at a scratch directory before app is imported
+"""
+
+import os
+import shutil
+import tempfile
+
+_WORK_DIR = tempfile.mkdtemp(prefix='grocery-tests-')
+os.environ['GROCERY_DATA_FILE'] = os.path.join(_WORK_DIR, 'grocery_data.json')
+os.environ['GROCERY_DATA_DIR'] = os.path.join(_WORK_DIR, 'households')
+os.environ['GROCERY_SNAPSHOT_DIR'] = os.path.join(_WORK_DIR, 'snapshots')
+os.environ['MAINTENANCE_LOCK_DIR'] = os.path.join(_WORK_DIR, 'locks')
+os.environ['CLASSIFIER_LABELS_FILE'] = os.path.join(_WORK_DIR, 'classifier-labels.ndjson')
+os.environ['GEMINI_BACKEND'] = 'stub'
+os.environ['FAKE_GEMINI_LATENCY_MS'] = '0'
+os.environ['MAINTENANCE_ENABLED'] = '0'
+os.environ['CLASSIFIER_ENABLED'] = '0'  # tests install their own classifier
+os.environ['RATE_LIMIT_PER_MINUTE'] = '0'
+
+import uuid  # noqa: E402
+
+import pytest  # noqa: E402
+
+import app as grocery_app  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def client():
+    return grocery_app.app.test_client()
+
+
+@pytest.fixture
+def household_id():
+    """A fresh household per test, so tests never share a shard."""
+    return f"test-{uuid.uuid4().hex[:12]}"
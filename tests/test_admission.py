@@ -0,0 +1,108 @@
+"""
+Admission control: per-client token buckets, the model concurrency cap and the 429 response
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import app as grocery_app
+from admission import AdmissionRejected, ConcurrencyLimiter, TokenBucketLimiter
+
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    bucket = TokenBucketLimiter(rate=0.5, burst=3)
+    assert [bucket.take('alice', now=100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take('alice', now=100.0) == pytest.approx(2.0)  # one token at 0.5/s
+    assert bucket.take('bob', now=100.0) == 0.0  # buckets are per client
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst():
+    bucket = TokenBucketLimiter(rate=1.0, burst=2)
+    bucket.take('alice', now=0.0)
+    bucket.take('alice', now=0.0)
+    assert bucket.take('alice', now=0.5) == pytest.approx(0.5)  # half a token so far
+    assert bucket.take('alice', now=1.5) == 0.0
+
+    assert bucket.take('alice', now=100.0) == 0.0
+    assert bucket.take('alice', now=100.0) == 0.0
+    assert bucket.take('alice', now=100.0) > 0  # capped at burst, not 100 tokens
+
+
+def test_non_positive_rate_disables_the_bucket():
+    bucket = TokenBucketLimiter(rate=0, burst=1)
+    assert all(bucket.take('alice') == 0.0 for _ in range(10))
+
+
+def test_full_queue_is_rejected_immediately():
+    limiter = ConcurrencyLimiter(limit=1, queue_size=0, queue_timeout=5, retry_after=2.0)
+    limiter.acquire()
+    with pytest.raises(AdmissionRejected) as rejected:
+        limiter.acquire()
+    assert rejected.value.reason == 'queue_full'
+    assert rejected.value.retry_after == 2.0
+
+
+def test_queued_caller_times_out():
+    limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+    limiter.acquire()
+    start = time.perf_counter()
+    with pytest.raises(AdmissionRejected) as rejected:
+        limiter.acquire()
+    assert rejected.value.reason == 'queue_timeout'
+    assert time.perf_counter() - start >= 0.05
+    assert limiter.snapshot() == {'limit': 1, 'inFlight': 1, 'queued': 0, 'queueSize': 1}
+
+
+def test_released_slot_goes_to_waiters_in_order():
+    limiter = ConcurrencyLimiter(limit=1, queue_size=2, queue_timeout=5)
+    limiter.acquire()
+    order = []
+
+    def worker(name):
+        with limiter.slot():
+            order.append(name)
+
+    threads = []
+    for name in ('first', 'second'):
+        threads.append(threading.Thread(target=worker, args=(name,)))
+        threads[-1].start()
+        while limiter.snapshot()['queued'] < len(threads):
+            time.sleep(0.001)
+    limiter.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ['first', 'second']
+    assert limiter.snapshot()['inFlight'] == 0
+
+
+def test_async_waiter_gets_the_slot_or_times_out():
+    limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+
+    async def scenario():
+        await limiter.acquire_async()
+        with pytest.raises(AdmissionRejected):
+            await limiter.acquire_async()
+        waiting = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        limiter.release()
+        await waiting  # handed over, not timed out
+
+    asyncio.run(scenario())
+    assert limiter.snapshot()['inFlight'] == 1
+
+
+def test_rate_limited_add_item_gets_429_with_retry_after(client, household_id, monkeypatch):
+    monkeypatch.setattr(grocery_app, 'client_buckets', TokenBucketLimiter(rate=1 / 60, burst=1))
+    monkeypatch.setattr(grocery_app, 'RATE_LIMIT_OVERFLOW', 'reject')
+    text = {'text': '2 gallons of milk'}  # not a plain name, so it needs the model
+
+    assert client.post(f'/h/{household_id}/add-item', json=text).status_code == 200
+    response = client.post(f'/h/{household_id}/add-item', json=text)
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '60'
+    assert response.get_json()['reason'] == 'rate_limit'
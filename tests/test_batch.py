@@ -0,0 +1,51 @@
+"""
+/batch: ops are applied in order and replayed op ids return their first result
+"""
+
+import app as grocery_app
+
+
+def test_replayed_op_is_not_applied_twice(client, household_id):
+    base = f'/h/{household_id}'
+    added = client.post(f'{base}/batch', json={'ops': [
+        {'opId': 'add-1', 'type': 'add', 'name': 'Milk', 'category': 'Dairy'},
+    ]}).get_json()
+    item_id = added['results'][0]['itemId']
+
+    ops = [{'opId': 'toggle-1', 'type': 'toggle', 'itemId': item_id}]
+    first = client.post(f'{base}/batch', json={'ops': ops}).get_json()
+    replay = client.post(f'{base}/batch', json={'ops': ops}).get_json()
+
+    assert first['results'][0]['checked'] is True
+    assert replay['results'][0]['replayed'] is True
+    assert replay['results'][0]['checked'] is True
+    assert replay['checkedItems'] == 1  # a second flip would have unchecked it
+
+
+def test_duplicate_op_id_within_one_request(client, household_id):
+    response = client.post(f'/h/{household_id}/batch', json={'ops': [
+        {'opId': 'a', 'type': 'add', 'name': 'Bread'},
+        {'opId': 'a', 'type': 'add', 'name': 'Butter'},
+    ]}).get_json()
+
+    assert response['results'][1]['replayed'] is True
+    assert response['results'][1]['name'] == 'Bread'
+    assert response['totalItems'] == 1
+
+
+def test_replay_survives_a_reload_from_disk(client, household_id):
+    base = f'/h/{household_id}'
+    ops = [{'opId': 'add-eggs', 'type': 'add', 'name': 'Eggs'}]
+    client.post(f'{base}/batch', json={'ops': ops})
+    grocery_app.tenant_cache.evict(household_id)
+
+    replay = client.post(f'{base}/batch', json={'ops': ops}).get_json()
+    assert replay['results'][0]['replayed'] is True
+    assert replay['totalItems'] == 1
+
+
+def test_ops_without_an_id_are_rejected(client, household_id):
+    response = client.post(f'/h/{household_id}/batch', json={'ops': [{'type': 'add', 'name': 'Jam'}]}).get_json()
+
+    assert response['results'][0]['status'] == 'error'
+    assert response['totalItems'] == 0
@@ -0,0 +1,112 @@
+"""
+CircuitBreaker: closed -> open -> half_open transitions and the adaptive deadline
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CallTimeoutError, CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ValueError('provider error')
+
+
+def make_breaker(**options):
+    transitions = []
+    settings = dict(failure_rate_threshold=0.5, window_size=4, min_calls=4, open_seconds=0.05,
+                    on_transition=lambda old, new: transitions.append((old, new)))
+    settings.update(options)
+    return CircuitBreaker('test', **settings), transitions
+
+
+def test_opens_once_the_failure_rate_crosses_the_threshold():
+    breaker, transitions = make_breaker()
+    breaker.call(lambda: 'ok')
+    breaker.call(lambda: 'ok')
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+    assert breaker.state == CLOSED  # fewer than min_calls
+
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+    assert breaker.state == OPEN  # 2 of 4 failed
+    assert transitions == [(CLOSED, OPEN)]
+
+
+def test_open_circuit_fails_fast_without_calling():
+    breaker, _ = make_breaker(min_calls=1, window_size=1, open_seconds=60)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.snapshot()['secondsUntilHalfOpen'] > 0
+
+
+def test_half_open_probe_success_closes():
+    breaker, transitions = make_breaker(min_calls=1, window_size=1)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+    time.sleep(0.06)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+    assert transitions == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+
+
+def test_half_open_allows_limited_probes_and_failure_reopens():
+    breaker, transitions = make_breaker(min_calls=1, window_size=1)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+    time.sleep(0.06)
+
+    assert breaker.allow_request() is True  # the one probe slot
+    assert breaker.allow_request() is False
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert transitions[-1] == (HALF_OPEN, OPEN)
+
+
+def test_deadline_follows_recent_latencies():
+    breaker, _ = make_breaker(base_timeout=8.0, min_timeout=1.0, max_timeout=15.0, timeout_multiplier=2.0)
+    assert breaker.current_timeout() == 8.0  # too few samples
+
+    for _ in range(20):
+        breaker.record_success(0.1)
+    assert breaker.current_timeout() == 1.0  # 0.2s clamped up to min_timeout
+
+    for _ in range(50):
+        breaker.record_success(3.0)
+    assert breaker.current_timeout() == 6.0
+
+    for _ in range(50):
+        breaker.record_success(30.0)
+    assert breaker.current_timeout() == 15.0
+
+
+def test_slow_call_is_abandoned_at_the_deadline():
+    breaker, _ = make_breaker(base_timeout=0.05, min_calls=1, window_size=1)
+    start = time.perf_counter()
+    with pytest.raises(CallTimeoutError):
+        breaker.call(time.sleep, 0.5)
+
+    assert time.perf_counter() - start < 0.4
+    assert breaker.state == OPEN  # a timeout counts as a failure
+
+
+def test_async_call_uses_the_same_breaker():
+    breaker, _ = make_breaker(base_timeout=0.05, min_calls=1, window_size=1)
+
+    async def slow():
+        await asyncio.sleep(0.5)
+
+    with pytest.raises(CallTimeoutError):
+        asyncio.run(breaker.call_async(slow))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call_async(slow))
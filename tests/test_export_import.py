@@ -0,0 +1,107 @@
+"""
+NDJSON export/import: round trip, all-or-nothing validation and duplicate records
+"""
+
+import json
+
+import app as grocery_app
+
+
+def seed_household(client, household_id):
+    base = f'/h/{household_id}'
+    client.post(f'{base}/batch', json={'ops': [
+        {'opId': 'a', 'type': 'add', 'name': 'Milk', 'category': 'Dairy'},
+        {'opId': 'b', 'type': 'add', 'name': 'Bread', 'category': 'Bakery'},
+    ]})
+    milk = grocery_app.read_grocery_data(household_id).current.items[0]
+    client.post(f'{base}/toggle-item', json={'itemId': milk.id})
+    client.post(f'{base}/complete-trip')
+    client.post(f'{base}/batch', json={'ops': [{'opId': 'c', 'type': 'add', 'name': 'Eggs', 'category': 'Dairy'}]})
+
+
+def export_lines(client, household_id):
+    return client.get(f'/h/{household_id}/export').get_data(as_text=True).splitlines(keepends=True)
+
+
+def post_import(client, household_id, lines, mode='replace'):
+    return client.post(f'/h/{household_id}/import?mode={mode}', data=''.join(lines),
+                       content_type='application/x-ndjson')
+
+
+def comparable(household_id):
+    """The household's data without ids that differ between households."""
+    data = grocery_app.read_grocery_data(household_id)
+    return {
+        'items': [(item.name, item.category, item.checked) for item in data.current.items],
+        'trips': [(trip.id, [(item.name, item.category, item.checked) for item in trip.items])
+                  for trip in data.history],
+        'stats': sorted((data.catalog.get(item_id).name, stats.totalPurchases)
+                        for item_id, stats in data.itemStats.items()),
+    }
+
+
+def test_export_then_import_round_trips(client, household_id):
+    copy_id = f'{household_id}-copy'
+    seed_household(client, household_id)
+    lines = export_lines(client, household_id)
+
+    response = post_import(client, copy_id, lines)
+
+    assert response.status_code == 200
+    assert response.get_json()['imported'] == {'items': 1, 'trips': 1, 'stats': 1}
+    assert comparable(copy_id) == comparable(household_id)
+    assert export_lines(client, copy_id)[1:] == lines[1:]  # same records, new header
+
+
+def test_malformed_line_rejects_the_whole_import(client, household_id):
+    copy_id = f'{household_id}-copy'
+    seed_household(client, household_id)
+    post_import(client, copy_id, export_lines(client, household_id))
+    before = comparable(copy_id)
+
+    lines = export_lines(client, household_id)
+    lines.insert(2, '{"type": "item", "id": "x", "name": \n')
+    response = post_import(client, copy_id, lines)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('line 3:')
+    assert comparable(copy_id) == before
+
+
+def test_truncated_export_is_rejected(client, household_id):
+    seed_household(client, household_id)
+    response = post_import(client, f'{household_id}-copy', export_lines(client, household_id)[:-1])
+
+    assert response.status_code == 400
+    assert 'end record' in response.get_json()['error']
+
+
+def test_duplicate_records_are_skipped(client, household_id):
+    copy_id = f'{household_id}-copy'
+    seed_household(client, household_id)
+    lines = export_lines(client, household_id)
+    item_line = next(line for line in lines if json.loads(line)['type'] == 'item')
+    trip_line = next(line for line in lines if json.loads(line)['type'] == 'trip')
+    end = json.loads(lines[-1])
+    lines[-1:] = [item_line.replace('"Eggs"', '"eggs"'), trip_line,
+                  json.dumps({**end, 'records': end['records'] + 2}) + '\n']
+
+    result = post_import(client, copy_id, lines).get_json()
+
+    assert result['duplicates'] == 2
+    assert result['totalItems'] == 1
+    assert result['totalTrips'] == 1
+    assert grocery_app.check_all_households([copy_id]) == {}
+
+
+def test_merge_adds_only_missing_records(client, household_id):
+    copy_id = f'{household_id}-copy'
+    seed_household(client, household_id)
+    lines = export_lines(client, household_id)
+    client.post(f'/h/{copy_id}/batch', json={'ops': [{'opId': 'a', 'type': 'add', 'name': 'Eggs'}]})
+
+    post_import(client, copy_id, lines, mode='merge')
+    result = post_import(client, copy_id, lines, mode='merge').get_json()
+
+    assert result['totalItems'] == 1
+    assert result['totalTrips'] == 1
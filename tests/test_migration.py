@@ -0,0 +1,74 @@
+"""
+Data format 2.0 -> 2.1: trip items and name-keyed stats become catalog references
+"""
+
+import json
+import os
+
+import app as grocery_app
+
+LEGACY_DOCUMENT = {
+    'version': '2.0',
+    'current': {'date': '2026-01-05', 'items': [
+        {'id': 'c1', 'name': 'Bread', 'category': 'Bakery', 'checked': False,
+         'addedAt': '2026-01-05T09:00:00', 'checkedAt': None},
+    ]},
+    'history': [
+        {'id': 't1', 'date': '2026-01-01', 'completedAt': '2026-01-01T10:00:00', 'totalItems': 2, 'checkedItems': 2,
+         'items': [{'name': 'milk', 'category': 'Other', 'checked': True},
+                   {'name': 'Eggs', 'category': 'Dairy', 'checked': True}]},
+        {'id': 't2', 'date': '2026-01-03', 'completedAt': '2026-01-03T10:00:00', 'totalItems': 1, 'checkedItems': 0,
+         'items': [{'name': 'Milk', 'category': 'Dairy', 'checked': False}]},
+    ],
+    'itemStats': {
+        'milk': {'lastBought': '2026-01-01T10:00:00', 'totalPurchases': 1, 'averageFrequency': None,
+                 'category': 'Other'},
+        'Milk': {'lastBought': '2026-01-03T10:00:00', 'totalPurchases': 2, 'averageFrequency': 2,
+                 'category': 'Dairy'},
+        'Eggs': {'lastBought': '2026-01-01T10:00:00', 'totalPurchases': 1, 'averageFrequency': None,
+                 'category': 'Dairy'},
+    },
+}
+
+
+def test_legacy_document_is_upgraded_in_memory():
+    data = grocery_app.GroceryData(**json.loads(json.dumps(LEGACY_DOCUMENT)))
+
+    assert data.version == grocery_app.DATA_VERSION
+    milk = data.catalog.find('MILK')
+    assert milk.category == 'Dairy'  # the latest category seen wins
+    assert data.history[0].items[0].entry is data.history[1].items[0].entry is milk
+    assert data.history[0].items[1].entry.name == 'Eggs'
+
+    stats = data.stats_for('milk')
+    assert stats.totalPurchases == 3  # case variants merged
+    assert stats.lastBought == '2026-01-03T10:00:00'
+    assert set(data.itemStats) == {milk.id, data.catalog.find('eggs').id}
+    assert grocery_app.validate_household_data(data, strict=True) == []
+
+
+def test_migrate_legacy_households_rewrites_shards(household_id):
+    path = grocery_app.household_data_file(household_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(LEGACY_DOCUMENT, f)
+
+    assert household_id in grocery_app.migrate_legacy_households()
+
+    with open(path) as f:
+        stored = json.load(f)
+    assert stored['version'] == grocery_app.DATA_VERSION
+    ids = {entry['name'].lower(): entry['id'] for entry in stored['catalog']}
+    assert stored['history'][1]['items'] == [[ids['milk'], False]]
+    assert stored['itemStats'][str(ids['milk'])]['totalPurchases'] == 3
+    assert 'category' not in stored['itemStats'][str(ids['eggs'])]
+
+    assert household_id not in grocery_app.migrate_legacy_households()  # already 2.1
+
+
+def test_migrated_document_round_trips():
+    data = grocery_app.GroceryData(**json.loads(json.dumps(LEGACY_DOCUMENT)))
+    reloaded = grocery_app.GroceryData(**json.loads(json.dumps(data.to_dict())))
+
+    assert reloaded.to_dict() == data.to_dict()
+    assert grocery_app.validate_household_data(reloaded, strict=True) == []
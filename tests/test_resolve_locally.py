@@ -0,0 +1,75 @@
+"""
+resolve_items_locally: which parts of an /add-item text skip the model
+"""
+
+import pytest
+
+import app as grocery_app
+
+
+class FixedClassifier:
+    """Stands in for CategoryClassifier with known answers (anything else is unsure)."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def classify_many(self, names):
+        self.calls.append(list(names))
+        return [self.answers.get(name, ('Other', 0.2)) for name in names]
+
+
+@pytest.fixture
+def classifier(monkeypatch):
+    model = FixedClassifier({'Oat Milk': ('Dairy', 0.97), 'Kombucha': ('Beverages', 0.6)})
+    monkeypatch.setattr(grocery_app, 'category_classifier', model)
+    return model
+
+
+@pytest.fixture
+def grocery_data():
+    data = grocery_app._create_empty_grocery_data()
+    data.catalog.intern('Sourdough Bread', 'Bakery')
+    data.catalog.intern('Eggs', 'Other')  # stored while the model was down
+    data.catalog.intern('Quinoa', 'Grains')  # category since removed from the taxonomy
+    return data
+
+
+def test_catalog_items_keep_their_stored_category(grocery_data, classifier):
+    resolved, leftover = grocery_app.resolve_items_locally(grocery_data, 'sourdough bread')
+
+    assert resolved == [{'name': 'Sourdough Bread', 'category': 'Bakery'}]
+    assert leftover == []
+    assert classifier.calls == []  # nothing left to classify
+
+
+def test_other_and_unknown_categories_are_not_trusted(grocery_data, classifier):
+    resolved, leftover = grocery_app.resolve_items_locally(grocery_data, 'eggs, quinoa')
+
+    assert resolved == []
+    assert leftover == ['eggs', 'quinoa']
+    assert classifier.calls == [['Eggs', 'Quinoa']]  # catalog spelling, classified like any plain name
+
+
+def test_plain_names_use_the_classifier_only_when_confident(grocery_data, classifier):
+    resolved, leftover = grocery_app.resolve_items_locally(grocery_data, 'oat milk\nkombucha')
+
+    assert resolved == [{'name': 'Oat Milk', 'category': 'Dairy'}]
+    assert leftover == ['kombucha']
+
+
+def test_phrases_and_quantities_go_to_the_model(grocery_data, classifier):
+    text = '2 gallons of oat milk, we need oat milk, oat milk'
+    resolved, leftover = grocery_app.resolve_items_locally(grocery_data, text)
+
+    assert resolved == [{'name': 'Oat Milk', 'category': 'Dairy'}]
+    assert leftover == ['2 gallons of oat milk', 'we need oat milk']
+    assert classifier.calls == [['Oat Milk']]
+
+
+def test_without_a_classifier_only_catalog_hits_resolve(grocery_data, monkeypatch):
+    monkeypatch.setattr(grocery_app, 'category_classifier', None)
+    resolved, leftover = grocery_app.resolve_items_locally(grocery_data, 'Sourdough Bread, oat milk, , ')
+
+    assert resolved == [{'name': 'Sourdough Bread', 'category': 'Bakery'}]
+    assert leftover == ['oat milk']
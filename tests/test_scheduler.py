@@ -0,0 +1,82 @@
+"""
+Maintenance scheduler: once-per-interval claims across workers and retries after failures
+"""
+
+import time
+
+import scheduler
+from scheduler import ERROR, OK, SKIPPED, Scheduler
+
+
+class FlakyJob:
+    """Fails the first `failures` runs, then succeeds."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.runs = 0
+
+    def __call__(self):
+        self.runs += 1
+        if self.runs <= self.failures:
+            raise RuntimeError('database busy')
+
+
+def two_workers(tmp_path, job, interval=3600):
+    """Two schedulers sharing a lock directory, like two worker processes."""
+    workers = [Scheduler(str(tmp_path)), Scheduler(str(tmp_path))]
+    for worker in workers:
+        worker.add('compact', job, interval)
+    return workers
+
+
+def test_job_runs_once_per_interval_across_workers(tmp_path):
+    job = FlakyJob()
+    first, second = two_workers(tmp_path, job)
+
+    assert first.run_job('compact') == OK
+    assert second.run_job('compact') == SKIPPED
+    assert second.run_job('compact', force=True) == OK
+    assert job.runs == 2
+
+
+def test_failed_run_leaves_the_job_due_for_other_workers(tmp_path):
+    job = FlakyJob(failures=1)
+    first, second = two_workers(tmp_path, job)
+
+    assert first.run_job('compact') == ERROR
+    assert second.run_job('compact') == OK
+    assert first.run_job('compact') == SKIPPED
+    assert first.snapshot()['compact']['lastError'] == 'RuntimeError: database busy'
+
+
+def test_failed_run_is_retried_sooner_than_the_interval(tmp_path):
+    worker = Scheduler(str(tmp_path))
+    worker.add('compact', FlakyJob(failures=1), interval=3600)
+
+    worker.run_job('compact')
+    seconds = worker.snapshot()['compact']['secondsUntilNextRun']
+    assert seconds <= scheduler.ERROR_RETRY_SECONDS * 1.1
+
+    worker.run_job('compact')
+    assert worker.snapshot()['compact']['secondsUntilNextRun'] > 3000
+
+
+def test_per_process_jobs_skip_the_shared_lock(tmp_path):
+    job = FlakyJob()
+    workers = [Scheduler(str(tmp_path)), Scheduler(str(tmp_path))]
+    for worker in workers:
+        worker.add('reload', job, 3600, shared=False)
+
+    assert [worker.run_job('reload') for worker in workers] == [OK, OK]
+    assert not list(tmp_path.iterdir())
+
+
+def test_results_are_reported(tmp_path):
+    results = []
+    worker = Scheduler(str(tmp_path), on_result=lambda job, outcome, duration: results.append((job.name, outcome)))
+    worker.add('compact', FlakyJob(failures=1), 3600)
+
+    worker.run_job('compact')
+    worker.run_job('compact')
+    assert results == [('compact', ERROR), ('compact', OK)]
+    assert worker.snapshot()['compact']['lastSuccess'] <= time.time()
@@ -0,0 +1,22 @@
+"""
+Startup work when a server loads the module-level `app:app` (no create_app())
+"""
+
+import time
+
+import app as grocery_app
+
+
+def test_ready_once_first_request_starts_the_app(client):
+    client.get('/get-current-list')
+    assert grocery_app._app_started
+
+    deadline = time.monotonic() + 5
+    response = client.get('/ready')
+    while response.status_code != 200 and time.monotonic() < deadline:
+        time.sleep(0.01)  # model warm-up runs in the background
+        response = client.get('/ready')
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] is True
+    assert response.get_json()['model'] is True
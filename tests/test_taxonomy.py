@@ -0,0 +1,95 @@
+"""
+Taxonomy compilation and TaxonomyLoader hot reload
+"""
+
+import json
+import os
+
+import pytest
+
+from taxonomy import Taxonomy, TaxonomyError, TaxonomyLoader
+
+CATEGORIES = [
+    {'name': 'Produce', 'emoji': '🥬', 'order': 1, 'keywords': ['apple', 'banana']},
+    {'name': 'Dairy', 'emoji': '🥛', 'order': 2, 'keywords': ['milk', 'cheese']},
+    {'name': 'Other', 'emoji': '📦', 'order': 3, 'keywords': []},
+]
+
+
+def write_config(path, categories, mtime_ns):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'categories': categories}, f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))  # mtime granularity must not hide a rewrite
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'categories.json'
+    write_config(path, CATEGORIES, 1_000_000_000)
+    return path
+
+
+def test_keyword_match_follows_category_order():
+    taxonomy = Taxonomy(CATEGORIES)
+    assert taxonomy.match_keyword('Apple Cheese Danish') == 'Produce'
+    assert taxonomy.match_keyword('Oat Milk') == 'Dairy'
+    assert taxonomy.match_keyword('Paper Towels') == 'Other'
+    assert taxonomy.canonical('dairy') == 'Dairy'
+
+
+@pytest.mark.parametrize('category', [
+    'Produce',
+    {'name': 'Produce', 'keywords': 'apple'},
+    {'name': 'Produce', 'keywords': ['apple', 3]},
+    {'name': 'Produce', 'emoji': 5},
+    {'name': 'Produce', 'order': '1'},
+    {'name': 'Produce', 'order': True},
+    {'keywords': ['apple']},
+])
+def test_malformed_entries_raise_taxonomy_error(category):
+    with pytest.raises(TaxonomyError):
+        Taxonomy([category, {'name': 'Other'}])
+
+
+def test_other_category_is_required():
+    with pytest.raises(TaxonomyError):
+        Taxonomy([{'name': 'Produce'}])
+
+
+def test_reload_picks_up_a_changed_file(config_file):
+    loader = TaxonomyLoader(str(config_file), check_interval=0)
+    write_config(config_file, CATEGORIES + [{'name': 'Bakery', 'order': 0, 'keywords': ['bread']}], 2_000_000_000)
+
+    assert loader.reload_if_changed() is True
+    assert loader.get().names[0] == 'Bakery'
+    assert loader.reload_if_changed() is False  # unchanged since
+
+
+def test_malformed_file_keeps_previous_version_until_fixed(config_file):
+    loader = TaxonomyLoader(str(config_file), check_interval=0)
+    original = loader.get()
+
+    write_config(config_file, [{'name': 'Produce', 'keywords': 'apple'}, {'name': 'Other'}], 2_000_000_000)
+    assert loader.reload_if_changed() is False
+    assert loader.get() is original
+
+    config_file.write_text('{"categories": [', encoding='utf-8')
+    os.utime(config_file, ns=(3_000_000_000, 3_000_000_000))
+    assert loader.reload_if_changed() is False
+    assert loader.get() is original
+
+    fixed = [dict(category) for category in CATEGORIES]
+    fixed[0]['keywords'] = ['apple', 'pear']
+    write_config(config_file, fixed, 4_000_000_000)
+    assert loader.reload_if_changed() is True
+    assert loader.get().match_keyword('Pear') == 'Produce'
+
+
+def test_on_reload_receives_old_and_new(config_file):
+    seen = []
+    loader = TaxonomyLoader(str(config_file), check_interval=0, on_reload=lambda old, new: seen.append((old, new)))
+    original = loader.get()
+    write_config(config_file, CATEGORIES[::-1], 2_000_000_000)
+
+    loader.get()
+    assert seen == [(original, loader.get())]
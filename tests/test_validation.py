@@ -0,0 +1,50 @@
+"""
+Household validation: strict offline checks and change-tracked checks on save
+"""
+
+import json
+import os
+
+import app as grocery_app
+
+
+def write_shard(household_id, document):
+    path = grocery_app.household_data_file(household_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f)
+
+
+def test_unreadable_shards_are_reported_not_raised(household_id):
+    missing, broken = f'{household_id}-missing', f'{household_id}-broken'
+    write_shard(broken, {'version': '2.0', 'current': {'date': 'x', 'items': []},
+                         'history': [{'id': 't1', 'items': [{'checked': True}]}], 'itemStats': {}})
+
+    problems = grocery_app.check_all_households([missing, broken])
+
+    assert problems[missing][0].startswith('cannot read shard')
+    assert problems[broken][0].startswith('unreadable')
+
+
+def test_validate_data_command_exits_non_zero(household_id):
+    runner = grocery_app.app.test_cli_runner()
+    result = runner.invoke(args=['validate-data', '--household', household_id])
+
+    assert result.exit_code == 1
+    assert f'{household_id}: 1 problem(s)' in result.output
+
+
+def test_save_checks_only_the_changed_records(household_id):
+    data = grocery_app._create_empty_grocery_data()
+    data.current.items.append(grocery_app.GroceryItem(id='a', name='Milk', category='Dairy'))
+    assert grocery_app.validate_household_data(data, household_id) == []
+
+    data.current.items[0].checked = 'yes'  # broken, but not part of the next change
+    added = grocery_app.GroceryItem(id='b', name='Eggs', category='Dairy')
+    data.current.items.append(added)
+    assert grocery_app.validate_household_data(data, household_id, changes=grocery_app.Changes(items=(added,))) == []
+
+    added.name = ''
+    errors = grocery_app.validate_household_data(data, household_id, changes=grocery_app.Changes(items=(added,)))
+    assert errors == ['current: missing id/name/category']
+    assert len(grocery_app.validate_household_data(data, household_id, changes=grocery_app.Changes())) == 2
@@ -0,0 +1,120 @@
+"""
+Write-behind buffer: coalesced flushes, group-commit tickets and reads during a flush
+"""
+
+import json
+import threading
+
+import pytest
+
+import app as grocery_app
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """A buffer whose own flusher never fires during a test; tests call flush() themselves."""
+    write_behind = grocery_app.WriteBehindBuffer(window=3600, fsync=False)
+    monkeypatch.setattr(grocery_app, 'write_behind', write_behind)
+    return write_behind
+
+
+def add_item(household_id, name):
+    with grocery_app.household_lock(household_id):
+        data = grocery_app.read_grocery_data(household_id)
+        item = grocery_app.GroceryItem(id=name.lower(), name=name, category='Other')
+        data.current.items.append(item)
+        grocery_app.write_grocery_data(data, household_id, grocery_app.Changes(items=(item,)))
+
+
+def item_names(household_id):
+    return [item.name for item in grocery_app.read_grocery_data(household_id).current.items]
+
+
+def test_mutations_are_coalesced_into_one_write(buffer, household_id, monkeypatch):
+    writes = []
+    persist = grocery_app._persist_grocery_data
+
+    def counting_persist(household, *args, **kwargs):
+        writes.append(household)
+        persist(household, *args, **kwargs)
+
+    monkeypatch.setattr(grocery_app, '_persist_grocery_data', counting_persist)
+    add_item(household_id, 'Milk')
+    add_item(household_id, 'Eggs')
+    assert item_names(household_id) == ['Milk', 'Eggs']  # served from the buffer before any write
+
+    buffer.flush()
+    assert writes == [household_id]
+    grocery_app.tenant_cache.evict(household_id)
+    assert item_names(household_id) == ['Milk', 'Eggs']
+
+
+def test_one_ticket_per_flush_window(buffer, household_id):
+    data = grocery_app._create_empty_grocery_data()
+    first = buffer.submit(household_id, b'{}', data)
+    second = buffer.submit(f'{household_id}-b', b'{}', data)
+    assert first is second
+
+    buffer.flush()
+    first.wait()  # resolved, no error
+    assert buffer.submit(household_id, b'{}', data) is not first
+    buffer.flush()
+
+
+def test_failed_write_is_reported_and_kept_for_the_next_window(buffer, household_id, monkeypatch):
+    persist = grocery_app._persist_grocery_data
+    failures = [OSError('disk full')]
+
+    def flaky_persist(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        persist(*args, **kwargs)
+
+    monkeypatch.setattr(grocery_app, '_persist_grocery_data', flaky_persist)
+    data = grocery_app._create_empty_grocery_data()
+    data.current.items.append(grocery_app.GroceryItem(id='milk', name='Milk', category='Dairy'))
+    ticket = buffer.submit(household_id, json.dumps(data.to_dict()).encode('utf-8'), data)
+
+    buffer.flush()
+    with pytest.raises(OSError):
+        ticket.wait()
+    assert item_names(household_id) == ['Milk']  # still pending
+
+    buffer.flush()
+    grocery_app.tenant_cache.evict(household_id)
+    assert buffer.pending(household_id) is None
+    assert item_names(household_id) == ['Milk']
+
+
+def test_household_evicted_mid_flush_keeps_its_update(buffer, household_id, monkeypatch):
+    slow_household = f'{household_id}-slow'
+    add_item(household_id, 'Milk')
+    buffer.flush()
+    add_item(slow_household, 'Tea')
+    add_item(household_id, 'Bread')
+
+    writing_slow = threading.Event()
+    release = threading.Event()
+    persist = grocery_app._persist_grocery_data
+
+    def slow_persist(household, *args, **kwargs):
+        if household == slow_household:
+            writing_slow.set()
+            release.wait(5)
+        persist(household, *args, **kwargs)
+
+    monkeypatch.setattr(grocery_app, '_persist_grocery_data', slow_persist)
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    try:
+        assert writing_slow.wait(5)
+        grocery_app.tenant_cache.evict(household_id)  # e.g. pushed out by other households
+        assert item_names(household_id) == ['Milk', 'Bread']  # not the older file
+        add_item(household_id, 'Jam')
+    finally:
+        release.set()
+        flusher.join(5)
+
+    buffer.flush()
+    grocery_app.tenant_cache.evict(household_id)
+    assert item_names(household_id) == ['Milk', 'Bread', 'Jam']